@@ -52,6 +52,8 @@ scripts = [
     "rez-interpret",
     "rez-python",
     "rez-selftest",
+    "rez-benchmark",
+    "rez-repo-pack",
     "rez-bind",
     "rez-search",
     "rez-view",
@@ -0,0 +1,292 @@
+"""
+Solver benchmarking against synthetic package repositories.
+
+A synthetic repository is generated from a handful of settings (number of
+families, versions per family, variants, dependency fan-out and conflict
+density) and a random seed, so the same settings always produce the same
+repository and the same set of resolves. Results can be saved as a baseline,
+and later runs compared against it, to catch performance regressions.
+"""
+from rez.solver import Solver
+from rez.package_repository import package_repository_manager
+from rez.serialise import FileFormat
+from rez.vendor.version.requirement import Requirement
+from hashlib import sha1
+import tempfile
+import random
+import shutil
+import os.path
+import os
+
+
+class SolverBenchmark(object):
+    """Runs a fixed set of resolves against a synthetic package repository.
+
+    Families are named 'fam000', 'fam001' and so on. A family only depends on
+    families that come after it, so there are no cyclic dependencies, and
+    resolves are requested from the first half of the families, so that they
+    have dependencies to resolve.
+    """
+    default_settings = dict(
+        num_families=50,
+        num_versions=10,
+        num_variants=0,
+        fanout=3,
+        conflict_density=0.2,
+        num_resolves=20,
+        request_size=3,
+        seed=0)
+
+    def __init__(self, filesystem=False, **settings):
+        """Create a benchmark.
+
+        Args:
+            filesystem (bool): If True, the repository is written as
+                package.py files into a temp filesystem repository, so that
+                the cost of package loading is included. Otherwise an
+                in-memory repository is used.
+            num_families (int): Number of package families.
+            num_versions (int): Number of versions per family.
+            num_variants (int): Number of variants per package. Zero means
+                packages have no variants.
+            fanout (int): Number of requirements per package.
+            conflict_density (float): Probability (0-1) that a requirement is
+                restricted to a single major version, or has an upper bound.
+                Higher values cause more conflicts, and so more backtracking.
+            num_resolves (int): Number of resolves to run.
+            request_size (int): Number of packages in each resolve request.
+            seed (int): Random seed.
+        """
+        unknown = set(settings) - set(self.default_settings)
+        if unknown:
+            raise TypeError("Unknown benchmark settings: %s"
+                            % ", ".join(sorted(unknown)))
+
+        self.settings = self.default_settings.copy()
+        self.settings.update(settings)
+        self.filesystem = filesystem
+
+    def generate_repository_data(self):
+        """Generate the synthetic repository.
+
+        Returns:
+            dict: Package data, in the form {name: {version: package_data}},
+            as used by the memory repository.
+        """
+        s = self.settings
+        rnd = random.Random(s["seed"])
+        names = self.family_names()
+        versions = [self._version(i) for i in range(s["num_versions"])]
+        majors = sorted(set(int(x.split('.')[0]) for x in versions))
+        data = {}
+
+        for i, name in enumerate(names):
+            deps = names[i + 1:]
+            family_data = {}
+
+            for version in versions:
+                package_data = dict(name=name, version=version)
+
+                if deps:
+                    required = rnd.sample(deps, min(s["fanout"], len(deps)))
+                    package_data["requires"] = [
+                        self._requirement(rnd, x, majors) for x in required]
+
+                    # variants require a family that is not already required,
+                    # to avoid conflicts within the package itself
+                    variant_deps = [x for x in deps if x not in required]
+                    if s["num_variants"] and variant_deps:
+                        dep = rnd.choice(variant_deps)
+                        package_data["variants"] = [
+                            ["%s-%d" % (dep, majors[-(j % len(majors)) - 1])]
+                            for j in range(s["num_variants"])]
+
+                family_data[version] = package_data
+
+            data[name] = family_data
+
+        return data
+
+    def generate_requests(self):
+        """Generate the resolve requests.
+
+        Returns:
+            List of list of str: Request for each resolve.
+        """
+        s = self.settings
+        rnd = random.Random(s["seed"] + 1)
+        names = self.family_names()
+        names = names[:max(len(names) // 2, 1)]
+        size = min(s["request_size"], len(names))
+
+        return [sorted(rnd.sample(names, size))
+                for _ in range(s["num_resolves"])]
+
+    def family_names(self):
+        return ["fam%03d" % i for i in range(self.settings["num_families"])]
+
+    def run(self, repeats=1, callback=None):
+        """Run the benchmark.
+
+        Package caches are cleared before each resolve, so package loading is
+        included in the results.
+
+        Args:
+            repeats (int): Number of times to run each resolve. The fastest
+                run is recorded.
+            callback (callable): If not None, called after each resolve with
+                the index of the resolve and its result dict.
+
+        Returns:
+            dict: Results, made of basic types only so that they can be saved
+            as json. Contains the benchmark 'settings', a list of 'resolves'
+            (one dict per resolve, containing the 'request', 'status',
+            'num_solves', 'num_fails', 'solve_time' and 'load_time'), and
+            totals of the same numeric fields.
+        """
+        data = self.generate_repository_data()
+        requests = self.generate_requests()
+        tmpdir = None
+
+        try:
+            if self.filesystem:
+                tmpdir = tempfile.mkdtemp(prefix="rez_benchmark_")
+                self._write_filesystem_repository(data, tmpdir)
+                path = tmpdir
+            else:
+                key = sha1(str(sorted(self.settings.items()))).hexdigest()
+                path = "memory@rez_benchmark_%s" % key
+                repo = package_repository_manager.get_repository(path)
+                repo.data = data
+
+            resolves = []
+
+            for i, request in enumerate(requests):
+                result = self._run_resolve(path, request, repeats)
+                resolves.append(result)
+                if callback:
+                    callback(i, result)
+        finally:
+            if tmpdir:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+        results = dict(settings=self.settings.copy(),
+                       filesystem=self.filesystem,
+                       resolves=resolves)
+
+        for key in ("num_solves", "num_fails", "solve_time", "load_time"):
+            results[key] = sum(x[key] for x in resolves)
+        return results
+
+    @classmethod
+    def compare(cls, results, baseline, tolerance=0.2):
+        """Compare benchmark results against a baseline.
+
+        Args:
+            results (dict): Results, as returned by `run`.
+            baseline (dict): Baseline results, as returned by `run`.
+            tolerance (float): Allowed increase in total solve time, as a
+                fraction of the baseline time.
+
+        Returns:
+            List of str: Description of each regression found. An increase
+            in total solve time beyond `tolerance`, a change in a resolve's
+            status, or an increase in its number of solver steps are
+            considered regressions.
+        """
+        if (results["settings"] != baseline["settings"]) \
+                or (results["filesystem"] != baseline["filesystem"]):
+            raise ValueError("Cannot compare benchmark results created with "
+                             "different settings")
+
+        regressions = []
+
+        for i, (result, base) in enumerate(zip(results["resolves"],
+                                               baseline["resolves"])):
+            request_str = ' '.join(result["request"])
+
+            if result["status"] != base["status"]:
+                regressions.append(
+                    "resolve #%d (%s): status changed from %s to %s"
+                    % (i, request_str, base["status"], result["status"]))
+            elif result["num_solves"] > base["num_solves"]:
+                regressions.append(
+                    "resolve #%d (%s): solver steps increased from %d to %d"
+                    % (i, request_str, base["num_solves"],
+                       result["num_solves"]))
+
+        limit = baseline["solve_time"] * (1.0 + tolerance)
+        if results["solve_time"] > limit:
+            regressions.append(
+                "total solve time increased from %.02f to %.02f secs "
+                "(tolerance %d%%)" % (baseline["solve_time"],
+                                      results["solve_time"], tolerance * 100))
+
+        return regressions
+
+    def _run_resolve(self, path, request, repeats):
+        repo = package_repository_manager.get_repository(path)
+        reqs = [Requirement(x) for x in request]
+        best = None
+
+        for _ in range(max(repeats, 1)):
+            repo.clear_caches()
+            solver = Solver(reqs, [path])
+            solver.solve()
+
+            if best is None or solver.solve_time < best.solve_time:
+                best = solver
+
+        return dict(request=request,
+                    status=best.status.name,
+                    num_solves=best.num_solves,
+                    num_fails=best.num_fails,
+                    solve_time=best.solve_time,
+                    load_time=best.load_time)
+
+    def _requirement(self, rnd, name, majors):
+        if rnd.random() < self.settings["conflict_density"]:
+            major = rnd.choice(majors)
+            if rnd.random() < 0.5:
+                return "%s-%d" % (name, major)
+            else:
+                return "%s<%d" % (name, major + 1)
+        elif rnd.random() < 0.5:
+            return "%s-%d+" % (name, rnd.choice(majors))
+        else:
+            return name
+
+    @classmethod
+    def _version(cls, i):
+        # three minor versions per major, eg 1.0, 1.1, 1.2, 2.0 etc
+        return "%d.%d" % (i // 3 + 1, i % 3)
+
+    @classmethod
+    def _write_filesystem_repository(cls, data, path):
+        from rez.package_serialise import dump_package_data
+
+        for name, family_data in data.iteritems():
+            for version, package_data in family_data.iteritems():
+                package_path = os.path.join(path, name, version)
+                os.makedirs(package_path)
+                filepath = os.path.join(package_path, "package.py")
+
+                with open(filepath, 'w') as f:
+                    dump_package_data(package_data, buf=f,
+                                      format_=FileFormat.py)
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
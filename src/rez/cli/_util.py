@@ -27,6 +27,8 @@ subcommands = [
     "suite",
     "memcache",
     "selftest",
+    "benchmark",
+    "repo-pack",
     "yaml2py",
     "diff",
     "gui"]
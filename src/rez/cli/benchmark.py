@@ -0,0 +1,155 @@
+'''
+Benchmark the solver against a synthetic package repository.
+'''
+
+
+def setup_parser(parser, completions=False):
+    from rez.benchmark import SolverBenchmark
+
+    defaults = SolverBenchmark.default_settings
+
+    parser.add_argument(
+        "--families", type=int, metavar="N",
+        default=defaults["num_families"],
+        help="number of package families (default: %(default)s)")
+    parser.add_argument(
+        "--versions", type=int, metavar="N",
+        default=defaults["num_versions"],
+        help="number of versions per family (default: %(default)s)")
+    parser.add_argument(
+        "--variants", type=int, metavar="N",
+        default=defaults["num_variants"],
+        help="number of variants per package (default: %(default)s)")
+    parser.add_argument(
+        "--fanout", type=int, metavar="N",
+        default=defaults["fanout"],
+        help="number of requirements per package (default: %(default)s)")
+    parser.add_argument(
+        "--conflict-density", dest="conflict_density", type=float,
+        metavar="F", default=defaults["conflict_density"],
+        help="probability (0-1) of a requirement being restricted to a "
+        "narrow version range (default: %(default)s)")
+    parser.add_argument(
+        "--resolves", type=int, metavar="N",
+        default=defaults["num_resolves"],
+        help="number of resolves to run (default: %(default)s)")
+    parser.add_argument(
+        "--request-size", dest="request_size", type=int, metavar="N",
+        default=defaults["request_size"],
+        help="number of packages in each request (default: %(default)s)")
+    parser.add_argument(
+        "--seed", type=int, metavar="N", default=defaults["seed"],
+        help="random seed (default: %(default)s)")
+    parser.add_argument(
+        "--filesystem", action="store_true",
+        help="write the repository to a temp filesystem repository, rather "
+        "than using an in-memory repository. This includes the cost of "
+        "loading package definition files")
+    parser.add_argument(
+        "--repeats", type=int, metavar="N", default=1,
+        help="run each resolve N times and record the fastest "
+        "(default: %(default)s)")
+    parser.add_argument(
+        "-o", "--output", type=str, metavar="FILE",
+        help="save the results to FILE, in json format. This file can then "
+        "be used as a baseline")
+    baseline_action = parser.add_argument(
+        "-b", "--baseline", type=str, metavar="FILE",
+        help="compare against baseline results in FILE, and exit with a "
+        "nonzero code if a regression is found. Repository settings are "
+        "taken from the baseline, so they do not need to be given")
+    parser.add_argument(
+        "--tolerance", type=float, metavar="F", default=0.2,
+        help="allowed increase in total solve time compared to the baseline, "
+        "as a fraction of the baseline time (default: %(default)s)")
+
+    if completions:
+        from rez.cli._complete_util import FilesCompleter
+        baseline_action.completer = FilesCompleter(dirs=False,
+                                                   file_patterns=["*.json"])
+
+
+def command(opts, parser, extra_arg_groups=None):
+    from rez.benchmark import SolverBenchmark
+    from rez.utils.formatting import columnise
+    import json
+    import sys
+
+    baseline = None
+    if opts.baseline:
+        with open(opts.baseline) as f:
+            baseline = json.load(f)
+        settings = dict((str(k), v) for k, v in baseline["settings"].iteritems())
+        filesystem = baseline["filesystem"]
+    else:
+        settings = dict(
+            num_families=opts.families,
+            num_versions=opts.versions,
+            num_variants=opts.variants,
+            fanout=opts.fanout,
+            conflict_density=opts.conflict_density,
+            num_resolves=opts.resolves,
+            request_size=opts.request_size,
+            seed=opts.seed)
+        filesystem = opts.filesystem
+
+    benchmark = SolverBenchmark(filesystem=filesystem, **settings)
+
+    def _callback(i, result):
+        if opts.verbose:
+            print "#%d %s: %s, %d steps, %.02f secs" \
+                % (i, ' '.join(result["request"]), result["status"],
+                   result["num_solves"], result["solve_time"])
+
+    results = benchmark.run(repeats=opts.repeats, callback=_callback)
+
+    rows = [("STATUS", "STEPS", "FAILS", "SOLVE TIME", "LOAD TIME"),
+            ("------", "-----", "-----", "----------", "---------")]
+    statuses = sorted(set(x["status"] for x in results["resolves"]))
+    for status in statuses:
+        resolves = [x for x in results["resolves"] if x["status"] == status]
+        rows.append(("%d %s" % (len(resolves), status),
+                     sum(x["num_solves"] for x in resolves),
+                     sum(x["num_fails"] for x in resolves),
+                     "%.02f" % sum(x["solve_time"] for x in resolves),
+                     "%.02f" % sum(x["load_time"] for x in resolves)))
+    rows.append(("total",
+                 results["num_solves"],
+                 results["num_fails"],
+                 "%.02f" % results["solve_time"],
+                 "%.02f" % results["load_time"]))
+    print '\n'.join(columnise(rows))
+
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            f.write(json.dumps(results, indent=4, sort_keys=True))
+
+    if baseline:
+        regressions = SolverBenchmark.compare(results, baseline,
+                                              tolerance=opts.tolerance)
+        print
+        if regressions:
+            print "%d regression(s) against baseline %s:" \
+                % (len(regressions), opts.baseline)
+            for regression in regressions:
+                print "  %s" % regression
+            sys.exit(1)
+        else:
+            print "No regressions against baseline %s (%.02f secs)." \
+                % (opts.baseline, baseline["solve_time"])
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -59,6 +59,11 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "--pp", "--prune-package", dest="prune_pkg", metavar="PKG",
         type=str, help="prune the graph down to PKG")
+    parser.add_argument(
+        "--pr", "--print-profile", dest="print_profile", action="store_true",
+        help="print the solver profile, in json format. Only available if "
+        "the context was created with profiling enabled (see rez-env "
+        "--profile-solve)")
     parser.add_argument(
         "-i", "--interpret", action="store_true",
         help="interpret the context and print the resulting code")
@@ -81,6 +86,17 @@ def setup_parser(parser, completions=False):
         "--fetch", action="store_true",
         help="diff the current context against a re-resolved copy of the "
         "current context")
+    batch_action = parser.add_argument(
+        "--batch", type=str, metavar="FILE",
+        help="resolve each request in FILE (one request per line, blank "
+        "lines and lines starting with '#' are ignored) and print the "
+        "results, rather than printing a context. Loaded packages are "
+        "shared between the resolves. Use '-' to read the requests from "
+        "stdin. Exits with a nonzero code if any resolve fails")
+    parser.add_argument(
+        "--batch-processes", dest="batch_processes", type=int, metavar="N",
+        default=0,
+        help="spread the resolves of --batch over N worker processes")
     RXT_action = parser.add_argument(
         "RXT", type=str, nargs='?',
         help="rez context file (current context if not supplied). Use '-' to "
@@ -91,6 +107,7 @@ def setup_parser(parser, completions=False):
         rxt_completer = FilesCompleter(dirs=False, file_patterns=["*.rxt"])
         RXT_action.completer = rxt_completer
         diff_action.completer = rxt_completer
+        batch_action.completer = FilesCompleter(dirs=False)
 
 
 def command(opts, parser, extra_arg_groups=None):
@@ -100,6 +117,12 @@ def command(opts, parser, extra_arg_groups=None):
     from rez.utils.graph_utils import save_graph, view_graph, prune_graph
     from pprint import pformat
 
+    if opts.batch:
+        if opts.RXT:
+            parser.error("--batch cannot be used with a context file")
+        _batch(opts)
+        return
+
     rxt_file = opts.RXT if opts.RXT else status.context_file
     if not rxt_file:
         print >> sys.stderr, "not in a resolved environment context."
@@ -144,6 +167,11 @@ def command(opts, parser, extra_arg_groups=None):
         elif opts.print_graph:
             gstr = _graph()
             print gstr
+        elif opts.print_profile:
+            if rc.solve_profile is None:
+                print >> sys.stderr, "The context does not contain a solver profile."
+                sys.exit(1)
+            print json.dumps(rc.solve_profile, sort_keys=True, indent=4)
         elif opts.graph or opts.write_graph:
             gstr = _graph()
             if opts.prune_pkg:
@@ -174,6 +202,51 @@ def command(opts, parser, extra_arg_groups=None):
         print code
 
 
+def _batch(opts):
+    from rez.resolver import resolve_many, ResolverStatus
+    from rez.utils.formatting import columnise
+    from rez.exceptions import RezError
+
+    if opts.batch == '-':
+        lines = sys.stdin.readlines()
+    else:
+        with open(opts.batch) as f:
+            lines = f.readlines()
+
+    requests = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            requests.append(line.split())
+
+    contexts = resolve_many(requests, processes=opts.batch_processes,
+                            verbosity=opts.verbose)
+
+    rows = []
+    num_failed = 0
+    for request, context in zip(requests, contexts):
+        if isinstance(context, RezError):
+            num_failed += 1
+            status = "error"
+            result = str(context).split('\n')[0]
+        elif context.status == ResolverStatus.solved:
+            status = context.status.name
+            result = ' '.join(x.qualified_package_name
+                              for x in context.resolved_packages)
+        else:
+            num_failed += 1
+            status = context.status.name
+            result = (context.failure_description or '').split('\n')[0]
+        rows.append((status, ' '.join(request), result))
+
+    print '\n'.join(columnise(rows))
+
+    if num_failed:
+        print >> sys.stderr, "%d of %d resolves failed." \
+            % (num_failed, len(requests))
+        sys.exit(1)
+
+
 # Copyright 2013-2016 Allan Johns.
 #
 # This library is free software: you can redistribute it and/or
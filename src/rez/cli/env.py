@@ -85,9 +85,20 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "--patch-rank", type=int, metavar="N", default=0,
         help="patch rank. Ignored if --patch is not present")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="keep the versions of packages in the context being patched "
+        "where possible, and only re-resolve packages affected by the patch. "
+        "This is faster, but packages are not updated to later versions "
+        "unless they need to be. Ignored if --patch is not present")
     parser.add_argument(
         "--no-cache", dest="no_cache", action="store_true",
         help="do not fetch cached resolves")
+    parser.add_argument(
+        "--profile-solve", dest="profile_solve", type=str, metavar="FILE",
+        help="profile the solve and write the results, in json format, to "
+        "FILE. If you use the special value '-', results are written to "
+        "stdout. Cached resolves are not used in this case")
     parser.add_argument(
         "-q", "--quiet", action="store_true",
         help="run in quiet mode (hides welcome message)")
@@ -123,6 +134,7 @@ def command(opts, parser, extra_arg_groups=None):
     from rez.utils.formatting import get_epoch_time_from_str
     from rez.config import config
     import select
+    import json
     import sys
     import os
     import os.path
@@ -134,6 +146,7 @@ def command(opts, parser, extra_arg_groups=None):
         command = extra_arg_groups[0] or None
 
     context = None
+    seed_context = None
     request = opts.PKG
     t = get_epoch_time_from_str(opts.time) if opts.time else None
 
@@ -147,6 +160,8 @@ def command(opts, parser, extra_arg_groups=None):
     if opts.input:
         if opts.PKG:
             parser.error("Cannot use --input and provide PKG(s) at the same time")
+        if opts.profile_solve:
+            parser.error("Cannot use --input and --profile-solve at the same time")
         context = ResolvedContext.load(opts.input)
         if context.status != ResolverStatus.solved:
             print >> sys.stderr, "cannot rez-env into a failed context"
@@ -165,6 +180,8 @@ def command(opts, parser, extra_arg_groups=None):
         request = context.get_patched_request(request,
                                               strict=opts.strict,
                                               rank=opts.patch_rank)
+        if opts.incremental:
+            seed_context = context
         context = None
 
     if context is None:
@@ -192,7 +209,18 @@ def command(opts, parser, extra_arg_groups=None):
                                   verbosity=opts.verbose,
                                   max_fails=opts.max_fails,
                                   time_limit=opts.time_limit,
-                                  caching=(not opts.no_cache))
+                                  caching=(not opts.no_cache),
+                                  profile_solve=bool(opts.profile_solve),
+                                  seed_context=seed_context)
+
+        if opts.profile_solve:
+            content = json.dumps(context.solve_profile, indent=4,
+                                 sort_keys=True)
+            if opts.profile_solve == '-':
+                print content
+            else:
+                with open(opts.profile_solve, 'w') as f:
+                    f.write(content)
 
     success = (context.status == ResolverStatus.solved)
     if not success:
@@ -0,0 +1,57 @@
+"""
+Pack a package repository into a single snapshot file.
+
+The snapshot can then be used as a read-only repository, by adding
+'packed@SNAPSHOT' to the packages path.
+"""
+
+
+def setup_parser(parser, completions=False):
+    parser.add_argument(
+        "-q", "--quiet", action="store_true",
+        help="don't print the families being packed")
+    PATH_action = parser.add_argument(
+        "PATH", type=str,
+        help="repository to pack, eg '/svr/packages' or 'filesystem@/svr/packages'")
+    parser.add_argument(
+        "SNAPSHOT", type=str,
+        help="snapshot file to write")
+
+    if completions:
+        from rez.cli._complete_util import FilesCompleter
+        PATH_action.completer = FilesCompleter(dirs=True, files=False)
+
+
+def command(opts, parser, extra_arg_groups=None):
+    from rez.package_repository import package_repository_manager
+    from rez.plugin_managers import plugin_manager
+    import os.path
+
+    path = os.path.expanduser(opts.PATH)
+    repo = package_repository_manager.get_repository(path)
+    cls = plugin_manager.get_plugin_class("package_repository", "packed")
+
+    def _callback(family):
+        if not opts.quiet:
+            print "packing %s..." % family.name
+
+    index = cls.pack(repo, os.path.expanduser(opts.SNAPSHOT),
+                     callback=_callback)
+    print "Packed %d families from %s into %s" \
+        % (len(index["families"]), index["source"], opts.SNAPSHOT)
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -75,6 +75,7 @@ def command(opts, parser, extra_arg_groups=None):
     from rez.utils.formatting import get_epoch_time_from_str, expand_abbreviations
     from rez.utils.logging_ import print_error
     from rez.packages_ import iter_package_families, iter_packages
+    from rez.package_search import filter_families_by_release_time
     from rez.vendor.version.requirement import Requirement
     import os.path
     import fnmatch
@@ -164,6 +165,11 @@ def command(opts, parser, extra_arg_groups=None):
 
     # packages/variants
     if type_ in ("package", "variant"):
+        # skip families with no packages in the time range, if the
+        # repositories can find these with indexed queries
+        family_names = filter_families_by_release_time(
+            family_names, before_time, after_time, paths=pkg_paths)
+
         for name in family_names:
             packages = iter_packages(name, version_range, paths=pkg_paths)
             if opts.sort or opts.latest:
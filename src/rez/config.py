@@ -205,6 +205,10 @@ class RezToolsVisibility_(Str):
         return Or(*(x.name for x in RezToolsVisibility))
 
 
+class ResolveCacheBackend_(Str):
+    schema = Or("memcached", "filesystem")
+
+
 class BuildThreadCount_(Setting):
     # may be a positive int, or the values "physical" or "logical"
 
@@ -271,6 +275,8 @@ config_schema = Schema({
     "package_definition_python_path":               OptionalStr,
     "tmpdir":                                       OptionalStr,
     "context_tmpdir":                               OptionalStr,
+    "resolve_cache_path":                           OptionalStr,
+    "sourcecode_cache_path":                        OptionalStr,
     "logfile":                                      OptionalStr,
     "logfile_by_command":                           OptionalStrDict,
     "default_shell":                                OptionalStr,
@@ -300,18 +306,28 @@ config_schema = Schema({
     "package_preprocess_function":                  OptionalStr,
     "build_thread_count":                           BuildThreadCount_,
     "resource_caching_maxsize":                     Int,
+    "solver_prefetch_threads":                      Int,
+    "solver_branch_processes":                      Int,
     "max_package_changelog_chars":                  Int,
     "max_package_changelog_revisions":              Int,
     "memcached_package_file_min_compress_len":      Int,
     "memcached_context_file_min_compress_len":      Int,
     "memcached_listdir_min_compress_len":           Int,
     "memcached_resolve_min_compress_len":           Int,
+    "resolve_cache_max_entries":                    Int,
+    "resolve_cache_max_entry_size":                 Int,
+    "resolve_cache_validation_threads":             Int,
     "allow_unversioned_packages":                   Bool,
     "rxt_as_yaml":                                  Bool,
     "color_enabled":                                ForceOrBool,
     "resolve_caching":                              Bool,
+    "context_environ_caching":                      Bool,
+    "context_embed_variants":                       Bool,
+    "context_verify_embedded_variants":             Bool,
+    "resolve_cache_backend":                        ResolveCacheBackend_,
     "cache_package_files":                          Bool,
     "cache_listdir":                                Bool,
+    "cache_context_files":                          Bool,
     "prune_failed_graph":                           Bool,
     "all_parent_variables":                         Bool,
     "all_resetting_variables":                      Bool,
@@ -1,9 +1,11 @@
 from inspect import isclass
 from hashlib import sha1
+from bisect import bisect_right
 import collections
 from abc import ABCMeta, abstractmethod
 
 from rez.exceptions import ConfigurationError
+from rez.backport.lru_cache import lru_cache
 from rez.utils.yaml import YamlDumpable
 from rez.vendor.version.version import _Comparable, _ReversedComparable, Version
 
@@ -426,49 +428,37 @@ class TimestampPackageOrder(PackageOrder):
         self.timestamp = timestamp
         self.rank = rank
 
-        # dictionary mapping from package family to the first-version-after
-        # the given timestamp
-        self._cached_first_after = {}
-        self._cached_sort_key = {}
+        # dictionary mapping from package family to its `_SortKeyCache`. The
+        # cache is shared with other orderers of the same settings, when the
+        # family state is known
+        self._sort_key_caches = {}
 
     def get_first_after(self, package_family):
-        first_after = self._cached_first_after.get(package_family, KeyError)
-        if first_after is KeyError:
-            first_after = self._calc_first_after(package_family)
-            self._cached_first_after[package_family] = first_after
-        return first_after
+        cache = self._get_sort_key_cache(package_family)
+        if cache.first_after is KeyError:
+            cache.first_after = self._calc_first_after(package_family)
+        return cache.first_after
 
     def _calc_first_after(self, package_family):
-        from rez.packages_ import iter_packages
-        descending = sorted(iter_packages(package_family),
-                             key=lambda p: p.version,
-                             reverse=True)
-
-        first_after = None
-        for i, package in enumerate(descending):
-            if package.timestamp:
-                if package.timestamp > self.timestamp:
-                    first_after = package.version
-                else:
-                    if not self.rank:
-                        return first_after
-                    # if we have rank, then we need to then go back UP the
-                    # versions, until we find one whose trimmed version doesn't
-                    # match.
-                    # Note that we COULD do this by simply iterating through
-                    # an ascending sequence, in which case we wouldn't have to
-                    # "switch direction" after finding the first result after
-                    # by timestamp... but we're making the assumption that the
-                    # timestamp break will be closer to the higher end of the
-                    # version, and that we'll therefore have to check fewer
-                    # timestamps this way...
-                    trimmed_version = package.version.trim(self.rank - 1)
-                    first_after = None
-                    for after_package in reversed(descending[:i]):
-                        if after_package.version.trim(self.rank - 1) != trimmed_version:
-                            return after_package.version
-                    return first_after
-        return first_after
+        paths, family_state = _get_family_state(package_family)
+        if family_state:
+            index = _get_timestamp_index(package_family, paths, family_state)
+        else:
+            index = _TimestampIndex(package_family, paths)
+        return index.get_first_after(self.timestamp, self.rank)
+
+    def _get_sort_key_cache(self, package_family):
+        cache = self._sort_key_caches.get(package_family)
+        if cache is None:
+            paths, family_state = _get_family_state(package_family)
+            if family_state:
+                cache = _get_sort_key_cache(self.sha1, package_family, paths,
+                                            family_state)
+            else:
+                # the family may change without us knowing, so don't share
+                cache = _SortKeyCache()
+            self._sort_key_caches[package_family] = cache
+        return cache
 
     def _calc_sort_key(self, package_name, version):
         first_after = self.get_first_after(package_name)
@@ -490,11 +480,12 @@ class TimestampPackageOrder(PackageOrder):
                 return (is_before, _ReversedComparable(version))
 
     def sort_key_implementation(self, package_name, version):
-        cache_key = (package_name, str(version))
-        result = self._cached_sort_key.get(cache_key)
+        cache = self._get_sort_key_cache(package_name)
+        cache_key = str(version)
+        result = cache.sort_keys.get(cache_key)
         if result is None:
             result = self._calc_sort_key(package_name, version)
-            self._cached_sort_key[cache_key] = result
+            cache.sort_keys[cache_key] = result
         return result
 
     def __str__(self):
@@ -747,6 +738,112 @@ def from_pod(data):
         return cls.from_pod(data_)
 
 
+class _SortKeyCache(object):
+    """Results of a `TimestampPackageOrder` for a package family."""
+    def __init__(self):
+        self.first_after = KeyError  # not yet calculated
+        self.sort_keys = {}
+
+
+class _TimestampIndex(object):
+    """Package versions of a family, indexed by release timestamp.
+
+    This is used to find the first version after a timestamp with a binary
+    search, rather than by loading and walking over the family's packages.
+    """
+    def __init__(self, package_family, paths=None):
+        from rez.packages_ import iter_packages
+        packages = list(iter_packages(package_family, paths=paths))
+
+        # all versions, ascending
+        self.versions = sorted(x.version for x in packages)
+
+        # (timestamp, version) of timestamped packages, ascending
+        entries = sorted((x.timestamp, x.version) for x in packages
+                         if x.timestamp)
+        self.timestamps = [x[0] for x in entries]
+        self.timestamped_versions = sorted(x[1] for x in entries)
+
+        # highest version released at or before each timestamp
+        self.latest_versions = []
+        latest = None
+        for _, version in entries:
+            if latest is None or version > latest:
+                latest = version
+            self.latest_versions.append(latest)
+
+        self._trimmed_versions = {}
+
+    def get_first_after(self, timestamp, rank=0):
+        """Get the first version after the given time.
+
+        This is the lowest version above the highest version released at or
+        before `timestamp` - or, if `rank` is non-zero, the lowest such version
+        that differs from it at a rank below `rank`.
+
+        Returns:
+            `Version`, or None if there is no such version.
+        """
+        i = bisect_right(self.timestamps, timestamp)
+        if not i:
+            # all packages were released after the timestamp
+            if self.timestamped_versions:
+                return self.timestamped_versions[0]
+            return None
+
+        version = self.latest_versions[i - 1]
+
+        if rank:
+            # trimmed versions ascend along with versions, so the versions
+            # sharing this version's trimmed version are contiguous
+            trimmed = self._get_trimmed_versions(rank)
+            j = bisect_right(trimmed, version.trim(rank - 1))
+            versions = self.versions
+        else:
+            # timestamped versions above this one were all released after
+            # the timestamp
+            j = bisect_right(self.timestamped_versions, version)
+            versions = self.timestamped_versions
+
+        return versions[j] if j < len(versions) else None
+
+    def _get_trimmed_versions(self, rank):
+        trimmed = self._trimmed_versions.get(rank)
+        if trimmed is None:
+            trimmed = [x.trim(rank - 1) for x in self.versions]
+            self._trimmed_versions[rank] = trimmed
+        return trimmed
+
+
+# Number of package families whose orderer results are cached. These caches are
+# shared by all orderers in the process, so that orderers created for each
+# resolve (eg, loaded from config or from a context file) reuse each other's
+# results. Entries are keyed on the family's last release time, so they are not
+# used once a package is added to the family.
+orderer_cache_size = 1000
+
+
+def _get_family_state(package_family):
+    """Returns (paths, last release time) of a family, in the current
+    packages path. The release time is zero if it cannot be determined.
+    """
+    from rez.config import config
+    from rez.packages_ import get_last_release_time
+
+    paths = tuple(config.packages_path)
+    return paths, get_last_release_time(package_family, paths)
+
+
+@lru_cache(maxsize=orderer_cache_size)
+def _get_timestamp_index(package_family, paths, family_state):
+    return _TimestampIndex(package_family, paths)
+
+
+@lru_cache(maxsize=orderer_cache_size)
+def _get_sort_key_cache(orderer_sha1, package_family, paths, family_state):
+    return _SortKeyCache()
+
+
 def register_orderer(cls):
     if isclass(cls) and issubclass(cls, PackageOrder) and \
             hasattr(cls, "name") and cls.name:
@@ -222,6 +222,51 @@ class PackageRepository(object):
         """
         return 0
 
+    def get_dependent_families(self, package_name):
+        """Find the families whose latest package requires the given package.
+
+        This is used by `get_reverse_dependency_tree`, which otherwise loads
+        the latest package of every family. Leave it not implemented if your
+        repository cannot do this faster than that.
+
+        The result may include families that do not depend on the package, for
+        example if their requirements are late bound - these are checked by
+        the caller. Conflict requirements do not count as dependencies.
+
+        Returns:
+            set of str: Family names, or None if not implemented.
+        """
+        return None
+
+    def get_plugin_families(self, package_name):
+        """Find the families whose latest package is a plugin of the given
+        package.
+
+        This is used by `get_plugins`. See `get_dependent_families`.
+
+        Returns:
+            set of str: Family names, or None if not implemented.
+        """
+        return None
+
+    def get_released_families(self, before_time=0, after_time=0):
+        """Find the families that have a package released in a time range.
+
+        This is used by `rez.package_search.filter_families_by_release_time`.
+        See `get_dependent_families`. Packages without a timestamp match any
+        time range.
+
+        Args:
+            before_time (int): Only match packages released before this epoch
+                time. Zero means no limit.
+            after_time (int): Only match packages released after this epoch
+                time. Zero means no limit.
+
+        Returns:
+            set of str: Family names, or None if not implemented.
+        """
+        return None
+
     def make_resource_handle(self, resource_key, **variables):
         """Create a `ResourceHandle`
 
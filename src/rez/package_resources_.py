@@ -1,4 +1,4 @@
-from rez.utils.resources import Resource
+from rez.utils.resources import Resource, ResourceHandle
 from rez.utils.schema import Required, schema_keys
 from rez.utils.logging_ import print_warning
 from rez.utils.sourcecode import SourceCode
@@ -462,6 +462,74 @@ class VariantResourceHelper(VariantResource):
         return None
 
 
+#------------------------------------------------------------------------------
+# embedded resource classes
+#
+# These are packages and variants created from data stored outside of their
+# repository, such as in a context file (see `get_variant_from_embedded_data`).
+# They keep the handle of the resource they were created from, so they compare
+# equal to it, and are serialized as it.
+#------------------------------------------------------------------------------
+
+class EmbeddedPackageResource(PackageResourceHelper):
+    """A package created from embedded data.
+    """
+    key = "embedded.package"
+    schema = package_pod_schema
+
+    def __init__(self, handle, uri, data, variant_key):
+        super(EmbeddedPackageResource, self).__init__(handle.variables)
+        self.handle = handle
+        self.uri = uri
+        self.parent = None
+        self.variant_key = variant_key
+        self._embedded_data = data
+
+    @cached_property
+    def _repository(self):
+        # this does not load anything from the repository
+        from rez.package_repository import package_repository_manager
+        path = "%s@%s" % (self.get("repository_type"), self.location)
+        return package_repository_manager.get_repository(path)
+
+    def iter_variants(self):
+        num_variants = len(self.variants or [])
+        if num_variants == 0:
+            indexes = [None]
+        else:
+            indexes = range(num_variants)
+
+        for index in indexes:
+            variables = self.handle.variables.copy()
+            variables["index"] = index
+            handle = ResourceHandle(self.variant_key, variables)
+            yield EmbeddedVariantResource(handle=handle, parent=self)
+
+    def _load(self):
+        return self._embedded_data
+
+
+class EmbeddedVariantResource(VariantResourceHelper):
+    """A variant created from embedded data.
+    """
+    key = "embedded.variant"
+
+    def __init__(self, handle, parent, uri=None, root=None):
+        super(EmbeddedVariantResource, self).__init__(handle.variables)
+        self.handle = handle
+        self.parent = parent
+
+        # if not given, these are determined from the parent package
+        if uri is not None:
+            self.uri = uri
+        if root is not None:
+            self.root = root
+
+    @property
+    def _repository(self):
+        return self.parent._repository
+
+
 # Copyright 2013-2016 Allan Johns.
 #
 # This library is free software: you can redistribute it and/or
@@ -8,7 +8,9 @@ that do not provide an implementation.
 
 
 from rez.packages_ import iter_package_families, iter_packages, get_latest_package
+from rez.package_repository import package_repository_manager
 from rez.exceptions import PackageFamilyNotFoundError
+from rez.config import config
 from rez.util import ProgressBar
 from rez.vendor.pygraph.classes.digraph import digraph
 from collections import defaultdict
@@ -49,27 +51,38 @@ def get_reverse_dependency_tree(package_name, depth=None, paths=None):
     if depth == 0:
         return pkgs_list, g
 
-    bar = ProgressBar("Searching", len(package_names))
-    lookup = defaultdict(set)
+    # use the repositories' indexed queries if possible, otherwise scan the
+    # latest package of every family
+    dependents = _get_indexed_dependents(package_name, paths)
 
-    for i, package_name_ in enumerate(package_names):
-        bar.next()
-        it = iter_packages(name=package_name_, paths=paths)
-        packages = list(it)
-        if not packages:
-            continue
+    if dependents is not None:
+        lookup = {package_name: dependents}
+
+        def _get_dependents(name):
+            if name not in lookup:
+                lookup[name] = _get_indexed_dependents(name, paths)
+            return lookup[name]
+    else:
+        bar = ProgressBar("Searching", len(package_names))
+        lookup = defaultdict(set)
 
-        pkg = max(packages, key=lambda x: x.version)
-        requires = set(pkg.requires or [])
-        for req_list in (pkg.variants or []):
-            requires.update(req_list)
+        for i, package_name_ in enumerate(package_names):
+            bar.next()
+            it = iter_packages(name=package_name_, paths=paths)
+            packages = list(it)
+            if not packages:
+                continue
 
-        for req in requires:
-            if not req.conflict:
-                lookup[req.name].add(package_name_)
+            pkg = max(packages, key=lambda x: x.version)
+            for name in _get_requirement_names(pkg):
+                lookup[name].add(package_name_)
+
+        bar.finish()
+
+        def _get_dependents(name):
+            return lookup[name]
 
     # perform traversal
-    bar.finish()
     n = 0
     consumed = set([package_name])
     working_set = set([package_name])
@@ -84,7 +97,7 @@ def get_reverse_dependency_tree(package_name, depth=None, paths=None):
         working_set_ = set()
 
         for child in working_set:
-            parents = lookup[child] - consumed
+            parents = _get_dependents(child) - consumed
             working_set_.update(parents)
             consumed.update(parents)
 
@@ -116,6 +129,10 @@ def get_plugins(package_name, paths=None):
     if not pkg.has_plugins:
         return []
 
+    plugin_pkgs = _get_indexed_plugins(pkg.name, paths)
+    if plugin_pkgs is not None:
+        return sorted(plugin_pkgs)
+
     it = iter_package_families(paths)
     package_names = set(x.name for x in it)
     bar = ProgressBar("Searching", len(package_names))
@@ -137,6 +154,94 @@ def get_plugins(package_name, paths=None):
     return plugin_pkgs
 
 
+def filter_families_by_release_time(family_names, before_time=0,
+                                    after_time=0, paths=None):
+    """Skip package families that have no package released in a time range.
+
+    This only uses the repositories' indexed queries (see
+    `PackageRepository.get_released_families`). If any repository does not
+    implement them, `family_names` is returned unchanged, since finding the
+    release times would mean loading every package of every family. The
+    caller is expected to check the timestamps of the packages it goes on to
+    load in any case.
+
+    Args:
+        family_names (list of str): Names of the families to filter.
+        before_time (int): Only match packages released before this epoch
+            time. Zero means no limit.
+        after_time (int): Only match packages released after this epoch time.
+            Zero means no limit.
+        paths (list of str): Paths to search for packages, defaults to
+            `config.packages_path`.
+
+    Returns:
+        list of str: The names in `family_names` that may match, in the same
+        order.
+    """
+    if not (before_time or after_time):
+        return list(family_names)
+
+    names = _get_indexed_families("get_released_families", paths,
+                                  before_time, after_time)
+    if names is None:
+        return list(family_names)
+    return [x for x in family_names if x in names]
+
+
+def _get_requirement_names(package):
+    # names of the packages required by the package or any of its variants
+    requires = set(package.requires or [])
+    for req_list in (package.variants or []):
+        requires.update(req_list)
+
+    return set(x.name for x in requires if not x.conflict)
+
+
+def _get_indexed_families(method_name, paths, *args):
+    # query each repository, or return None if any does not implement the
+    # query (see `PackageRepository.get_dependent_families`)
+    families = set()
+    for path in (paths or config.packages_path):
+        repo = package_repository_manager.get_repository(path)
+        names = getattr(repo, method_name)(*args)
+        if names is None:
+            return None
+        families.update(names)
+    return families
+
+
+def _get_indexed_dependents(package_name, paths):
+    names = _get_indexed_families("get_dependent_families", paths,
+                                  package_name)
+    if names is None:
+        return None
+
+    # a family's latest package may be in a different repository, so check
+    # that each family really depends on the package
+    dependents = set()
+    for name in names:
+        pkg = get_latest_package(name, paths=paths)
+        if pkg and package_name in _get_requirement_names(pkg):
+            dependents.add(name)
+    return dependents
+
+
+def _get_indexed_plugins(package_name, paths):
+    names = _get_indexed_families("get_plugin_families", paths, package_name)
+    if names is None:
+        return None
+
+    plugins = set()
+    for name in names:
+        if name == package_name:
+            continue  # not a plugin of itself
+
+        pkg = get_latest_package(name, paths=paths)
+        if pkg and package_name in (pkg.plugin_for or []):
+            plugins.add(name)
+    return plugins
+
+
 # Copyright 2013-2016 Allan Johns.
 #
 # This library is free software: you can redistribute it and/or
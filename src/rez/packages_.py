@@ -1,7 +1,8 @@
 from rez.package_repository import package_repository_manager
 from rez.package_resources_ import PackageFamilyResource, PackageResource, \
     VariantResource, package_family_schema, package_schema, variant_schema, \
-    package_release_keys, late_requires_schema
+    package_release_keys, late_requires_schema, EmbeddedPackageResource, \
+    EmbeddedVariantResource
 from rez.package_serialise import dump_package_data
 from rez.utils import reraise
 from rez.utils.logging_ import print_info, print_error
@@ -564,6 +565,68 @@ def get_variant(variant_handle, context=None):
     return variant
 
 
+def get_embedded_variant_data(variant):
+    """Get the data needed to create a variant without loading its package.
+
+    The data contains the variant's package definition (minus its changelog),
+    along with the variant's handle, uri and root. This is used to embed
+    variants into saved contexts - see the 'context_embed_variants' setting.
+
+    Args:
+        variant (`Variant`): Variant to get data for.
+
+    Returns:
+        dict: Variant data, made of basic types only, or None if the package
+        definition contains values that cannot be stored this way.
+    """
+    package_resource = variant.parent.resource
+    package_data = dict((k, v) for k, v in variant.parent.data.iteritems()
+                        if k != "changelog")
+    package_data["base"] = variant.base
+
+    try:
+        package_data = _encode_embedded_value(package_data)
+    except TypeError:
+        return None
+
+    return dict(handle=variant.handle.to_dict(),
+                uri=variant.uri,
+                root=variant.root,
+                package=dict(handle=package_resource.handle.to_dict(),
+                             uri=package_resource.uri,
+                             data=package_data))
+
+
+def get_variant_from_embedded_data(data, context=None):
+    """Create a variant from data returned by `get_embedded_variant_data`.
+
+    The variant's package repository is not accessed.
+
+    Args:
+        data (dict): Variant data.
+        context (`ResolvedContext`): The context this variant is associated
+            with, if any.
+
+    Returns:
+        `Variant`.
+    """
+    package_data = data["package"]
+    package_resource = EmbeddedPackageResource(
+        handle=ResourceHandle.from_dict(package_data["handle"]),
+        uri=package_data["uri"],
+        data=_decode_embedded_value(package_data["data"]),
+        variant_key=data["handle"]["key"])
+
+    variant_resource = EmbeddedVariantResource(
+        handle=ResourceHandle.from_dict(data["handle"]),
+        parent=package_resource,
+        uri=data["uri"],
+        root=data["root"])
+
+    package = Package(package_resource, context=context)
+    return Variant(variant_resource, context=context, parent=package)
+
+
 def get_last_release_time(name, paths=None):
     """Returns the most recent time this package was released.
 
@@ -656,7 +719,7 @@ def get_latest_package(name, range_=None, paths=None, error=False):
     """
     it = iter_packages(name, range_=range_, paths=paths)
     try:
-        return max(it, key=lambda x: x.version)
+        return max(it, key=lambda x: x.version.sort_key)
     except ValueError:  # empty sequence
         if error:
             # FIXME this isn't correct, since the pkg fam may exist but a pkg
@@ -686,6 +749,40 @@ def get_latest_package_from_string(txt, paths=None, error=False):
                               error=error)
 
 
+def _encode_embedded_value(value):
+    if isinstance(value, SourceCode):
+        return {"__source_code__": value.__getstate__()}
+    elif isinstance(value, dict):
+        d = {}
+        for k, v in value.iteritems():
+            if not isinstance(k, basestring):
+                raise TypeError("Cannot embed key %r" % k)
+            d[k] = _encode_embedded_value(v)
+        return d
+    elif isinstance(value, (list, tuple)):
+        return [_encode_embedded_value(x) for x in value]
+    elif value is None or isinstance(value, (basestring, bool, int, long,
+                                             float)):
+        return value
+    else:
+        raise TypeError("Cannot embed value %r" % value)
+
+
+def _decode_embedded_value(value):
+    if isinstance(value, dict):
+        state = value.get("__source_code__")
+        if state is not None:
+            code = SourceCode.__new__(SourceCode)
+            code.__setstate__(state)
+            return code
+        return dict((k, _decode_embedded_value(v))
+                    for k, v in value.iteritems())
+    elif isinstance(value, list):
+        return [_decode_embedded_value(x) for x in value]
+    else:
+        return value
+
+
 def _get_families(name, paths=None):
     entries = []
     for path in (paths or config.packages_path):
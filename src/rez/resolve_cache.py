@@ -0,0 +1,353 @@
+"""
+Resolve cache backends.
+
+A resolve cache stores resolve results (see `Resolver`) keyed on the resolve
+request, package repositories and related settings. The backend used is chosen
+via the 'resolve_cache_backend' config setting.
+"""
+from rez.utils.memcached import memcached_client
+from rez.utils.logging_ import print_warning
+from rez.exceptions import ConfigurationError
+from rez.config import config
+from hashlib import sha1
+import cPickle as pickle
+import tempfile
+import getpass
+import stat
+import zlib
+import os.path
+import os
+
+
+class ResolveCache(object):
+    """Abstract base class for a resolve cache backend.
+
+    Cache entries are arbitrary picklable objects, keyed on strings. Entries
+    are pickled, and compressed with zlib if larger than `min_compress_len`,
+    before being passed to the backend. Entries larger than `max_entry_size`
+    (after compression) are not stored.
+    """
+    # header bytes of a serialized entry
+    _raw_header = 'r'
+    _compressed_header = 'z'
+
+    def __init__(self, min_compress_len=0, max_entry_size=0):
+        """Create a resolve cache.
+
+        Args:
+            min_compress_len (int): Size in bytes beyond which entries are
+                compressed. Zero means never compress.
+            max_entry_size (int): Size in bytes beyond which entries are not
+                stored. Zero means unlimited.
+        """
+        self.min_compress_len = min_compress_len
+        self.max_entry_size = max_entry_size
+
+    @classmethod
+    def name(cls):
+        """Return the name of the backend, eg 'memcached'."""
+        raise NotImplementedError
+
+    def get(self, key):
+        """Get a cache entry.
+
+        Returns:
+            The cached object, or None if there is no entry for `key`.
+        """
+        blob = self._get(key)
+        if not blob:
+            return None
+
+        try:
+            return self._loads(blob)
+        except Exception:
+            # corrupt entry, or written by an incompatible version of rez
+            self.delete(key)
+            return None
+
+    def set(self, key, data):
+        """Store a cache entry.
+
+        Returns:
+            int: Size of the stored entry in bytes, or None if the entry was
+            not stored because it exceeds `max_entry_size`.
+        """
+        blob = self._dumps(data)
+        size = len(blob)
+        if self.max_entry_size and size > self.max_entry_size:
+            return None
+
+        self._set(key, blob)
+        return size
+
+    def delete(self, key):
+        """Delete a cache entry, if it exists."""
+        raise NotImplementedError
+
+    def _get(self, key):
+        """Get a serialized entry, or None if there is no entry for `key`."""
+        raise NotImplementedError
+
+    def _set(self, key, blob):
+        """Store a serialized entry."""
+        raise NotImplementedError
+
+    def _dumps(self, data):
+        blob = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        if self.min_compress_len and len(blob) > self.min_compress_len:
+            compressed_blob = zlib.compress(blob)
+            if len(compressed_blob) < len(blob):
+                return self._compressed_header + compressed_blob
+        return self._raw_header + blob
+
+    def _loads(self, blob):
+        header, blob = blob[0], blob[1:]
+        if header == self._compressed_header:
+            blob = zlib.decompress(blob)
+        elif header != self._raw_header:
+            raise ValueError("Unknown resolve cache entry header %r" % header)
+        return pickle.loads(blob)
+
+
+class MemcachedResolveCache(ResolveCache):
+    """Resolve cache that stores entries in memcached.
+    """
+    def __init__(self, servers, min_compress_len=0, max_entry_size=0):
+        super(MemcachedResolveCache, self).__init__(
+            min_compress_len=min_compress_len,
+            max_entry_size=max_entry_size)
+        self.servers = servers
+
+    @classmethod
+    def name(cls):
+        return "memcached"
+
+    def delete(self, key):
+        with self._client() as client:
+            client.delete(key)
+
+    def _get(self, key):
+        with self._client() as client:
+            blob = client.get(key)
+        return blob if isinstance(blob, str) else None
+
+    def _set(self, key, blob):
+        # entries are already compressed as needed, see `ResolveCache._dumps`
+        with self._client() as client:
+            client.set(key, blob)
+
+    def _client(self):
+        return memcached_client(self.servers, debug=config.debug_memcache)
+
+
+class FileSystemResolveCache(ResolveCache):
+    """Resolve cache that stores entries as files in a local directory.
+
+    Each entry is a file, named after the hash of its key. Files are written
+    atomically, so the cache can be shared by concurrent processes. When the
+    number of entries exceeds `max_entries`, the least recently used entries
+    are removed.
+
+    Eviction lists the cache directory and stats every entry, so it is not done
+    on every write. Instead it is done after roughly one in every
+    `max_entries` * `evict_ratio` writes, chosen by key hash so that this holds
+    across processes. The cache may exceed `max_entries` by about this many
+    entries in between.
+    """
+    suffix = ".resolve"
+    evict_ratio = 0.1
+
+    def __init__(self, path, max_entries=0, min_compress_len=0,
+                 max_entry_size=0, private=False):
+        """Create a filesystem resolve cache.
+
+        Args:
+            path (str): Directory to store entries in. It is created if it
+                does not exist.
+            max_entries (int): Maximum number of entries to keep. Zero means
+                unlimited.
+            min_compress_len (int): See `ResolveCache`.
+            max_entry_size (int): See `ResolveCache`.
+            private (bool): If True, the directory is created readable and
+                writable by the current user only, and the cache is not used
+                if the directory is owned by another user, or is writable by
+                others. Entries are unpickled when read, so this must be set
+                if `path` is in a location that other users can write to.
+        """
+        super(FileSystemResolveCache, self).__init__(
+            min_compress_len=min_compress_len,
+            max_entry_size=max_entry_size)
+        self.path = path
+        self.max_entries = max_entries
+        self.private = private
+        self.evict_interval = max(1, int(max_entries * self.evict_ratio))
+        self._usable = None
+
+    @classmethod
+    def name(cls):
+        return "filesystem"
+
+    def delete(self, key):
+        self._remove(self._filepath(key))
+
+    def _get(self, key):
+        if not self._is_usable(create=False):
+            return None
+
+        filepath = self._filepath(key)
+        try:
+            with open(filepath, "rb") as f:
+                key_, blob = pickle.load(f)
+        except IOError:
+            return None
+        except Exception:
+            # corrupt or incompatible entry
+            self._remove(filepath)
+            return None
+
+        if key_ != key:  # hash collision
+            return None
+
+        # update mtime, which is used for LRU eviction
+        try:
+            os.utime(filepath, None)
+        except OSError:
+            pass
+        return blob
+
+    def _set(self, key, blob):
+        if not self._is_usable(create=True):
+            return
+
+        try:
+            fd, tmp_filepath = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((key, blob), f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_filepath, self._filepath(key))
+        except (IOError, OSError) as e:
+            print_warning("Could not write to resolve cache %s: %s"
+                          % (self.path, str(e)))
+            return
+
+        if self.max_entries > 0 \
+                and int(self._hash(key), 16) % self.evict_interval == 0:
+            self._evict()
+
+    def _is_usable(self, create):
+        # checks that the cache directory exists (creating it if `create` is
+        # True), and that it is safe to use, see `private`
+        if self._usable is not None:
+            return self._usable
+
+        if not os.path.isdir(self.path):
+            if not create:
+                return False
+
+            try:
+                os.makedirs(self.path, 0700 if self.private else 0777)
+            except OSError as e:
+                if not os.path.isdir(self.path):
+                    print_warning("Could not create resolve cache %s: %s"
+                                  % (self.path, str(e)))
+                    self._usable = False
+                    return False
+
+        self._usable = True
+
+        if self.private:
+            st = os.stat(self.path)
+            if hasattr(os, "getuid") and st.st_uid != os.getuid():
+                reason = "it is owned by another user"
+            elif st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+                reason = "it is writable by other users"
+            else:
+                reason = None
+
+            if reason:
+                print_warning("Not using resolve cache %s: %s"
+                              % (self.path, reason))
+                self._usable = False
+
+        return self._usable
+
+    @classmethod
+    def _hash(cls, key):
+        return sha1(key).hexdigest()
+
+    def _filepath(self, key):
+        filename = self._hash(key) + self.suffix
+        return os.path.join(self.path, filename)
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(self.suffix):
+                filepath = os.path.join(self.path, name)
+                try:
+                    entries.append((os.path.getmtime(filepath), filepath))
+                except OSError:
+                    pass  # removed by another process
+
+        num_remove = len(entries) - self.max_entries
+        if num_remove > 0:
+            for _, filepath in sorted(entries)[:num_remove]:
+                self._remove(filepath)
+
+    @classmethod
+    def _remove(cls, filepath):
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+
+
+def get_resolve_cache():
+    """Get the resolve cache configured by the 'resolve_cache_backend' setting.
+
+    Returns:
+        `ResolveCache` instance, or None if resolve caching is disabled or the
+        configured backend is not available (eg no memcached servers).
+    """
+    if not config.resolve_caching:
+        return None
+
+    backend = config.resolve_cache_backend
+    kwargs = dict(min_compress_len=config.memcached_resolve_min_compress_len,
+                  max_entry_size=config.resolve_cache_max_entry_size)
+
+    if backend == "memcached":
+        if not config.memcached_uri:
+            return None
+        return MemcachedResolveCache(config.memcached_uri, **kwargs)
+    elif backend == "filesystem":
+        path = config.resolve_cache_path
+        if path:
+            path = os.path.expanduser(path)
+            private = False
+        else:
+            # tmpdir is usually shared by all users, so each user has their
+            # own cache directory there
+            tmpdir = config.tmpdir or tempfile.gettempdir()
+            path = os.path.join(tmpdir, "rez_resolve_cache_%s"
+                                % getpass.getuser())
+            private = True
+        return FileSystemResolveCache(path, config.resolve_cache_max_entries,
+                                      private=private, **kwargs)
+    else:
+        raise ConfigurationError("Unknown resolve cache backend %r" % backend)
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
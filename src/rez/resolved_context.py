@@ -1,6 +1,6 @@
 from rez import __version__, module_root_path
 from rez.package_repository import package_repository_manager
-from rez.solver import SolverCallbackReturn
+from rez.solver import SolverCallbackReturn, get_graph_from_data
 from rez.resolver import Resolver, ResolverStatus
 from rez.system import system
 from rez.config import config
@@ -9,13 +9,14 @@ from rez.utils.sourcecode import SourceCodeError
 from rez.utils.colorize import critical, heading, local, implicit, Printer
 from rez.utils.formatting import columnise, PackageRequest
 from rez.utils.filesystem import TempDirs
-from rez.utils.memcached import pool_memcached_connections
+from rez.utils.memcached import memcached, pool_memcached_connections
 from rez.backport.shutilwhich import which
 from rez.rex import RexExecutor, Python, OutputStyle
 from rez.rex_bindings import VersionBinding, VariantBinding, \
     VariantsBinding, RequirementsBinding
 from rez import package_order
-from rez.packages_ import get_variant, iter_packages
+from rez.packages_ import get_variant, iter_packages, \
+    get_embedded_variant_data, get_variant_from_embedded_data
 from rez.package_filter import PackageFilterList
 from rez.shells import create_shell
 from rez.exceptions import ResolvedContextError, PackageCommandError, RezError
@@ -111,7 +112,7 @@ class ResolvedContext(object):
     command within a configured python namespace, without spawning a child
     shell.
     """
-    serialize_version = (4, 3)
+    serialize_version = (4, 6)
     tmpdir_manager = TempDirs(config.context_tmpdir, prefix="rez_context_")
 
     class Callback(object):
@@ -139,7 +140,8 @@ class ResolvedContext(object):
                  building=False, caching=None, package_paths=None,
                  package_filter=None, package_orderers=None, max_fails=-1,
                  add_implicit_packages=True, time_limit=-1, callback=None,
-                 package_load_callback=None, buf=None):
+                 package_load_callback=None, buf=None, profile_solve=False,
+                 seed_context=None, package_cache=None):
         """Perform a package resolve, and store the result.
 
         Args:
@@ -170,6 +172,19 @@ class ResolvedContext(object):
                 `Package` object.
             buf (file-like object): Where to print verbose output to, defaults
                 to stdout.
+            profile_solve (bool): If True, profile the solve, and store the
+                result in `solve_profile`. Cached resolves are not used in
+                this case.
+            seed_context (`ResolvedContext`): A previous context, typically
+                the one that `package_requests` is a patch of. Its resolved
+                package versions are kept where possible, and only packages
+                affected by the change in request are re-resolved. This is
+                much faster than a full resolve, but note that the result may
+                differ from one - packages are not updated to later versions
+                unless they need to be.
+            package_cache (`PackageVariantCache`): Package families loaded by
+                a previous resolve, to reuse in this one. See
+                `rez.resolver.resolve_many`.
         """
         self.load_path = None
 
@@ -219,6 +234,7 @@ class ResolvedContext(object):
         self._resolved_packages = None
         self.failure_description = None
         self.graph_string = None
+        self.graph_data = None  # see `Solver.get_graph_data`
         self.graph_ = None
         self.from_cache = None
 
@@ -226,6 +242,7 @@ class ResolvedContext(object):
         self.solve_time = 0.0  # total solve time, inclusive of load time
         self.load_time = 0.0  # total time loading packages (disk or memcache)
         self.num_loaded_packages = 0  # num packages loaded (disk or memcache)
+        self.solve_profile = None  # see `Solver.get_profile`
 
         # the pre-resolve bindings. We store these because @late package.py
         # functions need them, and we cache them to avoid cost
@@ -259,6 +276,10 @@ class ResolvedContext(object):
                             callback=callback_,
                             package_load_callback=_package_load_callback,
                             verbosity=verbosity,
+                            profile=profile_solve,
+                            seed_variants=(seed_context.resolved_packages
+                                           if seed_context else None),
+                            package_cache=package_cache,
                             buf=buf)
         resolver.solve()
 
@@ -267,8 +288,11 @@ class ResolvedContext(object):
         self.solve_time = resolver.solve_time
         self.load_time = resolver.load_time
         self.failure_description = resolver.failure_description
-        self.graph_ = resolver.graph
+        self.graph_data = resolver.graph_data
+        if self.graph_data is None:
+            self.graph_ = resolver.graph
         self.from_cache = resolver.from_cache
+        self.solve_profile = resolver.solve_profile
 
         if self.status_ == ResolverStatus.solved:
             self._resolved_packages = []
@@ -361,7 +385,8 @@ class ResolvedContext(object):
     @property
     def has_graph(self):
         """Return True if the resolve has a graph."""
-        return bool((self.graph_ is not None) or self.graph_string)
+        return bool((self.graph_ is not None) or self.graph_string
+                    or self.graph_data)
 
     def get_resolved_package(self, name):
         """Returns a `Variant` object or None if the package is not in the
@@ -492,11 +517,18 @@ class ResolvedContext(object):
 
         if not as_dot:
             if self.graph_ is None:
-                # reads either dot format or our compact format
-                self.graph_ = read_graph_from_string(self.graph_string)
+                if self.graph_data:
+                    # successful resolves store the data needed to create the
+                    # graph, rather than the graph itself
+                    self.graph_ = get_graph_from_data(self.graph_data)
+                else:
+                    # reads either dot format or our compact format
+                    self.graph_ = read_graph_from_string(self.graph_string)
             return self.graph_
 
-        if self.graph_string:
+        if self.graph_data:
+            return write_dot(self.graph())
+        elif self.graph_string:
             if self.graph_string.startswith('{'):  # compact format
                 self.graph_ = read_graph_from_string(self.graph_string)
             else:
@@ -538,9 +570,16 @@ class ResolvedContext(object):
 
     @classmethod
     def load(cls, path):
-        """Load a resolved context from file."""
-        with open(path) as f:
-            context = cls.read_from_buffer(f, path)
+        """Load a resolved context from file.
+
+        The file contents are cached in memcached, if enabled (see the
+        'cache_context_files' setting).
+        """
+        doc = _load_context_file(path)
+        try:
+            context = cls.from_dict(doc, path)
+        except Exception as e:
+            cls._load_error(e, path)
         context.set_load_path(path)
         return context
 
@@ -1249,6 +1288,11 @@ class ResolvedContext(object):
         for pkg in (self._resolved_packages or []):
             resolved_packages.append(pkg.handle.to_dict())
 
+        embedded_variants = None
+        if config.context_embed_variants and self._resolved_packages:
+            embedded_variants = [get_embedded_variant_data(x)
+                                 for x in self._resolved_packages]
+
         serialize_version = '.'.join(str(x) for x in ResolvedContext.serialize_version)
         patch_locks = dict((k, v.name) for k, v in self.patch_locks)
 
@@ -1257,7 +1301,9 @@ class ResolvedContext(object):
         else:
             package_orderers_list = None
 
-        if self.graph_string and self.graph_string.startswith('{'):
+        if self.graph_data:
+            graph_str = None
+        elif self.graph_string and self.graph_string.startswith('{'):
             graph_str = self.graph_string  # already in compact format
         else:
             g = self.graph()
@@ -1295,11 +1341,14 @@ class ResolvedContext(object):
             resolved_packages=resolved_packages,
             failure_description=self.failure_description,
             graph=graph_str,
+            graph_data=self.graph_data,
+            embedded_variants=embedded_variants,
 
             from_cache=self.from_cache,
             solve_time=self.solve_time,
             load_time=self.load_time,
-            num_loaded_packages=self.num_loaded_packages)
+            num_loaded_packages=self.num_loaded_packages,
+            solve_profile=self.solve_profile)
 
     @classmethod
     def from_dict(cls, d, identifier_str=None):
@@ -1362,8 +1411,20 @@ class ResolvedContext(object):
         r.graph_string = d["graph"]
         r.graph_ = None
 
+        # -- SINCE SERIALIZE VERSION 4.6
+        embedded_variants = d.get("embedded_variants")
+        if config.context_verify_embedded_variants:
+            embedded_variants = None
+
         r._resolved_packages = []
-        for d_ in d["resolved_packages"]:
+        for i, d_ in enumerate(d["resolved_packages"]):
+            if embedded_variants and embedded_variants[i]:
+                # load the variant without accessing its package repository
+                variant = get_variant_from_embedded_data(embedded_variants[i])
+                variant.set_context(r)
+                r._resolved_packages.append(variant)
+                continue
+
             variant_handle = d_
             if load_ver < (4, 0):
                 # -- SINCE SERIALIZE VERSION 4.0
@@ -1410,17 +1471,20 @@ class ResolvedContext(object):
 
         r.num_loaded_packages = d.get("num_loaded_packages", -1)
 
+        # -- SINCE SERIALIZE VERSION 4.4
+
+        r.solve_profile = d.get("solve_profile")
+
+        # -- SINCE SERIALIZE VERSION 4.5
+
+        r.graph_data = d.get("graph_data")
+
         return r
 
     @classmethod
     def _read_from_buffer(cls, buf, identifier_str=None):
         content = buf.read()
-
-        if content.startswith('{'):  # assume json content
-            doc = simplejson.loads(content)
-        else:
-            doc = yaml.load(content)
-
+        doc = _parse_context_content(content)
         context = cls.from_dict(doc, identifier_str)
         return context
 
@@ -1455,22 +1519,26 @@ class ResolvedContext(object):
 
         return self.pre_resolve_bindings
 
-    @pool_memcached_connections
-    def _execute(self, executor):
+    @staticmethod
+    def _heading(executor, txt):
         br = '#' * 80
+        executor.comment("")
+        executor.comment("")
+        executor.comment(br)
+        executor.comment(txt)
+        executor.comment(br)
+
+    @staticmethod
+    def _minor_heading(executor, txt):
         br_minor = '-' * 80
+        executor.comment("")
+        executor.comment(txt)
+        executor.comment(br_minor)
 
+    @pool_memcached_connections
+    def _execute(self, executor):
         def _heading(txt):
-            executor.comment("")
-            executor.comment("")
-            executor.comment(br)
-            executor.comment(txt)
-            executor.comment(br)
-
-        def _minor_heading(txt):
-            executor.comment("")
-            executor.comment(txt)
-            executor.comment(br_minor)
+            self._heading(executor, txt)
 
         # bind various info to the execution context
         resolved_pkgs = self.resolved_packages or []
@@ -1515,6 +1583,49 @@ class ResolvedContext(object):
         # -- apply each resolved package to the execution context
         #
 
+        if config.context_environ_caching and self.load_path \
+                and os.path.isfile(self.load_path):
+            environ_cache = _EnvironCache(self)
+            actions = environ_cache.load(executor.manager.parent_environ)
+
+            if actions is not None:
+                executor.manager.apply_actions(actions)
+            else:
+                i_action = len(executor.actions)
+                executor.manager.parent_environ_reads = {}
+                self._execute_packages(executor)
+
+                environ_cache.save(executor.actions[i_action:],
+                                   executor.manager.parent_environ_reads)
+                executor.manager.parent_environ_reads = None
+        else:
+            self._execute_packages(executor)
+
+        _heading("post system setup")
+
+        # append suite paths based on suite visibility setting
+        self._append_suite_paths(executor)
+
+        # append system paths
+        executor.append_system_paths()
+
+        # add rez path so that rez commandline tools are still available within
+        # the resolved environment
+        mode = RezToolsVisibility[config.rez_tools_visibility]
+        if mode == RezToolsVisibility.append:
+            executor.append_rez_path()
+        elif mode == RezToolsVisibility.prepend:
+            executor.prepend_rez_path()
+
+    def _execute_packages(self, executor):
+        resolved_pkgs = self.resolved_packages or []
+
+        def _heading(txt):
+            self._heading(executor, txt)
+
+        def _minor_heading(txt):
+            self._minor_heading(executor, txt)
+
         _heading("package variables")
         error_class = SourceCodeError if config.catch_rex_errors else None
 
@@ -1573,22 +1684,6 @@ class ResolvedContext(object):
 
                     raise PackageCommandError(msg)
 
-        _heading("post system setup")
-
-        # append suite paths based on suite visibility setting
-        self._append_suite_paths(executor)
-
-        # append system paths
-        executor.append_system_paths()
-
-        # add rez path so that rez commandline tools are still available within
-        # the resolved environment
-        mode = RezToolsVisibility[config.rez_tools_visibility]
-        if mode == RezToolsVisibility.append:
-            executor.append_rez_path()
-        elif mode == RezToolsVisibility.prepend:
-            executor.prepend_rez_path()
-
     def _append_suite_paths(self, executor):
         from rez.suite import Suite
 
@@ -1620,6 +1715,117 @@ class ResolvedContext(object):
             executor.env.PATH.append(tools_path)
 
 
+def _parse_context_content(content):
+    if content.startswith('{'):  # assume json content
+        return simplejson.loads(content)
+    else:
+        return yaml.load(content)
+
+
+def _load_context_file__key(filepath):
+    st = os.stat(filepath)
+    return str(("context_file", filepath, st.st_ino, st.st_mtime))
+
+
+@memcached(servers=config.memcached_uri if config.cache_context_files else None,
+           min_compress_len=config.memcached_context_file_min_compress_len,
+           key=_load_context_file__key,
+           debug=config.debug_memcache)
+def _load_context_file(filepath):
+    with open(filepath) as f:
+        content = f.read()
+
+    try:
+        return _parse_context_content(content)
+    except Exception as e:
+        ResolvedContext._load_error(e, filepath)
+
+
+class _EnvironCache(object):
+    """Cache of the rex actions generated by a saved context's packages.
+
+    The actions are stored alongside the context file, and can be re-applied to
+    an executor rather than re-executing each package's commands. An entry is
+    invalid if the context file, rez version or platform changes, if the state
+    of any resolved package changes (eg its package.py is modified), or if any
+    parent environment variable read by the package commands has changed.
+
+    Note that package commands reading `os.environ` directly, rather than via
+    rex (eg `getenv`, `env.FOO`), are not detected. Nor are changes to files
+    that package commands read, other than the package definitions.
+    """
+    format_version = 2
+
+    def __init__(self, context):
+        from rez.package_resources_ import EmbeddedVariantResource
+
+        self.filepath = context.load_path + ".environ"
+
+        st = os.stat(context.load_path)
+        parent_vars = True if config.all_parent_variables \
+            else config.parent_variables
+
+        # embedded package definitions are part of the context file itself
+        variant_states = {}
+        for variant in context.resolved_packages:
+            resource = variant.resource
+            if not isinstance(resource, EmbeddedVariantResource):
+                repo = resource._repository
+                variant_states[variant.qualified_name] = \
+                    repo.get_variant_state_handle(resource)
+
+        self.key = {
+            "format_version": self.format_version,
+            "rez_version": __version__,
+            "context_file": (st.st_mtime, st.st_size),
+            "platform": (system.platform, system.arch, system.os),
+            "parent_variables": parent_vars,
+            "variant_states": variant_states
+        }
+
+    def load(self, parent_environ):
+        """Get the cached actions, or None if there is no valid entry."""
+        import cPickle as pickle
+
+        try:
+            with open(self.filepath, "rb") as f:
+                data = pickle.load(f)
+        except IOError:
+            return None
+        except Exception:
+            return None  # corrupt entry, it is overwritten on next save
+
+        if data.get("key") != self.key:
+            return None
+
+        for key, value in data["parent_environ_reads"].iteritems():
+            if parent_environ.get(key) != value:
+                return None
+
+        return data["actions"]
+
+    def save(self, actions, parent_environ_reads):
+        """Store actions, and the parent environment values they depend on."""
+        import cPickle as pickle
+        from tempfile import mkstemp
+
+        data = {
+            "key": self.key,
+            "parent_environ_reads": parent_environ_reads,
+            "actions": actions
+        }
+
+        # write to temp file and rename, so readers never see a partial entry
+        try:
+            path = os.path.dirname(self.filepath)
+            fd, tmp_filepath = mkstemp(dir=path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_filepath, self.filepath)
+        except (IOError, OSError):
+            pass  # eg, context is in a read-only location
+
+
 # Copyright 2013-2016 Allan Johns.
 #
 # This library is free software: you can redistribute it and/or
@@ -1,13 +1,19 @@
-from rez.solver import Solver, SolverStatus, PackageVariantCache
+from rez.solver import Solver, SolverStatus, PackageVariantCache, \
+    get_graph_from_data
 from rez.package_repository import package_repository_manager
 from rez.packages_ import get_variant, get_last_release_time
 from rez.package_filter import PackageFilterList, TimestampRule
-from rez.utils.memcached import memcached_client, pool_memcached_connections
+from rez.resolve_cache import get_resolve_cache
+from rez.utils.memcached import pool_memcached_connections
+from rez.utils import get_thread_pool, clear_thread_pools
 from rez.utils.logging_ import log_duration
+from rez.utils.graph_utils import write_compacted, read_graph_from_string
+from rez.exceptions import RezError
 from rez.config import config
+from rez.vendor.version.requirement import Requirement
 from rez.vendor.enum import Enum
-from contextlib import contextmanager
 from hashlib import sha1
+import signal
 import os
 
 
@@ -25,6 +31,113 @@ class ResolverStatus(Enum):
         self.description = description
 
 
+# requests and settings of the `resolve_many` call in progress, inherited by
+# its forked worker processes, and the package cache of a worker process
+_batch = None
+_batch_package_cache = None
+
+
+@pool_memcached_connections
+def resolve_many(package_requests_list, processes=0, **kwargs):
+    """Resolve many requests, sharing loaded packages between them.
+
+    Creating a `ResolvedContext` per request loads the same package families
+    over and over. Here, package families are loaded once and reused by every
+    resolve (see `PackageVariantCache`), and memcached connections are pooled
+    for the whole batch.
+
+    Args:
+        package_requests_list (list of list): Requests to resolve. Each
+            request is a list of strings or `PackageRequest` objects.
+        processes (int): If greater than one, the resolves are spread over
+            this many worker processes, each with its own package cache.
+            Ignored on platforms that do not support `os.fork`.
+        kwargs: Arguments passed to each `ResolvedContext`, such as
+            'package_paths', 'package_filter', 'timestamp' or 'building'.
+            These are the same for every resolve, which is what allows loaded
+            packages to be shared.
+
+    Returns:
+        List of `ResolvedContext`: A context per request, in the same order
+        as `package_requests_list`. If a request raises a `RezError` (for
+        example, because a requested package family does not exist), its
+        entry is that exception instead, and the other requests are still
+        resolved.
+    """
+    from rez.resolved_context import ResolvedContext
+    global _batch
+
+    package_requests_list = list(package_requests_list)
+    processes = min(processes, len(package_requests_list))
+
+    if processes < 2 or not hasattr(os, "fork"):
+        package_cache = PackageVariantCache(None)
+        return [_resolve(x, package_cache, kwargs)
+                for x in package_requests_list]
+
+    from multiprocessing import Pool
+
+    _batch = (package_requests_list, kwargs)
+    pool = Pool(processes, initializer=_init_batch_worker)
+    try:
+        results = pool.map(_resolve_batch_item,
+                           range(len(package_requests_list)))
+    finally:
+        pool.close()
+        pool.join()
+        _batch = None
+
+    contexts = []
+    for context_dict, error in results:
+        if error:
+            cls, msg = error
+            contexts.append(cls(msg))
+        else:
+            contexts.append(ResolvedContext.from_dict(context_dict))
+    return contexts
+
+
+def _resolve(package_requests, package_cache, kwargs):
+    from rez.resolved_context import ResolvedContext
+
+    try:
+        return ResolvedContext(package_requests, package_cache=package_cache,
+                               **kwargs)
+    except RezError as e:
+        return e
+
+
+def _init_batch_worker():
+    # runs in a new `resolve_many` worker process
+    from rez.utils.memcached import scoped_instance_manager
+
+    # ctrl-C is handled by the parent
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # thread pools and memcached connections can't be shared with the parent
+    # process
+    clear_thread_pools()
+    scoped_instance_manager.clients = {}
+
+
+def _resolve_batch_item(index):
+    # runs in a `resolve_many` worker process
+    global _batch_package_cache
+
+    if _batch_package_cache is None:
+        _batch_package_cache = PackageVariantCache(None)
+
+    package_requests_list, kwargs = _batch
+    result = _resolve(package_requests_list[index], _batch_package_cache,
+                      kwargs)
+
+    # contexts are sent back in serialized form, and errors as their class and
+    # message, since `RezError` does not pickle its message
+    if isinstance(result, RezError):
+        return None, (result.__class__, str(result))
+    return result.to_dict(), None
+
+
 class Resolver(object):
     """The package resolver.
 
@@ -33,7 +146,8 @@ class Resolver(object):
     """
     def __init__(self, context, package_requests, package_paths, package_filter=None,
                  package_orderers=None, timestamp=0, callback=None, building=False,
-                 verbosity=False, buf=None, package_load_callback=None, caching=True):
+                 verbosity=False, buf=None, package_load_callback=None, caching=True,
+                 profile=False, seed_variants=None, package_cache=None):
         """Create a Resolver.
 
         Args:
@@ -49,6 +163,18 @@ class Resolver(object):
             building: True if we're resolving for a build.
             caching: If True, cache(s) may be used to speed the resolve. If
                 False, caches will not be used.
+            profile (bool): If True, the solve is profiled, and the resulting
+                data is stored in `solve_profile` (see `Solver.get_profile`).
+                A cached resolve is never used in this case, since there would
+                be nothing to profile.
+            seed_variants (list of `Variant`): Variants from a previous
+                resolve, such as the context being patched. The solve first
+                tries to keep these variants' versions, except for packages
+                named in `package_requests`; see `_solve_seeded`.
+            package_cache (`PackageVariantCache`): Package families loaded by
+                a previous resolve with the same package paths, package filter,
+                timestamp and building flag, to reuse in this one. See
+                `resolve_many`.
         """
         from rez.package_order import OrdererDict
 
@@ -62,6 +188,9 @@ class Resolver(object):
         self.building = building
         self.verbosity = verbosity
         self.caching = caching
+        self.profile = profile
+        self.seed_variants = seed_variants
+        self.package_cache = package_cache
         self.buf = buf
 
         # store hash of package orderers. This is used in the memcached key
@@ -93,11 +222,13 @@ class Resolver(object):
         self.resolved_packages_ = None
         self.failure_description = None
         self.graph_ = None
+        self.graph_data = None  # see `Solver.get_graph_data`
         self.from_cache = False
-        self.memcached_servers = config.memcached_uri if config.resolve_caching else None
+        self.resolve_cache = get_resolve_cache()
 
         self.solve_time = 0.0  # time spent solving
         self.load_time = 0.0   # time spent loading package resources
+        self.solve_profile = None
 
         self._print = config.debug_printer("resolve_memcache")
 
@@ -105,8 +236,10 @@ class Resolver(object):
     def solve(self):
         """Perform the solve.
         """
-        with log_duration(self._print, "memcache get (resolve) took %s"):
-            solver_dict = self._get_cached_solve()
+        solver_dict = None
+        if not self.profile:
+            with log_duration(self._print, "cache get (resolve) took %s"):
+                solver_dict = self._get_cached_solve()
 
         if solver_dict:
             self.from_cache = True
@@ -115,9 +248,10 @@ class Resolver(object):
             self.from_cache = False
             solver = self._solve()
             solver_dict = self._solver_to_dict(solver)
+            self.solve_profile = solver.get_profile()
             self._set_result(solver_dict)
 
-            with log_duration(self._print, "memcache set (resolve) took %s"):
+            with log_duration(self._print, "cache set (resolve) took %s"):
                 self._set_cached_solve(solver_dict)
 
     @property
@@ -148,16 +282,26 @@ class Resolver(object):
         Returns:
             A pygraph.digraph object, or None if the solve has not completed.
         """
+        if self.graph_ is None and self.graph_data is not None:
+            # successful solves store the data needed to create the graph,
+            # rather than the graph itself
+            self.graph_ = get_graph_from_data(self.graph_data)
+        elif isinstance(self.graph_, basestring):
+            # graph retrieved from the resolve cache, in compacted form
+            self.graph_ = read_graph_from_string(self.graph_)
         return self.graph_
 
     def _get_variant(self, variant_handle):
         return get_variant(variant_handle, context=self.context)
 
     def _get_cached_solve(self):
-        """Find a memcached resolve.
+        """Find a cached resolve.
+
+        The cache used is determined by the 'resolve_cache_backend' setting
+        (see `rez.resolve_cache`). The same logic applies to each backend.
 
         If there is NOT a resolve timestamp:
-            - fetch a non-timestamped memcache entry;
+            - fetch a non-timestamped cache entry;
             - if no entry, then fail;
             - if packages have changed, then:
               - delete the entry;
@@ -169,7 +313,7 @@ class Resolver(object):
               - fail.
 
         If there IS a resolve timestamp (let us call this T):
-            - fetch a non-timestamped memcache entry;
+            - fetch a non-timestamped cache entry;
             - if entry then:
               - if no packages have changed, then:
                 - if no packages in the entry have been released since:
@@ -179,7 +323,7 @@ class Resolver(object):
                   - delete the entry;
               - else:
                 - delete the entry;
-            - fetch a timestamped (T) memcache entry;
+            - fetch a timestamped (T) cache entry;
             - if no entry, then fail;
             - if packages have changed, then:
               - delete the entry;
@@ -194,7 +338,7 @@ class Resolver(object):
         consider a workflow where a work area is tied down to a particular
         timestamp in order to 'lock' it from any further software releases).
         """
-        if not (self.caching and self.memcached_servers):
+        if not (self.caching and self.resolve_cache):
             return None
 
         # these caches avoids some potentially repeated file stats
@@ -210,38 +354,40 @@ class Resolver(object):
             return None
 
         def _delete_cache_entry(key):
-            with self._memcached_client() as client:
-                client.delete(key)
+            self.resolve_cache.delete(key)
             self._print("Discarded entry: %r", key)
 
         def _retrieve(timestamped):
             key = self._memcache_key(timestamped=timestamped)
-            self._print("Retrieving memcache key: %r", key)
-            with self._memcached_client() as client:
-                data = client.get(key)
+            self._print("Retrieving cache key: %r", key)
+            data = self.resolve_cache.get(key)
+            if data:
+                data = self._from_cache_entry(data)
             return key, data
 
         def _packages_changed(key, data):
             solver_dict, _, variant_states_dict = data
-            for variant_handle in solver_dict.get("variant_handles", []):
+            variant_handles = solver_dict.get("variant_handles", [])
+            self._fetch_variant_states(variant_handles, variant_states)
+
+            for variant_handle in variant_handles:
                 variant = self._get_variant(variant_handle)
                 old_state = variant_states_dict.get(variant.name)
 
                 new_state = variant_states.get(variant)
                 if new_state is None:
-                    try:
-                        repo = variant.resource._repository
-                        new_state = repo.get_variant_state_handle(variant.resource)
-                    except (IOError, OSError) as e:
-                        # if, ie a package file was deleted on disk, then
-                        # an IOError or OSError will be raised when we try to
-                        # read from it - assume that the packages have changed!
-                        self._print("Error loading %r (assuming cached state "
-                                    "changed): %s", variant.qualified_name,
-                                    e)
-                        return True
+                    new_state = self._get_variant_state(variant)
                     variant_states[variant] = new_state
 
+                if isinstance(new_state, EnvironmentError):
+                    # if, ie a package file was deleted on disk, then
+                    # an IOError or OSError will be raised when we try to
+                    # read from it - assume that the packages have changed!
+                    self._print("Error loading %r (assuming cached state "
+                                "changed): %s", variant.qualified_name,
+                                new_state)
+                    return True
+
                 if old_state != new_state:
                     self._print("%r has been modified", variant.qualified_name)
                     return True
@@ -249,6 +395,9 @@ class Resolver(object):
 
         def _releases_since_solve(key, data):
             _, release_times_dict, _ = data
+            self._fetch_last_release_times(release_times_dict.keys(),
+                                           last_release_times)
+
             for package_name, release_time in release_times_dict.iteritems():
                 time_ = last_release_times.get(package_name)
                 if time_ is None:
@@ -299,14 +448,8 @@ class Resolver(object):
             else:
                 return _hit(data)
 
-    @contextmanager
-    def _memcached_client(self):
-        with memcached_client(self.memcached_servers,
-                              debug=config.debug_memcache) as client:
-            yield client
-
     def _set_cached_solve(self, solver_dict):
-        """Store a solve to memcached.
+        """Store a solve to the resolve cache.
 
         If there is NOT a resolve timestamp:
             - store the solve to a non-timestamped entry.
@@ -320,7 +463,7 @@ class Resolver(object):
         if self.status_ != ResolverStatus.solved:
             return  # don't cache failed solves
 
-        if not (self.caching and self.memcached_servers):
+        if not (self.caching and self.resolve_cache):
             return
 
         # most recent release times get stored with solve result in the cache
@@ -328,12 +471,18 @@ class Resolver(object):
         release_times_dict = {}
         variant_states_dict = {}
 
+        last_release_times = {}
+        self._fetch_last_release_times(
+            [x.name for x in self.resolved_packages_], last_release_times)
+
         for variant in self.resolved_packages_:
-            time_ = get_last_release_time(variant.name, self.package_paths)
+            time_ = last_release_times.get(variant.name)
+            if time_ is None:
+                time_ = get_last_release_time(variant.name, self.package_paths)
 
             # don't cache if a release time isn't known
             if time_ == 0:
-                self._print("Did not send memcache key: a repository could "
+                self._print("Did not send cache key: a repository could "
                             "not provide a most recent release time for %r",
                             variant.name)
                 return
@@ -348,10 +497,133 @@ class Resolver(object):
 
         timestamped = (self.timestamp and releases_since_solve)
         key = self._memcache_key(timestamped=timestamped)
-        data = (solver_dict, release_times_dict, variant_states_dict)
-        with self._memcached_client() as client:
-            client.set(key, data)
-        self._print("Sent memcache key: %r", key)
+        data = self._to_cache_entry(solver_dict, release_times_dict,
+                                    variant_states_dict)
+        size = self.resolve_cache.set(key, data)
+
+        if size is None:
+            self._print("Did not send cache key: entry exceeds %d bytes: %r",
+                        self.resolve_cache.max_entry_size, key)
+        else:
+            self._print("Sent cache key (%d bytes): %r", size, key)
+
+    def _get_variant_state(self, variant):
+        """Get the state handle of a variant, or the IOError/OSError raised
+        when trying to read it."""
+        try:
+            repo = variant.resource._repository
+            return repo.get_variant_state_handle(variant.resource)
+        except EnvironmentError as e:
+            return e
+
+    def _fetch_variant_states(self, variant_handles, variant_states):
+        """Get the state handles of variants concurrently.
+
+        This is used to validate resolve cache entries without stat'ing each
+        package file in turn. Results are added to `variant_states`, keyed by
+        variant. Does nothing if 'resolve_cache_validation_threads' is zero.
+        """
+        if not config.resolve_cache_validation_threads:
+            return
+
+        def _fetch(variant_handle):
+            variant = self._get_variant(variant_handle)
+            if variant in variant_states:
+                return None
+            return variant, self._get_variant_state(variant)
+
+        pool = get_thread_pool("resolve_cache_validation_threads")
+        for result in pool.map(_fetch, variant_handles):
+            if result is not None:
+                variant, state = result
+                variant_states[variant] = state
+
+    def _fetch_last_release_times(self, package_names, last_release_times):
+        """Get the last release times of packages.
+
+        The release times are read concurrently. Results are added to
+        `last_release_times`, keyed by package name. Does nothing if
+        'resolve_cache_validation_threads' is zero, in which case release
+        times are read one at a time as cache entries are validated.
+        """
+        if not config.resolve_cache_validation_threads:
+            return
+
+        names = [x for x in package_names if x not in last_release_times]
+
+        def _fetch(name):
+            return get_last_release_time(name, self.package_paths)
+
+        pool = get_thread_pool("resolve_cache_validation_threads")
+        times = pool.map(_fetch, names)
+        last_release_times.update(zip(names, times))
+
+    @classmethod
+    def _to_cache_entry(cls, solver_dict, release_times_dict,
+                        variant_states_dict):
+        """Convert a solve into the compact form stored in the resolve cache.
+
+        The graph is stored in compacted form (see `write_compacted`), and
+        variant handles are stored as rows of indices into a table of unique
+        values, since handles share most of their contents (repository type,
+        location etc).
+        """
+        solver_dict = solver_dict.copy()
+
+        graph_ = solver_dict.get("graph")
+        if graph_ is not None and not isinstance(graph_, (basestring, dict)):
+            solver_dict["graph"] = write_compacted(graph_)
+
+        handles = solver_dict.get("variant_handles")
+        if handles:
+            solver_dict["variant_handles"] = cls._intern_handles(handles)
+
+        return (solver_dict, release_times_dict, variant_states_dict)
+
+    @classmethod
+    def _from_cache_entry(cls, data):
+        solver_dict, release_times_dict, variant_states_dict = data
+
+        handles = solver_dict.get("variant_handles")
+        if handles:
+            solver_dict["variant_handles"] = cls._unintern_handles(handles)
+
+        return (solver_dict, release_times_dict, variant_states_dict)
+
+    @classmethod
+    def _intern_handles(cls, handles):
+        values = []
+        indices = {}
+        rows = []
+
+        def _index(value):
+            i = indices.get(value)
+            if i is None:
+                i = indices[value] = len(values)
+                values.append(value)
+            return i
+
+        for handle in handles:
+            row = [_index(handle["key"])]
+            for k, v in sorted(handle["variables"].iteritems()):
+                row.append(_index(k))
+                row.append(_index(v))
+            rows.append(tuple(row))
+
+        return (tuple(values), rows)
+
+    @classmethod
+    def _unintern_handles(cls, data):
+        values, rows = data
+        handles = []
+
+        for row in rows:
+            it = iter(values[i] for i in row)
+            key = it.next()
+            variables = dict(zip(it, it))
+            handles.append(dict(key=key, variables=variables))
+
+        return handles
 
     def _memcache_key(self, timestamped=False):
         """Makes a key suitable as a memcache entry."""
@@ -372,10 +644,59 @@ class Resolver(object):
         if timestamped and self.timestamp:
             t.append(self.timestamp)
 
+        if self.seed_variants:
+            seeds = sorted(x.qualified_package_name for x in self.seed_variants)
+            t.append(tuple(seeds))
+
         return str(tuple(t))
 
     def _solve(self):
-        solver = Solver(package_requests=self.package_requests,
+        if self.seed_variants:
+            solver = self._solve_seeded()
+            if solver:
+                return solver
+
+        return self._solve_request(self.package_requests)
+
+    def _solve_seeded(self):
+        """Solve with the versions of `seed_variants` preferred.
+
+        Each seed package not named in the request is added to the request as
+        a weak, exact version requirement (eg '~foo==1.2.0'), which leaves
+        little for the solver to do. If this fails, the seeds involved in the
+        failure are dropped, and the solve is tried again.
+
+        Returns:
+            `Solver`: The successful solve, or None if no solve succeeded
+            while any relevant seeds remained.
+        """
+        names = set(x.name for x in self.package_requests)
+        seeds = dict((x.name, x.version) for x in self.seed_variants
+                     if x.name not in names)
+
+        while seeds:
+            seed_requests = [Requirement("~%s==%s" % (name, str(version)))
+                             for name, version in sorted(seeds.iteritems())]
+
+            solver = self._solve_request(self.package_requests + seed_requests)
+            if solver.status == SolverStatus.solved:
+                return solver
+            elif solver.status != SolverStatus.failed:
+                return None
+
+            # drop the seeds that the change to the request conflicts with
+            involved = set(x.name for x in (solver.failure_packages() or []))
+            dropped = involved & set(seeds)
+            if not dropped:
+                return None
+
+            for name in dropped:
+                del seeds[name]
+
+        return None
+
+    def _solve_request(self, package_requests):
+        solver = Solver(package_requests=package_requests,
                         package_paths=self.package_paths,
                         context=self.context,
                         package_filter=self.package_filter,
@@ -385,7 +706,13 @@ class Resolver(object):
                         building=self.building,
                         verbosity=self.verbosity,
                         prune_unfailed=config.prune_failed_graph,
+                        profile=self.profile,
+                        package_cache=self.package_cache,
                         buf=self.buf)
+
+        # later solves reuse the packages loaded by this one
+        self.package_cache = solver.package_cache
+
         solver.solve()
 
         return solver
@@ -393,10 +720,15 @@ class Resolver(object):
     def _set_result(self, solver_dict):
         self.status_ = solver_dict.get("status")
         self.graph_ = solver_dict.get("graph")
+        self.graph_data = None
         self.solve_time = solver_dict.get("solve_time")
         self.load_time = solver_dict.get("load_time")
         self.failure_description = solver_dict.get("failure_description")
 
+        if isinstance(self.graph_, dict):
+            self.graph_data = self.graph_
+            self.graph_ = None
+
         self.resolved_packages_ = None
         if self.status_ == ResolverStatus.solved:
             # convert solver.Variants to packages.Variants
@@ -407,7 +739,7 @@ class Resolver(object):
 
     @classmethod
     def _solver_to_dict(cls, solver):
-        graph_ = solver.get_graph()
+        graph_ = None
         solve_time = solver.solve_time
         load_time = solver.load_time
         failure_description = None
@@ -417,12 +749,18 @@ class Resolver(object):
         if st == SolverStatus.unsolved:
             status_ = ResolverStatus.aborted
             failure_description = solver.abort_reason
+            graph_ = solver.get_graph()
         elif st == SolverStatus.failed:
             status_ = ResolverStatus.failed
             failure_description = solver.failure_description()
+            graph_ = solver.get_graph()
         elif st == SolverStatus.solved:
             status_ = ResolverStatus.solved
 
+            # the graph of a successful solve is rarely needed, so only the
+            # data needed to create it is stored
+            graph_ = solver.get_graph_data()
+
             variant_handles = []
             for solver_variant in solver.resolved_packages:
                 variant_handle_dict = solver_variant.handle
@@ -185,6 +185,9 @@ class ActionManager(object):
         self.formatter = formatter or str
         self.actions = []
 
+        # if a dict, parent environ values read by rex code are recorded here
+        self.parent_environ_reads = None
+
         self._env_sep_map = env_sep_map if env_sep_map is not None \
             else config.env_var_separators
 
@@ -247,8 +250,10 @@ class ActionManager(object):
 
     def undefined(self, key):
         _, expanded_key = self._key(key)
-        return (expanded_key not in self.environ
-                and expanded_key not in self.parent_environ)
+        if expanded_key in self.environ:
+            return False
+        self._record_parent_read(expanded_key)
+        return (expanded_key not in self.parent_environ)
 
     def defined(self, key):
         return not self.undefined(key)
@@ -260,6 +265,8 @@ class ActionManager(object):
 
     def getenv(self, key):
         _, expanded_key = self._key(key)
+        if expanded_key not in self.environ:
+            self._record_parent_read(expanded_key)
         try:
             return self.environ[expanded_key] if expanded_key in self.environ \
                 else self.parent_environ[expanded_key]
@@ -404,9 +411,32 @@ class ActionManager(object):
         self.actions.append(Shebang())
         self.interpreter.shebang()
 
+    def apply_actions(self, actions):
+        """Apply actions previously recorded by another `ActionManager`.
+
+        Recorded values have already been formatted, so they are not formatted
+        again. They are expanded, and parent variables are appended/prepended
+        to, as usual.
+
+        Args:
+            actions (list of `Action`): Actions to apply.
+        """
+        formatter = self.formatter
+        self.formatter = lambda x: x
+
+        try:
+            for action in actions:
+                getattr(self, action.name)(*action.args)
+        finally:
+            self.formatter = formatter
+
     def _keytoken(self, key):
         return self.interpreter.get_key_token(key)
 
+    def _record_parent_read(self, key):
+        if self.parent_environ_reads is not None:
+            self.parent_environ_reads[key] = self.parent_environ.get(key)
+
 
 #===============================================================================
 # Interpreters
@@ -937,6 +967,8 @@ class EnvironmentDict(UserDict.DictMixin):
                                for k in manager.parent_environ.iterkeys())
 
     def keys(self):
+        for key in self.manager.parent_environ.iterkeys():
+            self.manager._record_parent_read(key)
         return self._var_cache.keys()
 
     def __repr__(self):
@@ -951,6 +983,7 @@ class EnvironmentDict(UserDict.DictMixin):
         self[key].set(value)
 
     def __contains__(self, key):
+        self.manager._record_parent_read(key)
         return (key in self._var_cache)
 
 
@@ -140,6 +140,41 @@ bind_module_path = []
 # would change the result of an existing resolve.
 resolve_caching = True
 
+# The backend used to cache resolves, if resolve_caching is enabled. One of:
+# - "memcached": Resolves are cached to the memcached server(s) listed in
+#   memcached_uri. No caching is done if memcached_uri is empty;
+# - "filesystem": Resolves are cached as files in a local directory (see
+#   resolve_cache_path). This is useful on hosts that have no access to a
+#   memcached server. Entries are invalidated in the same way as memcached
+#   entries.
+resolve_cache_backend = "memcached"
+
+# The directory used by the "filesystem" resolve cache backend. If None, a
+# 'rez_resolve_cache_<username>' directory under tmpdir is used. It is created
+# readable by its user only, and is not used if it is owned by another user or
+# is writable by others. Cache entries are pickled, so if you set this, it must
+# only be writable by users you trust.
+resolve_cache_path = None
+
+# The maximum number of entries kept by the "filesystem" resolve cache backend.
+# Least recently used entries are removed first. To avoid scanning the cache on
+# every write, entries are removed periodically, so the cache may briefly hold
+# about 10% more entries than this. Zero means unlimited.
+resolve_cache_max_entries = 10000
+
+# The maximum size in bytes of a resolve cache entry, after compression. Larger
+# resolves are not cached. The default is just under the default item size limit
+# of memcached (1Mb). Zero means unlimited.
+resolve_cache_max_entry_size = 1000000
+
+# The number of threads used to validate a resolve cache entry. Before a cached
+# resolve is used, the state of each of its packages, and the latest release
+# time of each package family, are checked so that stale entries are discarded.
+# These checks are done in parallel, rather than one at a time, which can greatly
+# reduce the cost of a cache hit when packages are on network storage, such as
+# NFS. Zero disables concurrent checks.
+resolve_cache_validation_threads = 0
+
 # Cache package file reads to memcached, if enabled. Updated package files will
 # still be read correctly (ie, the cache invalidates when the filesystem
 # changes).
@@ -150,6 +185,43 @@ cache_package_files = True
 # changes).
 cache_listdir = True
 
+# Cache context file (.rxt) reads to memcached, if enabled. Updated context files
+# will still be read correctly (ie, the cache invalidates when the filesystem
+# changes).
+cache_context_files = True
+
+# Cache the environment changes made by the packages in a saved context, if
+# enabled. The cache is stored alongside the context file (as
+# '<context>.rxt.environ') and reused when the context is applied again, for
+# example each time a suite tool is run, so that package commands are not
+# re-executed. The cache is invalidated if the context file changes, if any
+# resolved package's definition file changes, or if the value of any environment
+# variable read by the package commands changes. Note that changes to anything
+# else the package commands depend on - such as files they read, or environment
+# variables read via os.environ rather than rex - are NOT detected, and a stale
+# cache file can be removed by deleting '<context>.rxt.environ'.
+context_environ_caching = False
+
+# If True, saved contexts (.rxt files) contain the package definitions of their
+# resolved variants, so that loading the context does not access any package
+# repositories. This makes loading contexts faster, especially for large
+# resolves or slow repositories, at the cost of larger context files. Note that
+# changes made to a package definition after the context was saved are not seen
+# by such contexts.
+context_embed_variants = False
+
+# If True, variants embedded in saved contexts (see 'context_embed_variants')
+# are ignored, and loaded from their package repositories instead.
+context_verify_embedded_variants = False
+
+# Directory used to cache compiled python code, such as package commands. If
+# set, code compiled in one rez process is reused by others, which saves time
+# when many packages' commands are executed (for example, in rez-env). Entries
+# are keyed on the source code, rez version and python version. If None, code
+# is only cached in memory. It is highly recommended that this be set to local
+# storage.
+sourcecode_cache_path = None
+
 # The size of the local (in-process) resource cache. Resources include package
 # families, packages and variants. A value of 0 disables caching; -1 sets a cache
 # of unlimited size. The size refers to the number of entries, not byte count.
@@ -172,8 +244,9 @@ memcached_context_file_min_compress_len = 1
 # Zero means never compress.
 memcached_listdir_min_compress_len = 16384
 
-# Bytecount beyond which memcached entries are compressed, for resolves. Zero
-# means never compress.
+# Bytecount beyond which resolve cache entries are compressed. This applies to
+# all resolve cache backends (see resolve_cache_backend). Zero means never
+# compress.
 memcached_resolve_min_compress_len = 1
 
 
@@ -246,6 +319,22 @@ prune_failed_graph = True
 # original request (burgle).
 variant_select_mode = "version_priority"
 
+# The number of threads the solver uses to load package families concurrently.
+# When new packages are added to a resolve, their families (and the packages in
+# the requested version ranges) are loaded in parallel, rather than one at a
+# time. This can greatly reduce resolve times when packages are on network
+# storage, such as NFS. Zero disables concurrent loading.
+solver_prefetch_threads = 0
+
+# The number of processes used to speculatively solve branches of a resolve.
+# Whenever the solver has to choose between packages, the alternative choices
+# are solved in parallel in these processes, so that if the solver later
+# backtracks to them, their result is already known. This can greatly reduce
+# the time taken by difficult or failing resolves, and gives the same result
+# as a normal resolve. Only used on platforms that support fork (ie, not
+# Windows). Zero disables speculative solving.
+solver_branch_processes = 0
+
 # Package filter. One or more filters can be listed, each with a list of
 # exclusion and inclusion rules. These filters are applied to each package
 # during a resolve, and if any filter excludes a package, that package is not
@@ -481,7 +570,7 @@ debug_resources = False
 # Print packages that are excluded from the resolve, and the filter rule responsible.
 debug_package_exclusions = False
 
-# Print debugging info related to use of memcached during a resolve
+# Print debugging info related to use of the resolve cache during a resolve
 debug_resolve_memcache = False
 
 # Debug memcache usage. As well as printing debugging info to stdout, it also
@@ -119,6 +119,7 @@ There are 2 notable points missing from the pseudocode, related to optimisations
 from rez.config import config
 from rez.packages_ import iter_packages
 from rez.package_repository import package_repo_stats
+from rez.utils import get_thread_pool, clear_thread_pools
 from rez.utils.logging_ import print_debug
 from rez.utils.data_utils import cached_property
 from rez.vendor.pygraph.classes.digraph import digraph
@@ -130,9 +131,11 @@ from rez.vendor.version.version import Version, VersionRange
 from rez.vendor.version.requirement import VersionedObject, Requirement, \
     RequirementList
 from rez.vendor.enum import Enum
+import signal
 import copy
 import time
 import sys
+import os
 
 
 class VariantSelectMode(Enum):
@@ -214,6 +217,52 @@ class _Printer(object):
         return self.verbosity
 
 
+class _OperationTimer(object):
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.start_time = None
+
+    def __enter__(self):
+        self.start_time = time.time()
+
+    def __exit__(self, *args):
+        self.count += 1
+        self.time += time.time() - self.start_time
+
+
+class _NullTimer(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+class _Profiler(object):
+    """Records where time is spent during a solve, see `Solver.get_profile`.
+
+    Usage: `with profiler("intersect"): ...`. Does nothing if not enabled.
+    """
+    operations = ("extract", "intersect", "add", "reduce", "split", "prefetch")
+    null_timer = _NullTimer()
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.timers = dict((x, _OperationTimer()) for x in self.operations)
+        self.family_load_times = {}
+
+    def add_family_load_time(self, package_name, secs):
+        self.family_load_times[package_name] = \
+            self.family_load_times.get(package_name, 0.0) + secs
+
+    def __call__(self, operation):
+        return self.timers[operation] if self.enabled else self.null_timer
+
+    def __nonzero__(self):
+        return self.enabled
+
+
 class SolverState(object):
     """Represent the current state of the solver instance for use with a
     callback.
@@ -487,31 +536,38 @@ class _PackageEntry(object):
             here as a safety measure so that sorting is guaranteed repeatable
             regardless.
         """
-        from rez.package_order import get_orderer
-
         if self.sorted:
             return
 
+        solver = self.solver
+        sort_keys = solver.variant_sort_keys
+
         def key(variant):
+            # the key only depends on the variant, the request and the package
+            # orderers, so it is calculated once per variant per solve
+            variant_id = (variant.name, variant.version, variant.index)
+            k = sort_keys.get(variant_id)
+            if k is None:
+                k = _key(variant)
+                sort_keys[variant_id] = k
+            return k
+
+        def _key(variant):
             requested_key = []
             names = set()
 
-            for i, request in enumerate(self.solver.request_list):
-                if not request.conflict:
-                    req = variant.requires_list.get(request.name)
-                    if req is not None:
-                        orderer = get_orderer(req.name,
-                                              self.solver.package_orderers or {})
-                        range_key = orderer.sort_key(req.name, req.range)
-                        requested_key.append((-i, range_key))
-                        names.add(req.name)
+            for i, name in solver.request_indices:
+                req = variant.requires_list.get(name)
+                if req is not None:
+                    range_key = solver._range_sort_key(req.name, req.range)
+                    requested_key.append((-i, range_key))
+                    names.add(req.name)
 
             additional_key = []
             for request in variant.requires_list:
                 if not request.conflict and request.name not in names:
-                    orderer = get_orderer(request.name,
-                                          self.solver.package_orderers or {})
-                    range_key = orderer.sort_key(request.name, request.range)
+                    range_key = solver._range_sort_key(request.name,
+                                                       request.range)
                     additional_key.append((range_key, request.name))
 
             if (VariantSelectMode[config.variant_select_mode] ==
@@ -556,6 +612,15 @@ class _PackageVariantList(_Common):
                 "package family not found: %s (searched: %s)"
                 % (package_name, "; ".join(self.solver.package_paths)))
 
+        # entry indices and versions in ascending version order, so that
+        # intersections can be done with a binary search
+        def _key(i):
+            return self.entries[i][0].version.sort_key
+
+        self.sorted_indices = sorted(range(len(self.entries)), key=_key)
+        self.sorted_versions = [self.entries[i][0].version
+                                for i in self.sorted_indices]
+
     def get_intersection(self, range_):
         """Get a list of variants that intersect with the given range.
 
@@ -566,16 +631,20 @@ class _PackageVariantList(_Common):
             List of `_PackageEntry` objects.
         """
         result = []
+        indices = []
 
-        for entry in self.entries:
+        for start, stop in range_.intersecting_slices(self.sorted_versions):
+            indices.extend(self.sorted_indices[start:stop])
+
+        # entries are visited in their original order, so that the result
+        # does not depend on how the intersection was found
+        for i in sorted(indices):
+            entry = self.entries[i]
             package, value = entry
 
             if value is None:
                 continue  # package was blocked by package filters
 
-            if package.version not in range_:
-                continue
-
             if isinstance(value, list):
                 variants = value
                 entry_ = _PackageEntry(package, variants, self.solver)
@@ -596,11 +665,16 @@ class _PackageVariantList(_Common):
             if self.solver.package_load_callback:
                 self.solver.package_load_callback(package)
 
+            t1 = time.time()
             variants_ = []
             for var in package.iter_variants():
                 variant = PackageVariant(var, self.solver.building)
                 variants_.append(variant)
 
+            if self.solver.profiler:
+                self.solver.profiler.add_family_load_time(
+                    self.package_name, time.time() - t1)
+
             entry[1] = variants_
             entry_ = _PackageEntry(package, variants_, self.solver)
             result.append(entry_)
@@ -659,6 +733,7 @@ class _PackageVariantSlice(_Common):
         self._range = None
         self._fam_requires = None
         self._common_fams = None
+        self._variant_ids = None
 
     @property
     def pr(self):
@@ -681,6 +756,13 @@ class _PackageVariantSlice(_Common):
         self._update_fam_info()
         return self._common_fams
 
+    @property
+    def variant_ids(self):
+        """Frozenset of the identities of the variants in this slice."""
+        if self._variant_ids is None:
+            self._variant_ids = frozenset(id(x) for x in self.iter_variants())
+        return self._variant_ids
+
     @property
     def extractable(self):
         """True if there are possible remaining extractions."""
@@ -841,7 +923,7 @@ class _PackageVariantSlice(_Common):
             if result:
                 entry, next_entry = result
                 entries = self.entries[:i_entry] + [entry]
-                next_entries = [next_entry] + self.entries[i_entry:]
+                next_entries = [next_entry] + self.entries[i_entry + 1:]
             else:
                 entries = self.entries[:i_entry + 1]
                 next_entries = self.entries[i_entry + 1:]
@@ -901,13 +983,10 @@ class _PackageVariantSlice(_Common):
         The order is typically descending, but package order functions can
         change this.
         """
-        from rez.package_order import get_orderer
-
         if self.sorted:
             return
 
-        orderer = get_orderer(self.package_name,
-                              self.solver.package_orderers or {})
+        orderer = self.solver._get_orderer(self.package_name)
         def sort_key(entry):
             return orderer.sort_key(entry.package.name, entry.version)
         self.entries = sorted(self.entries, key=sort_key, reverse=True)
@@ -984,11 +1063,158 @@ class _PackageVariantSlice(_Common):
         return s + strextr
 
 
+class _BranchWorker(object):
+    """A process that solves branches of a resolve, see `Solver._speculate`.
+
+    The process is forked from the solving process, so it has a copy of the
+    solver as it was at that time, and nothing needs to be pickled other than
+    branch paths and results.
+    """
+    def __init__(self, solver):
+        from multiprocessing import Pipe, Process
+
+        self.conn, child_conn = Pipe()
+        self.branch_path = None  # the branch being solved, if any
+        self.alive = True
+        self.process = Process(target=self._run, args=(solver, child_conn))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+
+    def solve(self, branch_path):
+        self.branch_path = branch_path
+        self.conn.send(branch_path)
+
+    def ready(self):
+        return (self.branch_path is not None) and self.conn.poll()
+
+    def get_result(self):
+        """Wait for the current branch to be solved.
+
+        Returns:
+            2-tuple: The branch path, and the result of `Solver._solve_branch`
+            (or None if the branch could not be solved in this process).
+        """
+        branch_path = self.branch_path
+        self.branch_path = None
+        try:
+            result = self.conn.recv()
+        except EOFError:  # the process has died
+            self.alive = False
+            result = None
+        return branch_path, result
+
+    def stop(self):
+        # SIGKILL rather than SIGTERM, since the process may have inherited
+        # the rez cli's SIGTERM handler, which kills the whole process group
+        os.kill(self.process.pid, signal.SIGKILL)
+        self.process.join()
+        self.conn.close()
+
+    @classmethod
+    def _run(cls, solver, conn):
+        from rez.utils.memcached import scoped_instance_manager
+
+        # ctrl-C is handled by the parent, which stops this process
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        # thread pools and memcached connections can't be shared with the
+        # parent process
+        clear_thread_pools()
+        scoped_instance_manager.clients = {}
+
+        solver.pr = _Printer(0)
+        solver.profiler = _Profiler()
+        solver.callback = None
+        solver.package_load_callback = None
+        solver.branch_processes = 0
+        solver.branch_workers = None
+
+        while True:
+            branch_path = conn.recv()
+            try:
+                result = solver._solve_branch(branch_path)
+            except Exception:
+                # the parent solves the branch itself, and gets the error
+                result = None
+            conn.send(result)
+
+
 class PackageVariantCache(object):
+    """Package families loaded during a solve.
+
+    A cache can be reused by later solves (see the `Solver` 'package_cache'
+    argument), so that package families are only loaded once. Solves sharing
+    a cache must use the same package paths, package filter and building flag,
+    since these affect which variants are loaded.
+    """
     def __init__(self, solver):
         self.solver = solver
         self.variant_lists = {}  # {package-name: _PackageVariantList}
 
+    def set_solver(self, solver):
+        """Reuse the cache in another solve.
+
+        Args:
+            solver (`Solver`): Solver that uses the cache from now on.
+        """
+        self.solver = solver
+        for variant_list in self.variant_lists.itervalues():
+            variant_list.solver = solver
+            for package, _ in variant_list.entries:
+                package.set_context(solver.context)
+
+    def prefetch(self, package_requests):
+        """Load package families concurrently, ahead of their use.
+
+        Package families that are not already loaded are loaded in a thread
+        pool, along with the requirements of their packages that are within
+        the requested range. This reduces the time spent waiting on package
+        loads, which are I/O bound. Does nothing if the
+        'solver_prefetch_threads' setting is zero.
+
+        Args:
+            package_requests (list of `Requirement`): Packages about to be
+                added to the resolve.
+        """
+        if config.solver_prefetch_threads < 1:
+            return
+
+        requests = [x for x in package_requests
+                    if not x.conflict and x.name not in self.variant_lists]
+        if not requests:
+            return
+
+        def _load_family(package_request):
+            try:
+                return _PackageVariantList(package_request.name, self.solver)
+            except PackageFamilyNotFoundError:
+                # raised again when the solver loads the family itself
+                return None
+
+        def _load_package(package):
+            try:
+                package.resource.requires
+                package.resource.variants
+            except Exception:
+                # errors are raised again when the solver loads the package
+                pass
+
+        pool = get_thread_pool("solver_prefetch_threads")
+
+        with package_repo_stats.package_loading():
+            variant_lists = pool.map(_load_family, requests)
+            packages = []
+
+            for package_request, variant_list in zip(requests, variant_lists):
+                if variant_list is not None:
+                    self.variant_lists[package_request.name] = variant_list
+                    packages.extend(
+                        package for package, _ in variant_list.entries
+                        if package.version in package_request.range)
+
+            pool.map(_load_package, packages)
+
     def get_variant_slice(self, package_name, range_):
         """Get a list of variants from the cache.
 
@@ -1002,9 +1228,14 @@ class PackageVariantCache(object):
         variant_list = self.variant_lists.get(package_name)
 
         if variant_list is None:
+            t1 = time.time()
             variant_list = _PackageVariantList(package_name, self.solver)
             self.variant_lists[package_name] = variant_list
 
+            if self.solver.profiler:
+                self.solver.profiler.add_family_load_time(
+                    package_name, time.time() - t1)
+
         entries = variant_list.get_intersection(range_)
         if not entries:
             return None
@@ -1176,6 +1407,55 @@ class _PackageScope(_Common):
             else str(self.package_request)
 
 
+class _Nogood(_Common):
+    """A set of package scopes that are known to be jointly unsatisfiable.
+
+    Nogoods are learned from failed phases. They contain only those scopes of
+    the phase (as they were before it was solved) that the failure can be
+    traced back to. Any later phase containing, for every family in the
+    nogood, a scope whose variants are a subset of the nogood's variants for
+    that family, must also fail - so the solver can discard it without running
+    extract/intersect/reduce on it.
+
+    Conflict scopes are not recorded. These only ever come from the initial
+    request, which every phase in a solve shares (possibly narrowed into a
+    real scope), so they cannot make a phase any less constrained.
+    """
+    def __init__(self, scopes, phase):
+        """
+        Args:
+            scopes (list of `_PackageScope`): Scopes the failure depends on.
+            phase (`_ResolvePhase`): The failed phase.
+        """
+        self.phase = phase
+        self.variant_ids = {}  # {package-name: frozenset of variant ids}
+
+        for scope in scopes:
+            if not scope.is_conflict:
+                self.variant_ids[scope.package_name] = \
+                    scope.variant_slice.variant_ids
+
+    def subsumes(self, scopes):
+        """Test whether the given scopes are known to be unsatisfiable.
+
+        Args:
+            scopes (dict): Scopes to test, keyed by package name.
+
+        Returns:
+            True if this nogood applies to the scopes.
+        """
+        for package_name, variant_ids in self.variant_ids.iteritems():
+            scope = scopes.get(package_name)
+            if scope is None or scope.is_conflict:
+                return False
+            if not scope.variant_slice.variant_ids.issubset(variant_ids):
+                return False
+        return True
+
+    def __str__(self):
+        return str(self.phase.failure_reason)
+
+
 def _get_dependency_order(g, node_list):
     """Return list of nodes as close as possible to the ordering in node_list,
     but with child nodes earlier in the list than parents."""
@@ -1218,10 +1498,17 @@ class _ResolvePhase(_Common):
     def __init__(self, solver):
         self.solver = solver
         self.failure_reason = None
+        self.nogood = None
         self.extractions = {}
         self.status = SolverStatus.pending
 
+        # the split choices (0 for the first phase, 1 for the next phase) that
+        # lead to this phase from the initial phase
+        self.branch_path = ()
+
         self.scopes = []
+        self.solver._prefetch(self.solver.request_list.requirements)
+
         for package_request in self.solver.request_list:
             scope = _PackageScope(package_request, solver=solver)
             self.scopes.append(scope)
@@ -1245,14 +1532,26 @@ class _ResolvePhase(_Common):
         failure_reason = None
         extractions = {}
         pending_reducts = self.pending_reducts.copy()
+        prof = self.solver.profiler
+
+        # For each scope, the names of the scopes in this phase's initial state
+        # that have contributed to its current state. On failure, only these
+        # initial scopes are needed to reproduce the conflict, and so they are
+        # recorded as a nogood.
+        origins = [set([x.package_name]) for x in scopes]
 
-        def _create_phase(status=None):
+        def _create_phase(status=None, conflict_origins=None):
             phase = copy.copy(self)
             phase.scopes = scopes
             phase.failure_reason = failure_reason
             phase.extractions = extractions
             phase.pending_reducts = set()
 
+            if conflict_origins:
+                origin_scopes = [x for x in self.scopes
+                                 if x.package_name in conflict_origins]
+                phase.nogood = _Nogood(origin_scopes, phase)
+
             if status is None:
                 phase.status = (SolverStatus.solved if phase._is_solved()
                                 else SolverStatus.exhausted)
@@ -1265,15 +1564,19 @@ class _ResolvePhase(_Common):
             while True:
                 self.pr.subheader("EXTRACTING:")
                 common_requests = []
+                request_origins = {}
 
                 for i in range(len(scopes)):
                     while True:
-                        scope_, common_request = scopes[i].extract()
+                        with prof("extract"):
+                            scope_, common_request = scopes[i].extract()
                         if common_request:
                             common_requests.append(common_request)
                             k = (scopes[i].package_name, common_request.name)
                             extractions[k] = common_request
                             scopes[i] = scope_
+                            request_origins.setdefault(
+                                common_request.name, set()).update(origins[i])
                         else:
                             break
 
@@ -1284,7 +1587,8 @@ class _ResolvePhase(_Common):
                         req1, req2 = request_list.conflict
                         conflict = DependencyConflict(req1, req2)
                         failure_reason = DependencyConflicts([conflict])
-                        return _create_phase(SolverStatus.failed)
+                        return _create_phase(SolverStatus.failed,
+                                             request_origins[req1.name])
                     else:
                         if self.pr:
                             self.pr("merged extractions are: %s", request_list)
@@ -1296,16 +1600,21 @@ class _ResolvePhase(_Common):
                     for i, scope in enumerate(scopes):
                         req = request_list.get(scope.package_name)
                         if req is not None:
-                            scope_ = scope.intersect(req.range)
+                            with prof("intersect"):
+                                scope_ = scope.intersect(req.range)
                             req_fams.append(req.name)
 
                             if scope_ is None:
                                 conflict = DependencyConflict(
                                     req, scope.package_request)
                                 failure_reason = DependencyConflicts([conflict])
-                                return _create_phase(SolverStatus.failed)
+                                return _create_phase(
+                                    SolverStatus.failed,
+                                    origins[i] | request_origins[req.name])
                             elif scope_ is not scope:
                                 scopes[i] = scope_
+                                origins[i] = origins[i] | \
+                                    request_origins[req.name]
                                 for j in range(len(scopes)):
                                     if j != i:
                                         pending_reducts.add((i, j))
@@ -1316,11 +1625,14 @@ class _ResolvePhase(_Common):
 
                     if new_reqs:
                         self.pr.subheader("ADDING:")
+                        self.solver._prefetch(new_reqs)
                         n = len(scopes)
 
                         for req in new_reqs:
-                            scope = _PackageScope(req, solver=self.solver)
+                            with prof("add"):
+                                scope = _PackageScope(req, solver=self.solver)
                             scopes.append(scope)
+                            origins.append(set(request_origins[req.name]))
                             if self.pr:
                                 self.pr("added %s", scope)
 
@@ -1356,14 +1668,17 @@ class _ResolvePhase(_Common):
                 # the sort here gives reproducible results, since order of
                 # reducts affects the result
                 for i, j in sorted(pending_reducts):
-                    new_scope, reductions = scopes[j].reduce_by(
-                        scopes[i].package_request)
+                    with prof("reduce"):
+                        new_scope, reductions = scopes[j].reduce_by(
+                            scopes[i].package_request)
 
                     if new_scope is None:
                         failure_reason = TotalReduction(reductions)
-                        return _create_phase(SolverStatus.failed)
+                        return _create_phase(SolverStatus.failed,
+                                             origins[i] | origins[j])
                     elif new_scope is not scopes[j]:
                         scopes[j] = new_scope
+                        origins[j] = origins[j] | origins[i]
                         for i in range(len(scopes)):
                             if i != j:
                                 new_pending_reducts.add((j, i))
@@ -1465,6 +1780,9 @@ class _ResolvePhase(_Common):
 
         next_phase = copy.copy(phase)
         next_phase.scopes = next_scopes
+
+        phase.branch_path = self.branch_path + (0,)
+        next_phase.branch_path = self.branch_path + (1,)
         return (phase, next_phase)
 
     def get_graph(self):
@@ -1477,231 +1795,49 @@ class _ResolvePhase(_Common):
         Returns:
             A pygraph.digraph object.
         """
-        g = digraph()
-        scopes = dict((x.package_name, x) for x in self.scopes)
-        failure_nodes = set()
-        request_nodes = {}  # (request, node_id)
-        scope_nodes = {}  # (package_name, node_id)
-
-        # -- graph creation basics
-
-        node_color = "#F6F6F6"
-        request_color = "#FFFFAA"
-        solved_color = "#AAFFAA"
-        node_fontsize = 10
-        counter = [1]
-
-        def _uid():
-            id_ = counter[0]
-            counter[0] += 1
-            return "_%d" % id_
-
-        def _add_edge(id1, id2, arrowsize=0.5):
-            e = (id1, id2)
-            if g.has_edge(e):
-                g.del_edge(e)
-            g.add_edge(e)
-            g.add_edge_attribute(e, ("arrowsize", str(arrowsize)))
-            return e
-
-        def _add_extraction_merge_edge(id1, id2):
-            e = _add_edge(id1, id2, 1)
-            g.add_edge_attribute(e, ("arrowhead", "odot"))
-
-        def _add_conflict_edge(id1, id2):
-            e = _add_edge(id1, id2, 1)
-            g.set_edge_label(e, "CONFLICT")
-            g.add_edge_attribute(e, ("style", "bold"))
-            g.add_edge_attribute(e, ("color", "red"))
-            g.add_edge_attribute(e, ("fontcolor", "red"))
-
-        def _add_cycle_edge(id1, id2):
-            e = _add_edge(id1, id2, 1)
-            g.set_edge_label(e, "CYCLE")
-            g.add_edge_attribute(e, ("style", "bold"))
-            g.add_edge_attribute(e, ("color", "red"))
-            g.add_edge_attribute(e, ("fontcolor", "red"))
-
-        def _add_reduct_edge(id1, id2, label):
-            e = _add_edge(id1, id2, 1)
-            g.set_edge_label(e, label)
-            g.add_edge_attribute(e, ("fontsize", node_fontsize))
-
-        def _add_node(label, color, style):
-            attrs = [("label", label),
-                     ("fontsize", node_fontsize),
-                     ("fillcolor", color),
-                     ("style", '"%s"' % style)]
-            id_ = _uid()
-            g.add_node(id_, attrs=attrs)
-            return id_
-
-        def _add_request_node(request, initial_request=False):
-            id_ = request_nodes.get(request)
-            if id_ is not None:
-                return id_
-
-            label = str(request)
-            if initial_request:
-                color = request_color
-            else:
-                color = node_color
-
-            id_ = _add_node(label, color, "filled,dashed")
-            request_nodes[request] = id_
-            return id_
-
-        def _add_scope_node(scope):
-            id_ = scope_nodes.get(scope.package_name)
-            if id_ is not None:
-                return id_
-
+        scopes = []
+        for scope in self.scopes:
             variant = scope._get_solved_variant()
             if variant:
-                label = str(variant)
-                color = solved_color
-                style = "filled"
-            elif scope.is_conflict:
-                label = str(scope)
-                color = node_color
-                style = "filled,dashed"
+                scopes.append((scope.package_name, scope.package_request,
+                               str(variant), variant.requires_list.requirements))
             else:
-                label = str(scope)
-                color = node_color
-                style = "filled"
-
-            id_ = _add_node(label, color, style)
-            scope_nodes[scope.package_name] = id_
-            return id_
-
-        def _add_reduct_node(request):
-            return _add_node(str(request), node_color, "filled,dashed")
-
-        # -- generate the graph
-
-        # create initial request nodes
-        for request in self.solver.request_list:
-            _add_request_node(request, True)
+                scopes.append((scope.package_name, scope.package_request,
+                               str(scope), None))
 
-        # create scope nodes
-        for scope in self.scopes:
-            if scope.is_conflict:
-                id1 = request_nodes.get(scope.package_request)
-                if id1 is not None:
-                    # special case - a scope that matches an initial conflict request,
-                    # we switch nodes so the request node becomes a scope node
-                    scope_nodes[scope.package_name] = id1
-                    del request_nodes[scope.package_request]
-                    continue
+        return _create_graph(request_list=self.solver.request_list,
+                             scopes=scopes,
+                             extractions=self.extractions,
+                             failure_reason=self.failure_reason,
+                             prune_unfailed=self.solver.prune_unfailed)
 
-            _add_scope_node(scope)
+    def get_graph_data(self):
+        """Get the data needed to create the resolve graph of a solved phase.
 
-        # create (initial request -> scope) edges
-        for request in self.solver.request_list:
-            id1 = request_nodes.get(request)
-            if id1 is not None:
-                id2 = scope_nodes.get(request.name)
-                if id2 is not None:
-                    _add_edge(id1, id2)
+        This is far cheaper than creating the graph itself, and much smaller
+        to store. Use `get_graph_from_data` to create the graph.
 
-        # for solved scopes, create (scope -> requirement) edge
+        Returns:
+            dict: Graph data, made of basic types only.
+        """
+        scopes = []
         for scope in self.scopes:
             variant = scope._get_solved_variant()
             if variant:
-                id1 = scope_nodes[scope.package_name]
-
-                for request in variant.requires_list.requirements:
-                    id2 = _add_request_node(request)
-                    _add_edge(id1, id2)
-
-        # add extractions
-        for (src_fam, _), dest_req in self.extractions.iteritems():
-            id1 = scope_nodes.get(src_fam)
-            if id1 is not None:
-                id2 = _add_request_node(dest_req)
-                _add_edge(id1, id2)
-
-        # add extraction intersections
-        extracted_fams = set(x[1] for x in self.extractions.iterkeys())
-        for fam in extracted_fams:
-            requests = [v for k, v in self.extractions.iteritems() if k[1] == fam]
-            if len(requests) > 1:
-                reqlist = RequirementList(requests)
-                if not reqlist.conflict:
-                    merged_request = reqlist.get(fam)
-                    for request in requests:
-                        if merged_request != request:
-                            id1 = _add_request_node(request)
-                            id2 = _add_request_node(merged_request)
-                            _add_extraction_merge_edge(id1, id2)
-
-        # add conflicts
-        fr = self.failure_reason
-        if fr:
-            if isinstance(fr, DependencyConflicts):
-                for conflict in fr.conflicts:
-                    id1 = _add_request_node(conflict.dependency)
-                    id2 = scope_nodes.get(conflict.conflicting_request.name)
-                    if id2 is None:
-                        id2 = _add_request_node(conflict.conflicting_request)
-                    _add_conflict_edge(id1, id2)
-
-                    failure_nodes.add(id1)
-                    failure_nodes.add(id2)
-            elif isinstance(fr, TotalReduction):
-                if len(fr.reductions) == 1:
-                    # special case - singular total reduction
-                    reduct = fr.reductions[0]
-                    id1 = scope_nodes[reduct.name]
-                    id2 = _add_request_node(reduct.dependency)
-                    id3 = scope_nodes[reduct.conflicting_request.name]
-                    _add_edge(id1, id2)
-                    _add_conflict_edge(id2, id3)
+                requires = [str(x) for x in variant.requires_list.requirements]
+                scopes.append([scope.package_name, str(scope.package_request),
+                               str(variant), requires])
+            else:
+                scopes.append([scope.package_name, str(scope.package_request),
+                               str(scope), None])
 
-                    failure_nodes.add(id1)
-                    failure_nodes.add(id2)
-                    failure_nodes.add(id3)
-                else:
-                    for reduct in fr.reductions:
-                        id1 = scope_nodes[reduct.name]
-                        id2 = _add_reduct_node(reduct.dependency)
-                        id3 = scope_nodes[reduct.conflicting_request.name]
-                        _add_reduct_edge(id1, id2, reduct.reducee_str())
-                        _add_conflict_edge(id2, id3)
-
-                        failure_nodes.add(id1)
-                        failure_nodes.add(id2)
-                        failure_nodes.add(id3)
-            elif isinstance(fr, Cycle):
-                for i, pkg in enumerate(fr.packages):
-                    id1 = scope_nodes[pkg.name]
-                    failure_nodes.add(id1)
-                    pkg2 = fr.packages[(i + 1) % len(fr.packages)]
-                    id2 = scope_nodes[pkg2.name]
-                    _add_cycle_edge(id1, id2)
-
-        # connect leaf-node requests to a matching scope, if any
-        for request, id1 in request_nodes.iteritems():
-            if not g.neighbors(id1):  # leaf node
-                id2 = scope_nodes.get(request.name)
-                if id2 is not None:
-                    scope = scopes.get(request.name)
-                    if not request.conflicts_with(scope.package_request):
-                        _add_edge(id1, id2)
-
-        # prune nodes not related to failure
-        if self.solver.prune_unfailed and failure_nodes:
-            access_dict = accessibility(g)
-            del_nodes = set()
-
-            for n, access_nodes in access_dict.iteritems():
-                if not (set(access_nodes) & failure_nodes):
-                    del_nodes.add(n)
-
-            for n in del_nodes:
-                g.del_node(n)
+        extractions = [[src_fam, dest_fam, str(dest_req)]
+                       for (src_fam, dest_fam), dest_req
+                       in self.extractions.iteritems()]
 
-        return g
+        return dict(request=[str(x) for x in self.solver.request_list],
+                    scopes=scopes,
+                    extractions=extractions)
 
     def _get_minimal_graph(self):
         if not self._is_solved():
@@ -1750,6 +1886,258 @@ class _ResolvePhase(_Common):
         return ' '.join(str(x) for x in self.scopes)
 
 
+def get_graph_from_data(data):
+    """Create a resolve graph from graph data.
+
+    Args:
+        data (dict): Graph data, as returned by `Solver.get_graph_data`.
+
+    Returns:
+        A pygraph.digraph object.
+    """
+    request_list = [Requirement(x) for x in data["request"]]
+    extractions = dict(((src_fam, dest_fam), Requirement(dest_req))
+                       for src_fam, dest_fam, dest_req in data["extractions"])
+    scopes = []
+
+    for package_name, package_request, label, requires in data["scopes"]:
+        if requires is not None:
+            requires = [Requirement(x) for x in requires]
+        scopes.append((package_name, Requirement(package_request), label,
+                       requires))
+
+    return _create_graph(request_list=request_list,
+                         scopes=scopes,
+                         extractions=extractions)
+
+
+def _create_graph(request_list, scopes, extractions, failure_reason=None,
+                  prune_unfailed=False):
+    # `scopes` is a list of (package name, package request, label, requires)
+    # tuples, where 'requires' is the requirements of the solved variant, or
+    # None if the scope is not solved
+    g = digraph()
+    scope_requests = dict((x[0], x[1]) for x in scopes)
+    failure_nodes = set()
+    request_nodes = {}  # (request, node_id)
+    scope_nodes = {}  # (package_name, node_id)
+
+    # -- graph creation basics
+
+    node_color = "#F6F6F6"
+    request_color = "#FFFFAA"
+    solved_color = "#AAFFAA"
+    node_fontsize = 10
+    counter = [1]
+
+    def _uid():
+        id_ = counter[0]
+        counter[0] += 1
+        return "_%d" % id_
+
+    def _add_edge(id1, id2, arrowsize=0.5):
+        e = (id1, id2)
+        if g.has_edge(e):
+            g.del_edge(e)
+        g.add_edge(e)
+        g.add_edge_attribute(e, ("arrowsize", str(arrowsize)))
+        return e
+
+    def _add_extraction_merge_edge(id1, id2):
+        e = _add_edge(id1, id2, 1)
+        g.add_edge_attribute(e, ("arrowhead", "odot"))
+
+    def _add_conflict_edge(id1, id2):
+        e = _add_edge(id1, id2, 1)
+        g.set_edge_label(e, "CONFLICT")
+        g.add_edge_attribute(e, ("style", "bold"))
+        g.add_edge_attribute(e, ("color", "red"))
+        g.add_edge_attribute(e, ("fontcolor", "red"))
+
+    def _add_cycle_edge(id1, id2):
+        e = _add_edge(id1, id2, 1)
+        g.set_edge_label(e, "CYCLE")
+        g.add_edge_attribute(e, ("style", "bold"))
+        g.add_edge_attribute(e, ("color", "red"))
+        g.add_edge_attribute(e, ("fontcolor", "red"))
+
+    def _add_reduct_edge(id1, id2, label):
+        e = _add_edge(id1, id2, 1)
+        g.set_edge_label(e, label)
+        g.add_edge_attribute(e, ("fontsize", node_fontsize))
+
+    def _add_node(label, color, style):
+        attrs = [("label", label),
+                 ("fontsize", node_fontsize),
+                 ("fillcolor", color),
+                 ("style", '"%s"' % style)]
+        id_ = _uid()
+        g.add_node(id_, attrs=attrs)
+        return id_
+
+    def _add_request_node(request, initial_request=False):
+        id_ = request_nodes.get(request)
+        if id_ is not None:
+            return id_
+
+        label = str(request)
+        if initial_request:
+            color = request_color
+        else:
+            color = node_color
+
+        id_ = _add_node(label, color, "filled,dashed")
+        request_nodes[request] = id_
+        return id_
+
+    def _add_scope_node(package_name, package_request, label, requires):
+        id_ = scope_nodes.get(package_name)
+        if id_ is not None:
+            return id_
+
+        if requires is not None:
+            color = solved_color
+            style = "filled"
+        elif package_request.conflict:
+            color = node_color
+            style = "filled,dashed"
+        else:
+            color = node_color
+            style = "filled"
+
+        id_ = _add_node(label, color, style)
+        scope_nodes[package_name] = id_
+        return id_
+
+    def _add_reduct_node(request):
+        return _add_node(str(request), node_color, "filled,dashed")
+
+    # -- generate the graph
+
+    # create initial request nodes
+    for request in request_list:
+        _add_request_node(request, True)
+
+    # create scope nodes
+    for package_name, package_request, label, requires in scopes:
+        if package_request.conflict:
+            id1 = request_nodes.get(package_request)
+            if id1 is not None:
+                # special case - a scope that matches an initial conflict request,
+                # we switch nodes so the request node becomes a scope node
+                scope_nodes[package_name] = id1
+                del request_nodes[package_request]
+                continue
+
+        _add_scope_node(package_name, package_request, label, requires)
+
+    # create (initial request -> scope) edges
+    for request in request_list:
+        id1 = request_nodes.get(request)
+        if id1 is not None:
+            id2 = scope_nodes.get(request.name)
+            if id2 is not None:
+                _add_edge(id1, id2)
+
+    # for solved scopes, create (scope -> requirement) edge
+    for package_name, _, _, requires in scopes:
+        if requires is not None:
+            id1 = scope_nodes[package_name]
+
+            for request in requires:
+                id2 = _add_request_node(request)
+                _add_edge(id1, id2)
+
+    # add extractions
+    for (src_fam, _), dest_req in extractions.iteritems():
+        id1 = scope_nodes.get(src_fam)
+        if id1 is not None:
+            id2 = _add_request_node(dest_req)
+            _add_edge(id1, id2)
+
+    # add extraction intersections
+    extracted_fams = set(x[1] for x in extractions.iterkeys())
+    for fam in extracted_fams:
+        requests = [v for k, v in extractions.iteritems() if k[1] == fam]
+        if len(requests) > 1:
+            reqlist = RequirementList(requests)
+            if not reqlist.conflict:
+                merged_request = reqlist.get(fam)
+                for request in requests:
+                    if merged_request != request:
+                        id1 = _add_request_node(request)
+                        id2 = _add_request_node(merged_request)
+                        _add_extraction_merge_edge(id1, id2)
+
+    # add conflicts
+    fr = failure_reason
+    if fr:
+        if isinstance(fr, DependencyConflicts):
+            for conflict in fr.conflicts:
+                id1 = _add_request_node(conflict.dependency)
+                id2 = scope_nodes.get(conflict.conflicting_request.name)
+                if id2 is None:
+                    id2 = _add_request_node(conflict.conflicting_request)
+                _add_conflict_edge(id1, id2)
+
+                failure_nodes.add(id1)
+                failure_nodes.add(id2)
+        elif isinstance(fr, TotalReduction):
+            if len(fr.reductions) == 1:
+                # special case - singular total reduction
+                reduct = fr.reductions[0]
+                id1 = scope_nodes[reduct.name]
+                id2 = _add_request_node(reduct.dependency)
+                id3 = scope_nodes[reduct.conflicting_request.name]
+                _add_edge(id1, id2)
+                _add_conflict_edge(id2, id3)
+
+                failure_nodes.add(id1)
+                failure_nodes.add(id2)
+                failure_nodes.add(id3)
+            else:
+                for reduct in fr.reductions:
+                    id1 = scope_nodes[reduct.name]
+                    id2 = _add_reduct_node(reduct.dependency)
+                    id3 = scope_nodes[reduct.conflicting_request.name]
+                    _add_reduct_edge(id1, id2, reduct.reducee_str())
+                    _add_conflict_edge(id2, id3)
+
+                    failure_nodes.add(id1)
+                    failure_nodes.add(id2)
+                    failure_nodes.add(id3)
+        elif isinstance(fr, Cycle):
+            for i, pkg in enumerate(fr.packages):
+                id1 = scope_nodes[pkg.name]
+                failure_nodes.add(id1)
+                pkg2 = fr.packages[(i + 1) % len(fr.packages)]
+                id2 = scope_nodes[pkg2.name]
+                _add_cycle_edge(id1, id2)
+
+    # connect leaf-node requests to a matching scope, if any
+    for request, id1 in request_nodes.iteritems():
+        if not g.neighbors(id1):  # leaf node
+            id2 = scope_nodes.get(request.name)
+            if id2 is not None:
+                package_request = scope_requests[request.name]
+                if not request.conflicts_with(package_request):
+                    _add_edge(id1, id2)
+
+    # prune nodes not related to failure
+    if prune_unfailed and failure_nodes:
+        access_dict = accessibility(g)
+        del_nodes = set()
+
+        for n, access_nodes in access_dict.iteritems():
+            if not (set(access_nodes) & failure_nodes):
+                del_nodes.add(n)
+
+        for n in del_nodes:
+            g.del_node(n)
+
+    return g
+
+
 class Solver(_Common):
     """Solver.
 
@@ -1762,7 +2150,8 @@ class Solver(_Common):
     def __init__(self, package_requests, package_paths, context=None,
                  package_filter=None, package_orderers=None, callback=None,
                  building=False, optimised=True, verbosity=0, buf=None,
-                 package_load_callback=None, prune_unfailed=True):
+                 package_load_callback=None, prune_unfailed=True,
+                 profile=False, package_cache=None):
         """Create a Solver.
 
         Args:
@@ -1776,7 +2165,9 @@ class Solver(_Common):
             package_orderers (list of `PackageOrder`): Custom package ordering.
             building: True if we're resolving for a build.
             optimised: Run the solver in optimised mode. This is only ever set
-                to False for testing purposes.
+                to False for testing purposes. In optimised mode, conflicts
+                learned from failed phases are used to discard later phases
+                that are guaranteed to fail in the same way.
             callback: If not None, this callable will be called after each
                 solve step. It is passed a `SolverState` object. It must return
                 a 2-tuple:
@@ -1791,11 +2182,18 @@ class Solver(_Common):
             prune_unfailed (bool): If the solve failed, and `prune_unfailed` is
                 True, any packages unrelated to the conflict are removed from
                 the graph.
+            profile (bool): If True, record where time is spent during the
+                solve. See `get_profile`.
+            package_cache (`PackageVariantCache`): Cache of package families
+                loaded by a previous solve, to reuse in this one. If None, a
+                new cache is created. Note that packages loaded by a previous
+                solve are not passed to `package_load_callback`.
         """
         self.package_paths = package_paths
         self.package_filter = package_filter
         self.package_orderers = package_orderers or config.package_orderers
         self.pr = _Printer(verbosity, buf=buf)
+        self.profiler = _Profiler(profile)
         self.optimised = optimised
         self.callback = callback
         self.prune_unfailed = prune_unfailed
@@ -1816,14 +2214,36 @@ class Solver(_Common):
         self.solve_time = None
         self.load_time = None
         self.solve_begun = None
+        self.nogoods = None
+        self.num_pruned = None
         self._init()
 
-        self.package_cache = PackageVariantCache(self)
+        # speculative solving of branches, see `_speculate`
+        self.branch_processes = 0
+        self.branch_workers = None
+        self.branch_queue = []  # branch paths waiting for a worker
+        self.branch_results = {}  # {branch path: `_solve_branch` result}
+        self.branch_root = None
+
+        if package_cache is None:
+            self.package_cache = PackageVariantCache(self)
+        else:
+            self.package_cache = package_cache
+            self.package_cache.set_solver(self)
+
+        # memoised sort keys, see `_PackageEntry.sort`
+        self.orderers = {}  # {package name: `PackageOrder`}
+        self.range_sort_keys = {}  # {(package name, range): sort key}
+        self.variant_sort_keys = {}  # {(name, version, index): sort key}
+        self.request_indices = None
 
         # merge the request
         if self.pr:
             self.pr("request: %s", ' '.join(map(str, package_requests)))
         self.request_list = RequirementList(package_requests)
+        self.request_indices = [(i, x.name)
+                                for i, x in enumerate(self.request_list)
+                                if not x.conflict]
 
         if self.request_list.conflict:
             req1, req2 = self.request_list.conflict
@@ -1920,11 +2340,18 @@ class Solver(_Common):
         t1 = time.time()
         pt1 = package_repo_stats.package_load_time
 
+        if config.solver_branch_processes > 0 and hasattr(os, "fork"):
+            self.branch_processes = config.solver_branch_processes
+            self.branch_root = self.phase_stack[-1]
+
         # iteratively solve phases
-        while self.status == SolverStatus.unsolved:
-            self.solve_step()
-            if self.status == SolverStatus.unsolved and not self._do_callback():
-                break
+        try:
+            while self.status == SolverStatus.unsolved:
+                self.solve_step()
+                if self.status == SolverStatus.unsolved and not self._do_callback():
+                    break
+        finally:
+            self._end_speculation()
 
         self.load_time = package_repo_stats.package_load_time - pt1
         self.solve_time = time.time() - t1
@@ -1947,18 +2374,41 @@ class Solver(_Common):
 
         if phase.status == SolverStatus.exhausted:
             self.pr.subheader("SPLITTING:")
-            phase, next_phase = phase.split()
+            with self.profiler("split"):
+                phase, next_phase = phase.split()
             self._push_phase(next_phase)
+            if self.branch_workers:
+                self._speculate([next_phase])
             if self.pr:
                 self.pr("new phase: %s", phase)
 
-        new_phase = phase.solve()
+        nogood = self._find_nogood(phase)
+        if nogood:
+            # the phase is bound to fail in the same way as the phase the
+            # conflict was learned from, so that phase stands in for it
+            new_phase = nogood.phase
+            self.num_pruned += 1
+            if phase.branch_path in self.branch_queue:
+                self.branch_queue.remove(phase.branch_path)
+            if self.pr:
+                self.pr("phase discarded, known conflict: %s", nogood)
+        else:
+            new_phase = self._get_speculated_phase(phase) or phase.solve()
+            if new_phase.status == SolverStatus.failed:
+                self._add_nogood(new_phase.nogood)
+
         self.solve_count += 1
         self.pr.subheader("RESULT:")
 
         if new_phase.status == SolverStatus.failed:
             self.pr("phase failed to resolve")
             self._push_phase(new_phase)
+
+            # solves that never backtrack would not gain anything from
+            # speculative solving, so it only starts on the first failure
+            if self.branch_processes and self.branch_workers is None:
+                self._speculate([x for x in self.phase_stack
+                                 if x.status == SolverStatus.pending])
             if self.pr and len(self.phase_stack) == 1:
                 self.pr.header("FAIL: there is no solution")
         elif new_phase.status == SolverStatus.solved:
@@ -1980,6 +2430,55 @@ class Solver(_Common):
                 s = SolverState(self.num_solves, self.num_fails, new_phase)
                 self.pr.important(str(s))
 
+    def get_profile(self):
+        """Get profiling data for the solve.
+
+        Only available if the solver was created with `profile` set to True.
+        Times are in seconds. Family load times include loading of package
+        definitions and variants, but not loads done during a prefetch (see
+        the 'solver_prefetch_threads' setting).
+
+        Returns:
+            dict: Profiling data, or None if profiling is not enabled. The
+            data is made of basic types only, so can be written as json.
+        """
+        if not self.profiler:
+            return None
+
+        operations = {}
+        for name, timer in self.profiler.timers.iteritems():
+            operations[name] = dict(count=timer.count, time=timer.time)
+
+        families = {}
+        for name, variant_list in self.package_cache.variant_lists.iteritems():
+            num_variants = 0
+            num_filtered = 0
+
+            for _, value in variant_list.entries:
+                if value is None:
+                    num_filtered += 1
+                elif isinstance(value, list):
+                    num_variants += len(value)
+
+            families[name] = dict(
+                load_time=self.profiler.family_load_times.get(name, 0.0),
+                num_packages=len(variant_list.entries),
+                num_packages_filtered=num_filtered,
+                num_variants_loaded=num_variants)
+
+        max_depth = (max(self.depth_counts) + 1) if self.depth_counts else 0
+
+        return dict(
+            status=self.status.name,
+            solve_time=self.solve_time,
+            load_time=self.load_time,
+            num_solves=self.num_solves,
+            num_fails=self.num_fails,
+            num_pruned=self.num_pruned,
+            max_phase_depth=max_depth,
+            operations=operations,
+            families=families)
+
     def failure_reason(self, failure_index=None):
         """Get the reason for a failure.
 
@@ -2041,6 +2540,21 @@ class Solver(_Common):
         else:
             return self.get_fail_graph()
 
+    def get_graph_data(self):
+        """Get the data needed to create the resolve graph of a solved resolve.
+
+        This is much cheaper than `get_graph`, and is used to defer creating
+        the graph until it is needed - see `get_graph_from_data`.
+
+        Returns:
+            dict: Graph data, or None if the solve has not succeeded.
+        """
+        if self.status != SolverStatus.solved:
+            return None
+
+        phase = self._latest_nonfailed_phase()
+        return phase.get_graph_data()
+
     def get_fail_graph(self, failure_index=None):
         """Returns a graph showing a solve failure.
 
@@ -2083,6 +2597,8 @@ class Solver(_Common):
         self.solve_time = 0.0
         self.load_time = 0.0
         self.solve_begun = False
+        self.nogoods = []
+        self.num_pruned = 0
 
     def _latest_nonfailed_phase(self):
         if self.status == SolverStatus.failed:
@@ -2113,12 +2629,157 @@ class Solver(_Common):
 
         return keep_going
 
+    def _add_nogood(self, nogood):
+        if self.optimised and nogood and nogood.variant_ids:
+            self.nogoods.append(nogood)
+
+    def _find_nogood(self, phase):
+        # find a learned conflict that guarantees this phase will fail
+        if not self.nogoods or phase.status != SolverStatus.pending:
+            return None
+
+        scopes = dict((x.package_name, x) for x in phase.scopes)
+        for nogood in self.nogoods:
+            if nogood.subsumes(scopes):
+                return nogood
+        return None
+
+    def _speculate(self, phases):
+        """Start solving the branches below `phases` in separate processes.
+
+        Branches are only solved speculatively - the solver still visits
+        phases in the same order as it would otherwise, but when it reaches
+        one of `phases`, it can skip straight to the phase that solved or
+        first failed that branch, if a branch process has solved it already
+        (see `_get_speculated_phase`). This gives the same results as a normal
+        solve.
+
+        Branch processes are forked from this process when first needed.
+        Branches are identified by their split choices from the initial phase,
+        which a branch process replays to recreate the branch's phase.
+        """
+        if self.branch_workers is None:
+            self.branch_workers = [_BranchWorker(self)
+                                   for _ in range(self.branch_processes)]
+
+        self.branch_queue.extend(x.branch_path for x in phases)
+        self._update_branch_workers()
+
+    def _update_branch_workers(self):
+        # collect solved branches, and give queued branches to idle workers.
+        # Branches are queued in the order they are pushed onto the phase
+        # stack, so the branches given out first are the last that this
+        # process would get to
+        for worker in self.branch_workers:
+            if worker.ready():
+                branch_path, result = worker.get_result()
+                if result:
+                    self.branch_results[branch_path] = result
+
+            if worker.alive and worker.branch_path is None \
+                    and self.branch_queue:
+                worker.solve(self.branch_queue.pop(0))
+
+    def _get_speculated_phase(self, phase):
+        # returns the solved or failed phase found by the speculative solve
+        # of `phase`, or None, in which case the branch is solved in this
+        # process as normal. Waits for the branch if a worker has started on
+        # it, since the worker has a head start.
+        if not self.branch_workers:
+            return None
+
+        branch_path = phase.branch_path
+        self._update_branch_workers()
+        result = self.branch_results.pop(branch_path, None)
+
+        if result is None:
+            if branch_path in self.branch_queue:
+                self.branch_queue.remove(branch_path)
+                return None
+
+            for worker in self.branch_workers:
+                if worker.branch_path == branch_path:
+                    _, result = worker.get_result()
+                    self._update_branch_workers()
+                    break
+
+            if result is None:
+                return None
+
+        solved_branch_path, num_solves = result
+        choices = solved_branch_path[len(branch_path):]
+        if self.pr:
+            self.pr("using speculative solve of branch (%d steps)", num_solves)
+
+        # replaying the split choices gives the same phase that the branch
+        # process found, without repeating the solves of failed phases
+        phase = self._replay_branch(phase, choices)
+        self.solve_count += num_solves - 1
+        return phase.solve()
+
+    def _solve_branch(self, branch_path):
+        # called in a branch process. Solves the branch as if it were a
+        # complete solve, and returns the branch path of the phase that solved
+        # the branch (or failed due to a cycle, which ends the solve also), or
+        # of the first failed phase if the branch cannot be solved; and the
+        # number of solve steps taken.
+        phase = self._replay_branch(self.branch_root, branch_path)
+        self._init()
+        self._push_phase(phase)
+
+        while self.status == SolverStatus.unsolved:
+            self.solve_step()
+
+        if self.status == SolverStatus.solved or self.cyclic_fail:
+            phase = self.phase_stack[-1]
+        else:
+            phase, _ = self._get_failed_phase(0)
+        return phase.branch_path, self.solve_count
+
+    @classmethod
+    def _replay_branch(cls, phase, choices):
+        for choice in choices:
+            phase = phase.solve().split()[choice]
+        return phase
+
+    def _end_speculation(self):
+        # stops any branch processes that are still running
+        for worker in (self.branch_workers or []):
+            worker.stop()
+
+        self.branch_processes = 0
+        self.branch_workers = None
+        self.branch_queue = []
+        self.branch_results = {}
+        self.branch_root = None
+
+    def _get_orderer(self, package_name):
+        orderer = self.orderers.get(package_name)
+        if orderer is None:
+            from rez.package_order import get_orderer
+            orderer = get_orderer(package_name, self.package_orderers or {})
+            self.orderers[package_name] = orderer
+        return orderer
+
+    def _range_sort_key(self, package_name, range_):
+        key = (package_name, range_)
+        range_key = self.range_sort_keys.get(key)
+        if range_key is None:
+            orderer = self._get_orderer(package_name)
+            range_key = orderer.sort_key(package_name, range_)
+            self.range_sort_keys[key] = range_key
+        return range_key
+
     def _get_variant_slice(self, package_name, range_):
         slice_ = self.package_cache.get_variant_slice(
             package_name=package_name, range_=range_)
 
         return slice_
 
+    def _prefetch(self, package_requests):
+        with self.profiler("prefetch"):
+            self.package_cache.prefetch(package_requests)
+
     def _push_phase(self, phase):
         depth = len(self.phase_stack)
         count = self.depth_counts.get(depth, -1) + 1
@@ -3,9 +3,11 @@ test resolved contexts
 """
 from rez.tests.util import TestBase, TempdirMixin
 from rez.resolved_context import ResolvedContext
+from rez.package_repository import package_repository_manager
 from rez.bind import hello_world
 from rez.utils.platform_ import platform_
 from rez.config import config
+from rez.exceptions import ResolvedContextError, PackageFamilyNotFoundError
 import rez.vendor.unittest2 as unittest
 import subprocess
 import os.path
@@ -63,6 +65,301 @@ class TestContext(TestBase, TempdirMixin):
         r2 = ResolvedContext.load(file)
         self.assertEqual(r.resolved_packages, r2.resolved_packages)
 
+        # the graph of a successful resolve is created when first needed
+        self.assertTrue(r2.has_graph)
+        self.assertEqual(r2.graph(as_dot=True), r.graph(as_dot=True))
+
+        # load of a bad context file
+        with open(file, 'w') as f:
+            f.write("{not json")
+        self.assertRaises(ResolvedContextError, ResolvedContext.load, file)
+
+    def test_serialize_embedded(self):
+        """Test save/load of context with embedded variants."""
+        from rez.package_resources_ import EmbeddedVariantResource
+
+        file = os.path.join(self.root, "test_embedded.rxt")
+        self.update_settings(dict(context_embed_variants=True))
+        r = ResolvedContext(["hello_world"])
+        r.save(file)
+
+        # variants are loaded from the context file
+        r2 = ResolvedContext.load(file)
+        self.assertEqual(r.resolved_packages, r2.resolved_packages)
+        for variant in r2.resolved_packages:
+            self.assertTrue(isinstance(variant.resource,
+                                       EmbeddedVariantResource))
+            self.assertEqual(variant.root, variant.resource.root)
+        self.assertEqual(r.get_environ(), r2.get_environ())
+
+        # variants are loaded from their repositories
+        self.update_settings(dict(context_embed_variants=True,
+                                  context_verify_embedded_variants=True))
+        r3 = ResolvedContext.load(file)
+        self.assertEqual(r.resolved_packages, r3.resolved_packages)
+        for variant in r3.resolved_packages:
+            self.assertFalse(isinstance(variant.resource,
+                                        EmbeddedVariantResource))
+
+        # the variants of an embedded package are also created from the
+        # embedded data
+        self.update_settings(dict(context_embed_variants=True))
+        path = os.path.dirname(__file__)
+        packages_path = os.path.join(path, "data", "solver", "packages")
+        r = ResolvedContext(["pyvariants", "python-2.6"],
+                            package_paths=[packages_path])
+        r.save(file)
+        r2 = ResolvedContext.load(file)
+
+        for variant, variant2 in zip(r.resolved_packages,
+                                     r2.resolved_packages):
+            self.assertTrue(isinstance(variant2.resource,
+                                       EmbeddedVariantResource))
+            variants = list(variant.parent.iter_variants())
+            variants2 = list(variant2.parent.iter_variants())
+            self.assertEqual(variants, variants2)
+            self.assertEqual([x.root for x in variants],
+                             [x.root for x in variants2])
+            self.assertEqual([x.uri for x in variants],
+                             [x.uri for x in variants2])
+
+    def test_resolve_cache(self):
+        """Test resolve caching to the filesystem cache backend."""
+        cache_path = os.path.join(self.root, "resolve_cache")
+        self.update_settings(dict(resolve_caching=True,
+                                  resolve_cache_backend="filesystem",
+                                  resolve_cache_path=cache_path))
+
+        r = ResolvedContext(["hello_world"])
+        self.assertFalse(r.from_cache)
+        self.assertEqual(len(os.listdir(cache_path)), 1)
+
+        r2 = ResolvedContext(["hello_world"])
+        self.assertTrue(r2.from_cache)
+        self.assertEqual(r2.resolved_packages, r.resolved_packages)
+
+        # a new release invalidates the cache entry
+        family_path = os.path.join(self.root, "packages", "hello_world")
+        mtime = os.path.getmtime(family_path) + 10
+        os.utime(family_path, (mtime, mtime))
+
+        r3 = ResolvedContext(["hello_world"])
+        self.assertFalse(r3.from_cache)
+        self.assertEqual(r3.resolved_packages, r.resolved_packages)
+
+        # the cached graph is created from the stored graph data
+        r4 = ResolvedContext(["hello_world"])
+        self.assertTrue(r4.from_cache)
+        self.assertEqual(sorted(r4.graph().nodes()), sorted(r.graph().nodes()))
+
+    def test_resolve_cache_eviction(self):
+        """Test eviction of filesystem resolve cache entries."""
+        from rez.resolve_cache import FileSystemResolveCache
+
+        cache_path = os.path.join(self.root, "resolve_cache_evict")
+        cache = FileSystemResolveCache(cache_path, max_entries=5)
+        self.assertEqual(cache.evict_interval, 1)
+        for i in range(20):
+            cache.set("key%d" % i, i)
+        self.assertEqual(len(os.listdir(cache_path)), 5)
+
+        # eviction is periodic, so the limit may be exceeded in between
+        cache_path = os.path.join(self.root, "resolve_cache_evict2")
+        cache = FileSystemResolveCache(cache_path, max_entries=50)
+        self.assertEqual(cache.evict_interval, 5)
+        for i in range(200):
+            cache.set("key%d" % i, i)
+        num_entries = len(os.listdir(cache_path))
+        self.assertTrue(50 <= num_entries < 200)
+        self.assertEqual(cache.get("key199"), 199)
+
+    def test_resolve_cache_private(self):
+        """Test that a private filesystem resolve cache is not shared."""
+        from rez.resolve_cache import FileSystemResolveCache, \
+            get_resolve_cache
+        import stat
+
+        self.update_settings(dict(resolve_caching=True,
+                                  resolve_cache_backend="filesystem",
+                                  resolve_cache_path=None,
+                                  tmpdir=self.root))
+        cache = get_resolve_cache()
+        self.assertTrue(cache.private)
+        self.assertNotEqual(cache.path,
+                            os.path.join(self.root, "rez_resolve_cache"))
+
+        cache.set("key", 1)
+        self.assertEqual(cache.get("key"), 1)
+        mode = os.stat(cache.path).st_mode
+        self.assertEqual(mode & (stat.S_IRWXG | stat.S_IRWXO), 0)
+
+        # a directory writable by others is not used
+        cache_path = os.path.join(self.root, "resolve_cache_shared")
+        os.makedirs(cache_path)
+        os.chmod(cache_path, 0777)
+        cache = FileSystemResolveCache(cache_path, private=True)
+        cache.set("key", 1)
+        self.assertEqual(os.listdir(cache_path), [])
+        self.assertEqual(cache.get("key"), None)
+
+    def test_resolve_cache_validation_threads(self):
+        """Test concurrent validation of resolve cache entries."""
+        cache_path = os.path.join(self.root, "resolve_cache_threads")
+        self.update_settings(dict(resolve_caching=True,
+                                  resolve_cache_backend="filesystem",
+                                  resolve_cache_path=cache_path,
+                                  resolve_cache_validation_threads=2))
+
+        r = ResolvedContext(["hello_world"])
+        r2 = ResolvedContext(["hello_world"])
+        self.assertTrue(r2.from_cache)
+        self.assertEqual(r2.resolved_packages, r.resolved_packages)
+
+        # a new release invalidates the cache entry
+        family_path = os.path.join(self.root, "packages", "hello_world")
+        mtime = os.path.getmtime(family_path) + 10
+        os.utime(family_path, (mtime, mtime))
+
+        r3 = ResolvedContext(["hello_world"])
+        self.assertFalse(r3.from_cache)
+
+        # the thread pool follows changes to the configured size
+        from rez.utils import get_thread_pool
+        setting = "resolve_cache_validation_threads"
+        self.assertEqual(get_thread_pool(setting)._processes, 2)
+        self.update_settings(dict(resolve_caching=True,
+                                  resolve_cache_backend="filesystem",
+                                  resolve_cache_path=cache_path,
+                                  resolve_cache_validation_threads=3))
+        r4 = ResolvedContext(["hello_world"])
+        self.assertTrue(r4.from_cache)
+        self.assertEqual(get_thread_pool(setting)._processes, 3)
+
+    def test_resolve_cache_entry_size(self):
+        """Test compression and size limit of resolve cache entries."""
+        cache_path = os.path.join(self.root, "resolve_cache_size")
+        settings = dict(resolve_caching=True,
+                        resolve_cache_backend="filesystem",
+                        resolve_cache_path=cache_path,
+                        memcached_resolve_min_compress_len=1,
+                        resolve_cache_max_entry_size=10)
+        self.update_settings(settings)
+
+        # entry is too large to be cached
+        ResolvedContext(["hello_world"])
+        self.assertFalse(os.path.exists(cache_path))
+
+        settings["resolve_cache_max_entry_size"] = 0
+        self.update_settings(settings)
+        ResolvedContext(["hello_world"])
+        r = ResolvedContext(["hello_world"])
+        self.assertTrue(r.from_cache)
+
+    def test_environ_cache(self):
+        """Test caching of a saved context's package environment."""
+        self.update_settings(dict(context_environ_caching=True))
+        file = os.path.join(self.root, "environ_cache.rxt")
+        r = ResolvedContext(["hello_world"])
+        r.save(file)
+        expected_env = r.get_environ(parent_environ={})
+
+        r2 = ResolvedContext.load(file)
+        env = r2.get_environ(parent_environ={})
+        self.assertEqual(env, expected_env)
+        self.assertTrue(os.path.exists(file + ".environ"))
+
+        # package commands are not executed again
+        def _execute_packages(executor):
+            raise Exception("package commands should not be executed")
+
+        r3 = ResolvedContext.load(file)
+        r3._execute_packages = _execute_packages
+        env = r3.get_environ(parent_environ={})
+        self.assertEqual(env, expected_env)
+
+        # a changed package definition invalidates the cache
+        filepath = r.resolved_packages[0].parent.resource.filepath
+        mtime = os.path.getmtime(filepath) + 10
+        os.utime(filepath, (mtime, mtime))
+        package_repository_manager.clear_caches()
+
+        r4 = ResolvedContext.load(file)
+        executed = []
+        execute_packages = r4._execute_packages
+
+        def _execute_packages_recorded(executor):
+            executed.append(True)
+            execute_packages(executor)
+
+        r4._execute_packages = _execute_packages_recorded
+        env = r4.get_environ(parent_environ={})
+        self.assertEqual(env, expected_env)
+        self.assertTrue(executed)
+
+    def test_seed_context(self):
+        """Test a resolve seeded from a previous context."""
+        path = os.path.dirname(__file__)
+        packages_path = os.path.join(path, "data", "solver", "packages")
+        self.update_settings(dict(packages_path=[packages_path]))
+
+        def _resolved(r):
+            return [x.qualified_package_name for x in r.resolved_packages]
+
+        r = ResolvedContext(["python-2.6.0"])
+        self.assertEqual(_resolved(r), ["python-2.6.0"])
+
+        # the seed's version of python is kept, where a full resolve would
+        # pick the latest python-2.6
+        r2 = ResolvedContext(["pyfoo"], seed_context=r)
+        self.assertEqual(_resolved(r2), ["python-2.6.0", "pyfoo-3.1.0"])
+        r3 = ResolvedContext(["pyfoo"])
+        self.assertEqual(_resolved(r3), ["python-2.6.8", "pyfoo-3.1.0"])
+
+        # the seed's version of python conflicts with the request, so python
+        # is re-resolved
+        r4 = ResolvedContext(["pyfoo-3.0"], seed_context=r)
+        self.assertEqual(_resolved(r4), ["python-2.5.2", "pyfoo-3.0.0"])
+
+        # packages named in the request are never seeded
+        r5 = ResolvedContext(["python"], seed_context=r)
+        self.assertEqual(_resolved(r5), ["python-2.7.0"])
+
+    def test_resolve_many(self):
+        """Test resolving a batch of requests."""
+        from rez.resolver import resolve_many
+        path = os.path.dirname(__file__)
+        packages_path = os.path.join(path, "data", "solver", "packages")
+        self.update_settings(dict(packages_path=[packages_path]))
+
+        requests = [["pyfoo"], ["python-2.5"], ["pybah", "pyfoo-3.0"],
+                    ["python-2.6", "python-2.7"]]
+        expected = [ResolvedContext(x) for x in requests]
+
+        def _resolved(r):
+            return [x.qualified_package_name
+                    for x in (r.resolved_packages or [])]
+
+        def _test(contexts):
+            self.assertEqual(len(contexts), len(expected))
+            for context, expected_context in zip(contexts, expected):
+                self.assertEqual(context.status, expected_context.status)
+                self.assertEqual(_resolved(context), _resolved(expected_context))
+
+        _test(resolve_many(requests))
+        if hasattr(os, "fork"):
+            _test(resolve_many(requests, processes=2))
+
+        # an error in one request does not stop the others
+        requests = [["pyfoo"], ["missing_family"], ["python-2.5"]]
+        for processes in (0, 2):
+            contexts = resolve_many(requests, processes=processes)
+            self.assertEqual(len(contexts), 3)
+            self.assertTrue(isinstance(contexts[1],
+                                       PackageFamilyNotFoundError))
+            self.assertTrue("missing_family" in str(contexts[1]))
+            self.assertEqual(_resolved(contexts[0]), _resolved(expected[0]))
+            self.assertEqual(_resolved(contexts[2]), _resolved(expected[1]))
+
     def test_orderer(self):
         """Test a resolve with an orderer"""
         from rez.package_order import VersionSplitPackageOrder, OrdererDict
@@ -12,6 +12,7 @@ from rez.utils.sourcecode import SourceCode
 import rez.vendor.unittest2 as unittest
 from rez.vendor.version.version import Version
 from rez.vendor.version.util import VersionError
+import time
 import os.path
 import os
 
@@ -413,6 +414,221 @@ class TestPackages(TestBase, TempdirMixin):
         _test_orderer_dict(orderers, "timestamped", expected_timestamp_result)
         _test_orderer_dict(orderers, "pymum", expected_default_result)
 
+        # timestamp orderers with the same settings share their results
+        timestamp_orderer2 = TimestampPackageOrder("timestamped",
+                                                   timestamp=3001, rank=3)
+        _test(timestamp_orderer2, "timestamped", expected_timestamp_result)
+        self.assertTrue(
+            timestamp_orderer2._get_sort_key_cache("timestamped")
+            is timestamp_orderer._get_sort_key_cache("timestamped"))
+
+    def test_10(self):
+        """test the filesystem repository package index."""
+        from rez.package_repository import package_repository_manager
+
+        self.update_settings({"plugins": {"package_repository": {
+            "filesystem": {"use_package_index": True}}}})
+        package_repository_manager.clear_caches()
+
+        repo_path = os.path.join(self.root, "indexed_packages")
+        os.makedirs(repo_path)
+
+        # installing variants updates the index
+        path = os.path.join(self.packages_base_path, "developer")
+        package = get_developer_package(path)
+        for variant in package.iter_variants():
+            variant.install(repo_path)
+
+        repo = package_repository_manager.get_repository(repo_path)
+        self.assertTrue(os.path.isfile(repo.index_filepath))
+
+        # packages are served from the index, without loading package files
+        repo.clear_caches()
+        installed_package = get_package("foo", "3.0.1", paths=[repo_path])
+        self.assertEqual(installed_package.requires, package.requires)
+        self.assertEqual(installed_package.variants, package.variants)
+        variants = list(installed_package.iter_variants())
+        self.assertEqual([x.requires for x in variants],
+                         [x.requires for x in package.iter_variants()])
+        self.assertFalse("_data" in installed_package.resource.__dict__)
+
+        # a changed family directory invalidates the index entry
+        family_path = os.path.join(repo_path, "foo")
+        mtime = os.path.getmtime(family_path) + 10
+        os.utime(family_path, (mtime, mtime))
+        repo.clear_caches()
+        self.assertEqual(repo.get_index_family("foo"), None)
+        installed_package = get_package("foo", "3.0.1", paths=[repo_path])
+        self.assertEqual(installed_package.requires, package.requires)
+        self.assertTrue("_data" in installed_package.resource.__dict__)
+
+        # rebuilding the index makes it valid again
+        repo.update_index()
+        self.assertNotEqual(repo.get_index_family("foo"), None)
+
+        # a package file edited in place invalidates its package's entry
+        installed_package = get_package("foo", "3.0.1", paths=[repo_path])
+        filepath = installed_package.resource.filepath
+        mtime = os.path.getmtime(filepath) + 10
+        os.utime(filepath, (mtime, mtime))
+        repo.clear_caches()
+        self.assertNotEqual(repo.get_index_family("foo"), None)
+        installed_package = get_package("foo", "3.0.1", paths=[repo_path])
+        self.assertEqual(installed_package.resource.state_handle,
+                         os.path.getmtime(filepath))
+        self.assertEqual(installed_package.requires, package.requires)
+        self.assertTrue("_data" in installed_package.resource.__dict__)
+
+    def test_11(self):
+        """test the filesystem repository missing family cache."""
+        from rez.package_repository import package_repository_manager
+
+        self.update_settings({"plugins": {"package_repository": {
+            "filesystem": {"cache_missing_families": True}}}})
+        package_repository_manager.clear_caches()
+
+        repo = package_repository_manager.get_repository(self.py_packages_path)
+        self.assertNotEqual(repo.get_package_family("versioned"), None)
+        self.assertNotEqual(repo.get_package_family("single_unversioned"), None)
+        self.assertEqual(repo.get_package_family("missing"), None)
+        self.assertTrue("versioned" in repo.get_family_names())
+        self.assertFalse("missing" in repo.get_family_names())
+
+    def test_12(self):
+        """test the packed snapshot repository."""
+        from rez.package_repository import package_repository_manager
+        from rez.plugin_managers import plugin_manager
+
+        cls = plugin_manager.get_plugin_class("package_repository", "packed")
+        repo = package_repository_manager.get_repository(
+            self.solver_packages_path)
+        filepath = os.path.join(self.root, "packages.rezpack")
+        index = cls.pack(repo, filepath)
+
+        paths = [self.solver_packages_path]
+        packed_paths = ["packed@" + filepath]
+        families = set(x.name for x in iter_package_families(paths=paths))
+        self.assertEqual(set(index["families"]), families)
+
+        def _packages(name, paths_):
+            return sorted(iter_packages(name, paths=paths_),
+                          key=lambda x: x.version)
+
+        for name in families:
+            packages = _packages(name, paths)
+            packed_packages = _packages(name, packed_paths)
+            self.assertEqual([x.version for x in packages],
+                             [x.version for x in packed_packages])
+
+            for package, packed_package in zip(packages, packed_packages):
+                self.assertEqual(package.requires, packed_package.requires)
+                self.assertEqual(package.variants, packed_package.variants)
+                self.assertEqual(
+                    [x.root for x in package.iter_variants()],
+                    [x.root for x in packed_package.iter_variants()])
+
+    def test_13(self):
+        """test the sqlite package repository."""
+        from rez.package_repository import package_repository_manager
+        from rez.package_search import get_reverse_dependency_tree, \
+            get_plugins, filter_families_by_release_time
+
+        paths = [self.solver_packages_path]
+        sqlite_paths = ["sqlite@" + os.path.join(self.root, "packages.db")]
+        repo = package_repository_manager.get_repository(sqlite_paths[0])
+
+        for name in ("python", "pyvariants", "nada"):
+            for package in iter_packages(name, paths=paths):
+                for variant in package.iter_variants():
+                    repo.install_variant(variant.resource)
+
+            packages = sorted(iter_packages(name, paths=paths),
+                              key=lambda x: x.version)
+            installed_packages = sorted(iter_packages(name, paths=sqlite_paths),
+                                        key=lambda x: x.version)
+            self.assertEqual([x.version for x in packages],
+                             [x.version for x in installed_packages])
+
+            for package, installed_package in zip(packages, installed_packages):
+                self.assertEqual(package.requires, installed_package.requires)
+                self.assertEqual(package.variants, installed_package.variants)
+                self.assertEqual(str(package.commands),
+                                 str(installed_package.commands))
+
+        # installing an existing variant leaves the package unchanged
+        package = get_package("pyvariants", "2", paths=paths)
+        variant = package.iter_variants().next()
+        installed_variant = repo.install_variant(variant.resource)
+        self.assertEqual(installed_variant.index, variant.index)
+        installed_package = get_package("pyvariants", "2", paths=sqlite_paths)
+        self.assertEqual(installed_package.variants, package.variants)
+
+        # reverse dependencies are found with indexed queries
+        self.assertEqual(repo.get_dependent_families("python"),
+                         set(["pyvariants"]))
+        pkgs_list, _ = get_reverse_dependency_tree("python",
+                                                   paths=sqlite_paths)
+        self.assertEqual(pkgs_list, [["python"], ["pyvariants"]])
+
+        # plugins
+        for name, data in (("host", dict(version="1.0", has_plugins=True)),
+                           ("plug", dict(version="1.0", plugin_for=["host"]))):
+            package = create_package(name, data)
+            repo.install_variant(package.iter_variants().next().resource)
+
+        self.assertEqual(get_plugins("host", paths=sqlite_paths), ["plug"])
+
+        # release time searches are indexed queries
+        names = ["python", "pyvariants", "nada", "host", "plug"]
+        now = int(time.time())
+        self.assertEqual(repo.get_released_families(), set(names))
+        self.assertEqual(repo.get_released_families(after_time=now + 10),
+                         set())
+        self.assertEqual(filter_families_by_release_time(
+            names, before_time=now + 10, paths=sqlite_paths), names)
+        self.assertEqual(filter_families_by_release_time(
+            names, after_time=now + 10, paths=sqlite_paths), [])
+
+        # families are not filtered by repositories without an index, since
+        # that would load all of their packages
+        names = ["timestamped", "variants_py"]
+        py_paths = [self.py_packages_path]
+        self.assertEqual(filter_families_by_release_time(
+            names, after_time=10000, paths=py_paths), names)
+        self.assertEqual(filter_families_by_release_time(
+            names, after_time=10000, paths=py_paths + sqlite_paths), names)
+
+        # a missing database is empty, and is not created by lookups or dry
+        # run installs
+        for filepath in (os.path.join(self.root, "missing.db"),
+                         os.path.join(self.root, "missing", "packages.db")):
+            missing_paths = ["sqlite@" + filepath]
+            self.assertEqual(list(iter_packages("python",
+                                                paths=missing_paths)), [])
+            missing_repo = package_repository_manager.get_repository(
+                missing_paths[0])
+            self.assertEqual(missing_repo.install_variant(
+                variant.resource, dry_run=True), None)
+            self.assertFalse(os.path.exists(filepath))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "missing")))
+
+        # concurrent installs into the same package do not lose variants
+        from rezplugins.package_repository.sqlite import SqlitePackageRepository
+        from rez.utils.resources import ResourcePool
+
+        filepath = os.path.join(self.root, "concurrent", "packages.db")
+        repo1 = SqlitePackageRepository(filepath, ResourcePool(cache_size=None))
+        repo2 = SqlitePackageRepository(filepath, ResourcePool(cache_size=None))
+        package = get_package("pyvariants", "2", paths=paths)
+        variants = list(package.iter_variants())
+        repo1.install_variant(variants[0].resource)
+        repo2.install_variant(variants[1].resource)
+        repo1.install_variant(variants[2].resource)
+
+        installed_package = get_package("pyvariants", "2",
+                                        paths=["sqlite@" + filepath])
+        self.assertEqual(installed_package.variants, package.variants[:3])
+
 
 class TestMemoryPackages(TestBase):
     def test_1_memory_variant_parent(self):
@@ -407,6 +407,60 @@ class TestRex(TestBase):
                                             annotate=False)
         self.assertEqual(rez_commands, expected)
 
+    def test_apply_actions(self):
+        """Test re-applying recorded actions, and recording of env reads."""
+        code = textwrap.dedent("""
+            if defined("FOO"):
+                setenv("A", "{this}-" + getenv("FOO"))
+            appendenv("PATH", "$HOME/bin")
+            alias("hey", "echo {this}")
+            """)
+
+        env = {"FOO": "foo", "HOME": "/home/me", "PATH": "/usr/bin"}
+        ex = self._create_executor(env)
+        ex.bind("this", "x")
+        ex.manager.parent_environ_reads = {}
+        ex.execute_code(code)
+        self.assertEqual(ex.manager.parent_environ_reads, {"FOO": "foo"})
+
+        ex2 = self._create_executor(env)
+        ex2.manager.apply_actions(ex.actions)
+        self.assertEqual(ex2.actions, ex.actions)
+        self.assertEqual(ex2.get_output(), ex.get_output())
+
+    def test_compiled_code_cache(self):
+        """Test caching of compiled rex code to disk."""
+        from rez.utils.sourcecode import SourceCode, compiled_code_cache
+        import tempfile
+        import shutil
+
+        path = tempfile.mkdtemp(prefix="rez_test_")
+        try:
+            self.update_settings({"sourcecode_cache_path": path})
+            source = "setenv('FOO', 'foo-%d' % 2)"
+
+            ex = self._create_executor({})
+            ex.execute_code(SourceCode(source))
+            self.assertEqual(ex.get_output(), {"FOO": "foo-2"})
+            self.assertEqual(len(os.listdir(path)), 1)
+
+            # a new process would only find the entry on disk
+            compiled_code_cache.clear()
+            code = SourceCode(source)
+            pyc = compiled_code_cache.load(code.evaluated_code, code.sourcename)
+            self.assertNotEqual(pyc, None)
+
+            ex = self._create_executor({})
+            ex.execute_code(code)
+            self.assertEqual(ex.get_output(), {"FOO": "foo-2"})
+
+            # unicode source, with non-ascii characters
+            result = SourceCode(u"return u'caf\xe9'").exec_({})
+            self.assertEqual(result, u"caf\xe9")
+            self.assertEqual(len(os.listdir(path)), 2)
+        finally:
+            shutil.rmtree(path)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -3,8 +3,9 @@ test dependency resolving algorithm
 """
 from rez.vendor.version.requirement import Requirement
 from rez.solver import Solver, Cycle, SolverStatus
+from rez.package_repository import package_repository_manager
 from rez.config import config
-from rez.exceptions import ConfigurationError
+from rez.exceptions import ConfigurationError, PackageFamilyNotFoundError
 import rez.vendor.unittest2 as unittest
 from rez.tests.util import TestBase
 import itertools
@@ -700,6 +701,130 @@ class TestSolver(TestBase):
         self._solve(["pyvariants"],
                     ["python-2.6.8[]", "pyvariants-2[2]"])
 
+    def test_32_learned_conflicts(self):
+        """Test that conflicts learned from failed phases prune later phases
+        that are bound to fail in the same way.
+        """
+        packages = [
+            ("x", "1", ["c"]), ("x", "2", ["b"]), ("x", "3", ["a"]),
+            ("a", "1", []), ("b", "1", []), ("c", "1", []),
+            ("y", "2", ["k-1"]), ("y", "3", ["z-1", "w-2"]),
+            ("z", "1", ["w-1"]), ("w", "1", []), ("w", "2", []),
+            ("k", "1", ["n-1"]), ("n", "1", []), ("n", "2", []),
+            ("n", "3", []), ("s", "1", ["r-1"]), ("s", "2", ["n-2"]),
+            ("r", "1", ["n-3"])]
+
+        data = {}
+        for name, version, requires in packages:
+            data.setdefault(name, {})[version] = dict(
+                name=name, version=version, requires=requires)
+
+        path = "memory@test_solver_learned_conflicts"
+        repo = package_repository_manager.get_repository(path)
+        repo.data = data
+
+        # every version of 'x' fails in the same way for 'y-3', so after the
+        # first failure the remaining 'y-3' phases are discarded unsolved
+        reqs = [Requirement(x) for x in ("x", "y", "s")]
+        s1 = Solver(reqs, [path], optimised=True)
+        s2 = Solver(reqs, [path], optimised=False)
+
+        s1.solve()
+        s2.solve()
+        self.assertEqual(s1.status, SolverStatus.failed)
+        self.assertEqual(s2.status, SolverStatus.failed)
+        self.assertEqual(s1.failure_reason(), s2.failure_reason())
+        self.assertTrue(s1.num_pruned > 0)
+        self.assertEqual(s2.num_pruned, 0)
+
+    def test_33_prefetch(self):
+        """Test that concurrent package loading gives the same results."""
+        self.update_settings({"solver_prefetch_threads": 4})
+        self.test_07()
+        self.test_08()
+
+        reqs = [Requirement("python"), Requirement("missing_family")]
+        self.assertRaises(PackageFamilyNotFoundError, Solver, reqs,
+                          self.packages_path)
+
+        s = Solver([Requirement("python"), Requirement("pyodd")],
+                   self.packages_path)
+        s.solve()
+        self.assertTrue("pybah" in s.package_cache.variant_lists)
+
+        # the thread pool follows changes to the configured size
+        from rez.utils import get_thread_pool
+        setting = "solver_prefetch_threads"
+        self.assertEqual(get_thread_pool(setting)._processes, 4)
+        self.update_settings({setting: 2})
+        self.assertEqual(get_thread_pool(setting)._processes, 2)
+        self.test_07()
+
+    def test_34_profile(self):
+        """Test solver profiling."""
+        import json
+
+        reqs = [Requirement("pyvariants"), Requirement("python")]
+        s = Solver(reqs, self.packages_path)
+        s.solve()
+        self.assertEqual(s.get_profile(), None)
+
+        s = Solver(reqs, self.packages_path, profile=True)
+        s.solve()
+        self.assertEqual(s.status, SolverStatus.solved)
+
+        profile = s.get_profile()
+        json.dumps(profile)  # must be serializable
+        self.assertEqual(profile["status"], "solved")
+        self.assertEqual(profile["num_solves"], s.num_solves)
+        self.assertTrue(profile["max_phase_depth"] >= 1)
+        self.assertTrue(profile["operations"]["extract"]["count"] > 0)
+        self.assertTrue(profile["operations"]["intersect"]["count"] > 0)
+        self.assertEqual(set(profile["families"].keys()),
+                         set(["pyvariants", "python"]))
+
+        family = profile["families"]["python"]
+        self.assertTrue(family["num_packages"] > 0)
+        self.assertTrue(family["num_variants_loaded"] > 0)
+
+    def test_35_benchmark(self):
+        """Test the solver benchmark."""
+        from rez.benchmark import SolverBenchmark
+
+        settings = dict(num_families=10, num_versions=4, num_variants=2,
+                        num_resolves=3)
+        b1 = SolverBenchmark(**settings)
+        b2 = SolverBenchmark(**settings)
+        self.assertEqual(b1.generate_repository_data(),
+                         b2.generate_repository_data())
+        self.assertEqual(b1.generate_requests(), b2.generate_requests())
+
+        results = b1.run()
+        self.assertEqual(len(results["resolves"]), 3)
+        self.assertEqual(results["num_solves"],
+                         sum(x["num_solves"] for x in results["resolves"]))
+        self.assertEqual(SolverBenchmark.compare(results, results), [])
+
+        # more solver steps than the baseline is a regression
+        baseline = b2.run()
+        baseline["resolves"][0]["num_solves"] -= 1
+        regressions = SolverBenchmark.compare(results, baseline,
+                                              tolerance=1000)
+        self.assertEqual(len(regressions), 1)
+
+        b3 = SolverBenchmark(seed=1, **settings)
+        self.assertRaises(ValueError, SolverBenchmark.compare, results,
+                          b3.run())
+
+    @unittest.skipIf(not hasattr(os, "fork"), "requires fork")
+    def test_36_speculative_branches(self):
+        """Test that speculative solving of branches gives the same results."""
+        self.update_settings({"solver_branch_processes": 2})
+        self.test_04()
+        self.test_05()
+        self.test_07()
+        self.test_08()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -11,6 +11,44 @@ def reraise(exc, new_exc_cls=None, format_str=None):
     raise new_exc_cls, format_str % exc, sys.exc_info()[2]
 
 
+# thread pools, keyed by the name of the config setting giving their number of
+# threads, as (pool, size) tuples
+_thread_pools = {}
+
+
+def get_thread_pool(setting):
+    """Get the shared thread pool sized by the given config setting.
+
+    The pool is replaced if the configured size has changed since it was
+    created, eg by a config override.
+
+    Args:
+        setting (str): Name of the config setting giving the number of threads.
+
+    Returns:
+        `multiprocessing.pool.ThreadPool`.
+    """
+    from rez.config import config
+
+    size = getattr(config, setting)
+    pool, pool_size = _thread_pools.get(setting, (None, 0))
+    if pool is None or size != pool_size:
+        from multiprocessing.pool import ThreadPool
+        if pool is not None:
+            pool.close()  # running tasks are allowed to finish
+        pool = ThreadPool(size)
+        _thread_pools[setting] = (pool, size)
+    return pool
+
+
+def clear_thread_pools():
+    """Forget all thread pools, without closing them.
+
+    This is used in forked processes, which cannot share the parent's pools.
+    """
+    _thread_pools.clear()
+
+
 # Copyright 2013-2016 Allan Johns.
 #
 # This library is free software: you can redistribute it and/or
@@ -14,6 +14,11 @@ import os
 import re
 import stat
 
+try:
+    from os import scandir as _scandir
+except ImportError:
+    from rez.vendor.scandir.scandir import scandir as _scandir
+
 
 class TempDirs(object):
     """Tempdir manager.
@@ -358,6 +363,46 @@ def test_encode_decode():
     # u'\u20ac' == Euro symbol
     do_test(u"\u20ac3 ~= $4.06", '_3e282ac3_020_07e_03d_020_0244.06')
 
+
+def scan_directory(path):
+    """List a directory, and find which of its entries are directories.
+
+    Entry types are read from the directory listing itself where the platform
+    provides them (see `os.scandir`, or the vendored 'scandir' module on older
+    pythons), rather than with a stat call per entry. This matters on network
+    filesystems, where each stat is a round trip to the server.
+
+    Returns:
+        List of (str, bool) tuples: Entry name, and True if the entry is a
+        directory (or a symlink to one).
+    """
+    return [(x.name, x.is_dir()) for x in _scandir(path)]
+
+
+def find_file(path, filenames):
+    """Find the first of the given files that exists in a directory.
+
+    This reads the directory listing once (see `scan_directory`), rather than
+    checking each file in turn.
+
+    Args:
+        path (str): Directory to search.
+        filenames (list of str): Filenames to look for, in order of preference.
+
+    Returns:
+        str: The first filename found, or None.
+    """
+    try:
+        files = set(x.name for x in _scandir(path) if x.is_file())
+    except OSError:
+        return None
+
+    for filename in filenames:
+        if filename in files:
+            return filename
+    return None
+
+
 def walk_up_dirs(path):
     """Yields absolute directories starting with the given path, and iterating
     up through all it's parents, until it reaches a root directory"""
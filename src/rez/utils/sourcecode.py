@@ -1,11 +1,16 @@
 from rez.utils.formatting import indent
 from rez.utils.data_utils import cached_property
 from rez.utils.logging_ import print_debug
+from rez.backport.lru_cache import lru_cache
 from inspect import getsourcelines
 from textwrap import dedent
 from glob import glob
+from hashlib import sha1
 import traceback
+import tempfile
+import marshal
 import os.path
+import os
 import imp
 
 
@@ -188,7 +193,8 @@ class SourceCode(object):
     @cached_property
     def compiled(self):
         try:
-            pyc = compile(self.evaluated_code, self.sourcename, 'exec')
+            pyc = compiled_code_cache.compile(self.evaluated_code,
+                                              self.sourcename)
         except Exception as e:
             stack = traceback.format_exc()
             raise SourceCodeCompileError(
@@ -377,3 +383,95 @@ class IncludeModuleManager(object):
 
 # singleton
 include_module_manager = IncludeModuleManager()
+
+
+# maximum number of code objects kept in memory by `CompiledCodeCache`
+compiled_code_cache_size = 1000
+
+
+class CompiledCodeCache(object):
+    """Manages a cache of compiled `SourceCode` objects.
+
+    Code objects are cached in memory (up to `compiled_code_cache_size` of
+    them), and also on disk if the 'sourcecode_cache_path' setting is set, so
+    that other processes can skip compilation of the same code (such as
+    package commands). Entries are keyed on the hash of the source, the source
+    name, the rez version and the python bytecode version.
+    """
+    def __init__(self):
+        self.compile = lru_cache(maxsize=compiled_code_cache_size)(self._compile)
+
+    def clear(self):
+        """Clear the in-memory cache."""
+        self.compile.cache_clear()
+
+    def load(self, source, sourcename):
+        """Load a code object from the disk cache.
+
+        Returns:
+            Code object, or None if there is no entry on disk.
+        """
+        filepath = self._filepath(self._key(source, sourcename))
+        if filepath is None:
+            return None
+
+        try:
+            with open(filepath, "rb") as f:
+                return marshal.load(f)
+        except IOError:
+            return None
+        except (EOFError, ValueError, TypeError):
+            return None  # corrupt entry, it is overwritten on next compile
+
+    def _compile(self, source, sourcename):
+        pyc = self.load(source, sourcename)
+        if pyc is not None:
+            return pyc
+
+        pyc = compile(source, sourcename, 'exec')
+
+        filepath = self._filepath(self._key(source, sourcename))
+        if filepath is None:
+            return pyc
+
+        # write to temp file and rename, so readers never see a partial entry
+        try:
+            path = os.path.dirname(filepath)
+            if not os.path.isdir(path):
+                os.makedirs(path)
+
+            fd, tmp_filepath = tempfile.mkstemp(dir=path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump(pyc, f)
+            os.rename(tmp_filepath, filepath)
+        except (IOError, OSError):
+            pass  # the cache is an optimisation only
+
+        return pyc
+
+    @classmethod
+    def _key(cls, source, sourcename):
+        from rez import __version__
+
+        h = sha1(__version__)
+        h.update(imp.get_magic())
+        for s in (sourcename, source):
+            if isinstance(s, unicode):
+                s = s.encode("utf-8")
+            h.update(s)
+        return h.hexdigest()
+
+    @classmethod
+    def _filepath(cls, key):
+        from rez.config import config  # avoiding circular import
+
+        path = config.sourcecode_cache_path
+        if not path:
+            return None
+
+        path = os.path.expanduser(path)
+        return os.path.join(path, key[:2], key + ".rezc")
+
+
+# singleton
+compiled_code_cache = CompiledCodeCache()
@@ -13,6 +13,7 @@ from rez.utils.data_utils import cached_property
 from rez.utils.formatting import is_valid_package_name, PackageRequest
 from rez.utils.resources import cached_property
 from rez.utils.logging_ import print_warning
+from rez.utils.filesystem import scan_directory, find_file
 from rez.utils.sourcecode import SourceCode
 from rez.utils.schema import get_cls_sub_schema
 from rez.serialise import load_from_file, FileFormat
@@ -102,7 +103,18 @@ class FileSystemPackageFamilyResource(PackageFamilyResource):
                 yield package
                 return
 
-        # versioned packages
+        # versioned packages, served from the package index if it is valid
+        index_entry = self._repository.get_index_family(self.name)
+        if index_entry is not None:
+            for version_str in index_entry["packages"]:
+                package = self._repository.get_resource(
+                    FileSystemPackageResource.key,
+                    location=self.location,
+                    name=self.name,
+                    version=version_str)
+                yield package
+            return
+
         for version_str in self._repository._get_version_dirs(self.path):
             if _settings.check_package_definition_files:
                 path = os.path.join(self.path, version_str)
@@ -137,6 +149,9 @@ class FileSystemPackageResource(PackageResourceHelper):
 
     @cached_property
     def state_handle(self):
+        entry = self._index_entry
+        if entry is not None:
+            return entry["state_handle"]
         if self.filepath:
             return os.path.getmtime(self.filepath)
         return None
@@ -145,6 +160,83 @@ class FileSystemPackageResource(PackageResourceHelper):
     def base(self):
         return self.path
 
+    @cached_property
+    def requires(self):
+        return self._get_indexed("requires")
+
+    @cached_property
+    def build_requires(self):
+        return self._get_indexed("build_requires")
+
+    @cached_property
+    def variants(self):
+        return self._get_indexed("variants")
+
+    @cached_property
+    def timestamp(self):
+        return self._get_indexed("timestamp")
+
+    def iter_variants(self):
+        entry = self._index_entry
+        if entry is None:
+            for variant in super(FileSystemPackageResource, self).iter_variants():
+                yield variant
+            return
+
+        num_variants = len(entry.get("variants") or [])
+        if num_variants == 0:
+            indexes = [None]
+        else:
+            indexes = range(num_variants)
+
+        for index in indexes:
+            variant = self._repository.get_resource(
+                self.variant_key,
+                location=self.location,
+                name=self.name,
+                version=self.get("version"),
+                index=index)
+            yield variant
+
+    @cached_property
+    def _index_entry(self):
+        # the entry for this package in the repository's package index, or
+        # None if there is no valid entry
+        ver_str = self.get("version")
+        if not ver_str:
+            return None
+        family_entry = self._repository.get_index_family(self.name)
+        if family_entry is None:
+            return None
+        entry = family_entry["packages"].get(ver_str)
+        if entry is None:
+            return None
+
+        # editing a package file in place does not change the family
+        # directory, so the package file itself is checked also
+        filepath = os.path.join(self.path, entry["file"])
+        try:
+            mtime = os.path.getmtime(filepath)
+        except OSError:
+            return None
+
+        if mtime != entry["state_handle"]:
+            return None
+        return entry
+
+    def _get_indexed(self, key):
+        # if the class has a property for, ie, "requires" already, then
+        # LazyAttributeMeta will create a property called _requires
+        entry = self._index_entry
+        if entry is None:
+            return getattr(self, '_' + key)
+
+        value = entry.get(key)
+        if value is None:
+            return None
+        schema = get_cls_sub_schema(self, key)
+        return self._validate_key_impl(key, value, schema)
+
     @cached_property
     def path(self):
         path = os.path.join(self.location, self.name)
@@ -163,6 +255,11 @@ class FileSystemPackageResource(PackageResourceHelper):
 
     @cached_property
     def _filepath_and_format(self):
+        entry = self._index_entry
+        if entry is not None:
+            filename = entry["file"]
+            format_ = FileFormat[os.path.splitext(filename)[1][1:]]
+            return os.path.join(self.path, filename), format_
         return self._repository._get_file(self.path)
 
     def _load(self):
@@ -454,6 +551,8 @@ class FileSystemPackageRepository(PackageRepository):
                    "package_filenames": [basestring]}
 
     building_prefix = ".building"
+    index_filename = ".rez_index.json"
+    index_format_version = 1
 
     @classmethod
     def name(cls):
@@ -483,6 +582,8 @@ class FileSystemPackageRepository(PackageRepository):
         self.get_packages = lru_cache(maxsize=None)(self._get_packages)
         self.get_variants = lru_cache(maxsize=None)(self._get_variants)
         self.get_file = lru_cache(maxsize=None)(self._get_file)
+        self.get_index_family = lru_cache(maxsize=None)(self._get_index_family)
+        self.get_family_names = lru_cache(maxsize=None)(self._get_family_names)
 
     def _uid(self):
         t = ["filesystem", self.location]
@@ -587,8 +688,74 @@ class FileSystemPackageRepository(PackageRepository):
             if lock.is_locked():
                 lock.release()
 
+        if _settings.use_package_index and not dry_run:
+            self.update_index([variant_resource.name])
+
         return variant
 
+    @property
+    def index_filepath(self):
+        return os.path.join(self.location, self.index_filename)
+
+    def update_index(self, family_names=None):
+        """Update the package index of this repository.
+
+        The index stores, per package family, the versions present along with
+        the data the solver needs (requires, variants, timestamp and so on),
+        so that resolves can be done without loading package definition
+        files. Family entries are validated against the family directory's
+        mtime, and are ignored if out of date. Note that changing a package
+        definition file in-place does not update its family's mtime - you
+        need to update the index (or touch the family directory) yourself.
+
+        Combined-style families, and families whose packages cannot be fully
+        indexed (late bound attributes for example), are left out of the
+        index, and are read from disk as usual.
+
+        Args:
+            family_names (list of str): Families to update. If None, the
+                whole index is rebuilt.
+        """
+        from rez.vendor.lockfile import LockFile, LockError
+
+        path = self.location
+        if self.file_lock_dir:
+            path = os.path.join(path, self.file_lock_dir)
+        lock = LockFile(os.path.join(path, ".lock.rez_index"))
+
+        try:
+            lock.acquire(timeout=_settings.file_lock_timeout)
+        except LockError as e:
+            print_warning("Package index at %s was not updated: %s"
+                          % (self.index_filepath, str(e)))
+            return
+
+        try:
+            self.clear_caches()
+
+            if family_names is None:
+                families = {}
+                family_names = [name for name, ext in self._get_family_dirs()
+                                if ext is None]
+            else:
+                families = self._load_index().get("families", {})
+
+            for name in family_names:
+                entry = self._create_index_family(name)
+                if entry is None:
+                    families.pop(name, None)
+                else:
+                    families[name] = entry
+
+            data = {"format_version": self.index_format_version,
+                    "families": families}
+            self._write_index(data)
+        finally:
+            if lock.is_locked():
+                lock.release()
+
+        self.clear_caches()
+
     def clear_caches(self):
         super(FileSystemPackageRepository, self).clear_caches()
         self.get_families.cache_clear()
@@ -596,6 +763,9 @@ class FileSystemPackageRepository(PackageRepository):
         self.get_packages.cache_clear()
         self.get_variants.cache_clear()
         self.get_file.cache_clear()
+        self.get_index_family.cache_clear()
+        self.get_family_names.cache_clear()
+        cached_property.uncache(self, "_index")
         self._get_family_dirs.forget()
         self._get_version_dirs.forget()
         # unfortunately we need to clear file cache across the board
@@ -619,9 +789,8 @@ class FileSystemPackageRepository(PackageRepository):
         if not os.path.isdir(self.location):
             return dirs
 
-        for name in os.listdir(self.location):
-            path = os.path.join(self.location, name)
-            if os.path.isdir(path):
+        for name, is_dir in scan_directory(self.location):
+            if is_dir:
                 if is_valid_package_name(name) and name != self.file_lock_dir:
                     dirs.append((name, None))
             else:
@@ -646,12 +815,12 @@ class FileSystemPackageRepository(PackageRepository):
         if _settings.check_package_definition_files:
             dirs = []
 
-            for name in os.listdir(root):
+            for name, is_dir in scan_directory(root):
                 if name.startswith('.'):
                     continue
 
-                path = os.path.join(root, name)
-                if os.path.isdir(path):
+                if is_dir:
+                    path = os.path.join(root, name)
                     if not self._is_valid_package_directory(path):
                         continue
 
@@ -666,7 +835,7 @@ class FileSystemPackageRepository(PackageRepository):
         building_dirs = set()
 
         # find dirs and dirs marked as 'building'
-        for name in os.listdir(root):
+        for name, is_dir in scan_directory(root):
             if name.startswith('.'):
                 if not name.startswith(self.building_prefix):
                     continue
@@ -674,8 +843,7 @@ class FileSystemPackageRepository(PackageRepository):
                 ver_str = name[len(self.building_prefix):]
                 building_dirs.add(ver_str)
 
-            path = os.path.join(root, name)
-            if os.path.isdir(path):
+            if is_dir:
                 dirs.add(name)
 
         # check 'building' dirs for validity
@@ -712,8 +880,18 @@ class FileSystemPackageRepository(PackageRepository):
 
         return families
 
+    def _get_family_names(self):
+        return set(x[0] for x in self._get_family_dirs())
+
     def _get_family(self, name):
         is_valid_package_name(name, raise_error=True)
+
+        # the listing of the repository root is cached (and validated against
+        # the root's mtime), so this avoids stats for families that aren't here
+        if _settings.cache_missing_families \
+                and name not in self.get_family_names():
+            return None
+
         if os.path.isdir(os.path.join(self.location, name)):
             family = self.get_resource(
                 FileSystemPackageFamilyResource.key,
@@ -737,18 +915,112 @@ class FileSystemPackageRepository(PackageRepository):
     def _get_variants(self, package_resource):
         return [x for x in package_resource.iter_variants()]
 
+    @cached_property
+    def _index(self):
+        if not _settings.use_package_index:
+            return {}
+        return self._load_index()
+
+    def _load_index(self):
+        from rez.vendor import simplejson
+
+        try:
+            with open(self.index_filepath) as f:
+                data = simplejson.load(f)
+        except IOError:
+            return {}
+        except ValueError as e:
+            print_warning("Ignoring corrupt package index %s: %s"
+                          % (self.index_filepath, str(e)))
+            return {}
+
+        if data.get("format_version") != self.index_format_version:
+            return {}
+        return data
+
+    def _write_index(self, data):
+        from rez.vendor import simplejson
+
+        # write to a temp file and rename it, so that readers never see a
+        # partially written index
+        tmp_filepath = "%s.%d.tmp" % (self.index_filepath, os.getpid())
+        with open(tmp_filepath, 'w') as f:
+            simplejson.dump(data, f)
+        os.rename(tmp_filepath, self.index_filepath)
+
+    def _get_index_family(self, name):
+        entry = self._index.get("families", {}).get(name)
+        if entry is None:
+            return None
+
+        try:
+            mtime = os.path.getmtime(os.path.join(self.location, name))
+        except OSError:
+            return None
+
+        if mtime != entry["mtime"]:
+            return None
+        return entry
+
+    def _create_index_family(self, name):
+        family_path = os.path.join(self.location, name)
+        if not os.path.isdir(family_path):
+            return None
+
+        # get the mtime first, so that a change made while indexing causes the
+        # entry to be treated as stale
+        mtime = os.path.getmtime(family_path)
+        packages = {}
+
+        for version_str in self._get_version_dirs(family_path):
+            package = self.get_resource(
+                FileSystemPackageResource.key,
+                location=self.location,
+                name=name,
+                version=version_str)
+
+            try:
+                filepath = package.filepath
+                if not filepath:
+                    continue
+
+                entry = {"file": os.path.basename(filepath),
+                         "state_handle": os.path.getmtime(filepath),
+                         "timestamp": package._timestamp}
+
+                for key in ("requires", "build_requires", "variants"):
+                    value = getattr(package, '_' + key)
+                    if isinstance(value, SourceCode):
+                        return None  # late bound, cannot be indexed
+                    if value is not None:
+                        if key == "variants":
+                            value = [map(str, x) for x in value]
+                        else:
+                            value = map(str, value)
+                    entry[key] = value
+            except PackageMetadataError:
+                return None
+
+            packages[version_str] = entry
+
+        return {"mtime": mtime, "packages": packages}
+
     def _get_file(self, path, package_filename=None):
         if package_filename:
             package_filenames = [package_filename]
         else:
             package_filenames = _settings.package_filenames
 
+        candidates = []
         for name in package_filenames:
             for format_ in (FileFormat.py, FileFormat.yaml):
                 filename = "%s.%s" % (name, format_.extension)
-                filepath = os.path.join(path, filename)
-                if os.path.isfile(filepath):
-                    return filepath, format_
+                candidates.append((filename, format_))
+
+        filename = find_file(path, [x[0] for x in candidates])
+        if filename:
+            format_ = dict(candidates)[filename]
+            return os.path.join(path, filename), format_
         return None, None
 
     def _create_family(self, name):
@@ -0,0 +1,346 @@
+"""
+Packed snapshot package repository
+"""
+from rez.package_repository import PackageRepository
+from rez.package_resources_ import PackageFamilyResource, \
+    VariantResourceHelper, PackageResourceHelper, package_pod_schema
+from rez.exceptions import PackageRepositoryError, ResourceError
+from rez.utils.formatting import is_valid_package_name
+from rez.utils.resources import cached_property
+from rez.utils.logging_ import print_warning
+from rez.backport.lru_cache import lru_cache
+from rez.vendor.version.requirement import VersionedObject
+import cPickle as pickle
+import tempfile
+import struct
+import mmap
+import time
+import zlib
+import os.path
+import os
+
+
+# magic string at the start of a snapshot file, which includes the file format
+# version
+_magic = "REZPACK1"
+
+# the magic string is followed by the offset of the index
+_header_format = "<Q"
+_header_size = len(_magic) + struct.calcsize(_header_format)
+
+# key of unversioned packages in family data
+_no_version = "_NO_VERSION"
+
+
+#------------------------------------------------------------------------------
+# resource classes
+#------------------------------------------------------------------------------
+
+class PackedPackageFamilyResource(PackageFamilyResource):
+    key = "packed.family"
+    repository_type = "packed"
+
+    def _uri(self):
+        return "%s:%s" % (self.location, self.name)
+
+    def iter_packages(self):
+        data = self._repository.get_family_data(self.name)
+
+        # check for unversioned package
+        if _no_version in data:
+            package = self._repository.get_resource(
+                PackedPackageResource.key,
+                location=self.location,
+                name=self.name)
+            yield package
+            return
+
+        # versioned packages
+        for version_str in data.iterkeys():
+            package = self._repository.get_resource(
+                PackedPackageResource.key,
+                location=self.location,
+                name=self.name,
+                version=version_str)
+            yield package
+
+
+class PackedPackageResource(PackageResourceHelper):
+    key = "packed.package"
+    variant_key = "packed.variant"
+    repository_type = "packed"
+    schema = package_pod_schema
+
+    def _uri(self):
+        obj = VersionedObject.construct(self.name, self.version)
+        return "%s:%s" % (self.location, str(obj))
+
+    @cached_property
+    def parent(self):
+        family = self._repository.get_resource(
+            PackedPackageFamilyResource.key,
+            location=self.location,
+            name=self.name)
+        return family
+
+    def _load(self):
+        family_data = self._repository.get_family_data(self.name)
+        version_str = self.get("version") or _no_version
+        return family_data.get(version_str, {})
+
+
+class PackedVariantResource(VariantResourceHelper):
+    key = "packed.variant"
+    repository_type = "packed"
+
+    @cached_property
+    def parent(self):
+        package = self._repository.get_resource(
+            PackedPackageResource.key,
+            location=self.location,
+            name=self.name,
+            version=self.get("version"))
+        return package
+
+
+#------------------------------------------------------------------------------
+# repository
+#------------------------------------------------------------------------------
+
+class PackedPackageRepository(PackageRepository):
+    """A package repository served from a single, read-only snapshot file.
+
+    A snapshot is created from another repository with `pack` (or
+    the 'rez-repo-pack' tool), and contains the definitions of all of its
+    packages, as at the time of packing. Packages keep their original 'base'
+    directory, so their payloads are still read from the original repository.
+
+    Reading packages from one local file, rather than from many package
+    definition files on network storage, is much faster. A snapshot also gives
+    a reproducible view of a repository at a point in time.
+
+    The snapshot file is memory mapped, and each family's data is decoded only
+    when the family is first used. The file is laid out like so:
+
+        magic string ("REZPACK1")
+        index offset (unsigned 64 bit integer, little endian)
+        family data blocks
+        index
+
+    Each family data block is a zlib-compressed pickle of the family's package
+    data, in the same form as the 'memory' repository's family data. The index
+    is a zlib-compressed pickle of a dict containing the snapshot's 'source'
+    repository, 'created' time, and its 'families', which maps each family
+    name to its (offset, size, last release time).
+
+    The location of the repository is the path to the snapshot file, for
+    example 'packed@/local/snapshots/packages.rezpack'.
+    """
+    @classmethod
+    def name(cls):
+        return "packed"
+
+    def __init__(self, location, resource_pool):
+        """Create a packed package repository.
+
+        Args:
+            location (str): Path to the snapshot file.
+        """
+        location = os.path.abspath(location)
+        super(PackedPackageRepository, self).__init__(location, resource_pool)
+
+        self.register_resource(PackedPackageFamilyResource)
+        self.register_resource(PackedPackageResource)
+        self.register_resource(PackedVariantResource)
+
+        self.get_family_data = lru_cache(maxsize=None)(self._get_family_data)
+
+    def _uid(self):
+        t = ["packed", self.location]
+        if os.path.exists(self.location):
+            st = os.stat(self.location)
+            t.append(st.st_ino)
+        return tuple(t)
+
+    def get_package_family(self, name):
+        is_valid_package_name(name, raise_error=True)
+        if name in self.index["families"]:
+            family = self.get_resource(
+                PackedPackageFamilyResource.key,
+                location=self.location,
+                name=name)
+            return family
+        return None
+
+    def iter_package_families(self):
+        for name in self.index["families"].iterkeys():
+            family = self.get_package_family(name)
+            yield family
+
+    def iter_packages(self, package_family_resource):
+        for package in package_family_resource.iter_packages():
+            yield package
+
+    def iter_variants(self, package_resource):
+        for variant in package_resource.iter_variants():
+            yield variant
+
+    def get_parent_package_family(self, package_resource):
+        return package_resource.parent
+
+    def get_parent_package(self, variant_resource):
+        return variant_resource.parent
+
+    def get_last_release_time(self, package_family_resource):
+        entry = self.index["families"].get(package_family_resource.name)
+        return entry[2] if entry else 0
+
+    def clear_caches(self):
+        super(PackedPackageRepository, self).clear_caches()
+        self.get_family_data.cache_clear()
+        cached_property.uncache(self, "index")
+        cached_property.uncache(self, "_mmap")
+
+    @cached_property
+    def index(self):
+        """The snapshot index, see class docstring."""
+        mm = self._mmap
+        offset = struct.unpack(_header_format, mm[len(_magic):_header_size])[0]
+        return self._decode(mm[offset:])
+
+    @classmethod
+    def pack(cls, repository, filepath, callback=None):
+        """Write a snapshot of a package repository.
+
+        The snapshot is written atomically, so processes reading an existing
+        snapshot at `filepath` are not affected. Packages that fail to load are
+        skipped, with a warning.
+
+        Args:
+            repository (`PackageRepository`): Repository to pack.
+            filepath (str): Snapshot file to write.
+            callback (callable): If not None, called with each package family
+                resource, before it is packed.
+
+        Returns:
+            dict: The snapshot index, see `PackedPackageRepository`.
+        """
+        filepath = os.path.abspath(filepath)
+        families = {}
+
+        fd, tmp_filepath = tempfile.mkstemp(dir=os.path.dirname(filepath),
+                                            suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_magic + struct.pack(_header_format, 0))
+                offset = _header_size
+
+                for family in repository.iter_package_families():
+                    if callback:
+                        callback(family)
+
+                    family_data = {}
+                    for package in repository.iter_packages(family):
+                        try:
+                            data = package._data.copy()
+                        except ResourceError as e:
+                            print_warning("Package %s not packed: %s"
+                                          % (package.uri, str(e)))
+                            continue
+
+                        if package.base:
+                            data["base"] = package.base
+
+                        # the version is not necessarily the one in the
+                        # package definition, eg filesystem packages are
+                        # versioned by directory
+                        version_str = package.get("version")
+                        if version_str:
+                            data["version"] = version_str
+                        else:
+                            data.pop("version", None)
+                            version_str = _no_version
+                        family_data[version_str] = data
+
+                    blob = cls._encode(family_data)
+                    f.write(blob)
+                    release_time = repository.get_last_release_time(family)
+                    families[family.name] = (offset, len(blob), release_time)
+                    offset += len(blob)
+
+                index = dict(source="%s@%s" % (repository.name(),
+                                               repository.location),
+                             created=int(time.time()),
+                             families=families)
+                f.write(cls._encode(index))
+
+                f.seek(len(_magic))
+                f.write(struct.pack(_header_format, offset))
+
+            # mkstemp creates files readable by the owner only
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_filepath, 0666 & ~umask)
+            os.rename(tmp_filepath, filepath)
+        except:
+            if os.path.exists(tmp_filepath):
+                os.remove(tmp_filepath)
+            raise
+
+        return index
+
+    # -- internal
+
+    @cached_property
+    def _mmap(self):
+        try:
+            with open(self.location, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError) as e:
+            raise PackageRepositoryError(
+                "Cannot read package snapshot %s: %s" % (self.location, str(e)))
+
+        if mm[:len(_magic)] != _magic:
+            mm.close()
+            raise PackageRepositoryError(
+                "Not a package snapshot: %s" % self.location)
+        return mm
+
+    def _get_family_data(self, name):
+        entry = self.index["families"].get(name)
+        if entry is None:
+            return {}
+
+        offset, size, _ = entry
+        return self._decode(self._mmap[offset:offset + size])
+
+    @classmethod
+    def _encode(cls, obj):
+        return zlib.compress(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def _decode(cls, blob):
+        try:
+            return pickle.loads(zlib.decompress(blob))
+        except Exception as e:
+            raise PackageRepositoryError("Corrupt package snapshot: %s" % str(e))
+
+
+def register_plugin():
+    return PackedPackageRepository
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
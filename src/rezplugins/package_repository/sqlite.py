@@ -0,0 +1,666 @@
+"""
+SQLite package repository
+"""
+from rez.package_repository import PackageRepository
+from rez.package_resources_ import PackageFamilyResource, \
+    VariantResourceHelper, PackageResourceHelper, package_pod_schema, \
+    package_release_keys, package_build_only_keys
+from rez.package_serialise import package_serialise_schema
+from rez.exceptions import PackageRepositoryError, ResourceError, \
+    RezSystemError
+from rez.utils.formatting import is_valid_package_name, PackageRequest
+from rez.utils.resources import cached_property
+from rez.utils.schema import get_cls_sub_schema
+from rez.config import config
+from rez.backport.lru_cache import lru_cache
+from rez.vendor.version.requirement import VersionedObject
+from rez.vendor.version.version import Version
+import cPickle as pickle
+import sqlite3
+import time
+import os.path
+import os
+
+
+# this is set by the repository, it's just here for convenience
+_settings = None
+
+# version string of unversioned packages
+_no_version = ""
+
+# requirement name stored for packages whose requirements are late bound, and
+# so cannot be indexed. Such packages are always returned by
+# `get_dependent_families`, and are checked by the caller
+_unknown_name = "*"
+
+# keys of package data that are stored as columns, so that they can be read
+# without loading the package
+_summary_keys = ("requires", "build_requires", "variants", "timestamp")
+
+_schema = """
+CREATE TABLE IF NOT EXISTS families (
+    name                TEXT PRIMARY KEY,
+    last_release_time   INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS packages (
+    id                  INTEGER PRIMARY KEY,
+    family              TEXT NOT NULL,
+    version             TEXT NOT NULL,
+    is_latest           INTEGER NOT NULL DEFAULT 0,
+    timestamp           INTEGER,
+    modified            REAL NOT NULL,
+    summary             BLOB NOT NULL,
+    data                BLOB NOT NULL,
+    UNIQUE (family, version)
+);
+
+CREATE INDEX IF NOT EXISTS packages_timestamp ON packages (timestamp);
+
+CREATE TABLE IF NOT EXISTS requirements (
+    package_id          INTEGER NOT NULL REFERENCES packages (id),
+    name                TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS requirements_name ON requirements (name);
+CREATE INDEX IF NOT EXISTS requirements_package ON requirements (package_id);
+
+CREATE TABLE IF NOT EXISTS plugins (
+    package_id          INTEGER NOT NULL REFERENCES packages (id),
+    name                TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS plugins_name ON plugins (name);
+CREATE INDEX IF NOT EXISTS plugins_package ON plugins (package_id);
+"""
+
+
+#------------------------------------------------------------------------------
+# resource classes
+#------------------------------------------------------------------------------
+
+class SqlitePackageFamilyResource(PackageFamilyResource):
+    key = "sqlite.family"
+    repository_type = "sqlite"
+
+    def _uri(self):
+        return "%s:%s" % (self.location, self.name)
+
+    def iter_packages(self):
+        entries = self._repository.get_family_entries(self.name)
+
+        for version_str in entries.iterkeys():
+            variables = dict(location=self.location, name=self.name)
+            if version_str:
+                variables["version"] = version_str
+
+            package = self._repository.get_resource(
+                SqlitePackageResource.key, **variables)
+            yield package
+
+
+class SqlitePackageResource(PackageResourceHelper):
+    key = "sqlite.package"
+    variant_key = "sqlite.variant"
+    repository_type = "sqlite"
+    schema = package_pod_schema
+
+    def _uri(self):
+        obj = VersionedObject.construct(self.name, self.version)
+        return "%s:%s" % (self.location, str(obj))
+
+    @cached_property
+    def parent(self):
+        family = self._repository.get_resource(
+            SqlitePackageFamilyResource.key,
+            location=self.location,
+            name=self.name)
+        return family
+
+    @cached_property
+    def state_handle(self):
+        return self._entry["modified"]
+
+    @cached_property
+    def requires(self):
+        return self._get_summarised("requires")
+
+    @cached_property
+    def build_requires(self):
+        return self._get_summarised("build_requires")
+
+    @cached_property
+    def variants(self):
+        return self._get_summarised("variants")
+
+    @cached_property
+    def timestamp(self):
+        return self._get_summarised("timestamp")
+
+    @cached_property
+    def _entry(self):
+        entries = self._repository.get_family_entries(self.name)
+        return entries.get(self.get("version") or _no_version)
+
+    def _get_summarised(self, key):
+        # if the class has a property for, ie, "requires" already, then
+        # LazyAttributeMeta will create a property called _requires
+        summary = self._entry["summary"]
+        if key not in summary:
+            return getattr(self, '_' + key)
+
+        value = summary[key]
+        if value is None:
+            return None
+        schema = get_cls_sub_schema(self, key)
+        return self._validate_key_impl(key, value, schema)
+
+    def _load(self):
+        return self._repository._get_package_data(self._entry["id"])
+
+
+class SqliteVariantResource(VariantResourceHelper):
+    key = "sqlite.variant"
+    repository_type = "sqlite"
+
+    @cached_property
+    def parent(self):
+        package = self._repository.get_resource(
+            SqlitePackageResource.key,
+            location=self.location,
+            name=self.name,
+            version=self.get("version"))
+        return package
+
+
+#------------------------------------------------------------------------------
+# repository
+#------------------------------------------------------------------------------
+
+class SqlitePackageRepository(PackageRepository):
+    """A package repository stored in an SQLite database.
+
+    Each package is a row in the database, containing its package definition.
+    Versions, timestamps, requirements (from the package and its variants) and
+    'plugin_for' names are also stored in indexed columns, so that:
+
+    - packages can be listed, and their requirements and timestamps read,
+      without loading their definitions;
+    - reverse dependency, plugin and release time searches (see
+      `rez.package_search`) are indexed queries, rather than scans of every
+      package family.
+
+    Package definitions do not include a payload. Packages have no 'base' (and
+    so their variants have no 'root') unless one is given as an override when
+    the variant is installed, for example:
+
+        >>> repo.install_variant(variant, overrides={"base": "/svr/foo/1.0"})
+
+    The location of the repository is the path to the database file, for
+    example 'sqlite@/svr/packages.db'. A missing database is treated as empty,
+    and is created when a variant is first installed into it.
+    """
+    schema_dict = {"busy_timeout": int}
+
+    @classmethod
+    def name(cls):
+        return "sqlite"
+
+    def __init__(self, location, resource_pool):
+        """Create an SQLite package repository.
+
+        Args:
+            location (str): Path to the database file.
+        """
+        location = os.path.abspath(location)
+        super(SqlitePackageRepository, self).__init__(location, resource_pool)
+
+        global _settings
+        _settings = config.plugins.package_repository.sqlite
+
+        self.register_resource(SqlitePackageFamilyResource)
+        self.register_resource(SqlitePackageResource)
+        self.register_resource(SqliteVariantResource)
+
+        self.get_families = lru_cache(maxsize=None)(self._get_families)
+        self.get_family_entries = lru_cache(maxsize=None)(self._get_family_entries)
+
+        self._connection = None
+        self._connection_pid = None
+        self._has_schema = False
+
+    def _uid(self):
+        t = ["sqlite", self.location]
+        if os.path.exists(self.location):
+            st = os.stat(self.location)
+            t.append(st.st_ino)
+        return tuple(t)
+
+    def get_package_family(self, name):
+        is_valid_package_name(name, raise_error=True)
+        if name in self.get_families():
+            family = self.get_resource(
+                SqlitePackageFamilyResource.key,
+                location=self.location,
+                name=name)
+            return family
+        return None
+
+    def iter_package_families(self):
+        for name in sorted(self.get_families()):
+            family = self.get_package_family(name)
+            yield family
+
+    def iter_packages(self, package_family_resource):
+        for package in package_family_resource.iter_packages():
+            yield package
+
+    def iter_variants(self, package_resource):
+        for variant in package_resource.iter_variants():
+            yield variant
+
+    def get_parent_package_family(self, package_resource):
+        return package_resource.parent
+
+    def get_parent_package(self, variant_resource):
+        return variant_resource.parent
+
+    def get_variant_state_handle(self, variant_resource):
+        package_resource = variant_resource.parent
+        return package_resource.state_handle
+
+    def get_last_release_time(self, package_family_resource):
+        return self.get_families().get(package_family_resource.name, 0)
+
+    def get_dependent_families(self, package_name):
+        # packages with late bound requirements are included, see
+        # `_get_requirement_names`
+        rows = self._execute(
+            "SELECT DISTINCT p.family FROM packages p "
+            "JOIN requirements r ON r.package_id = p.id "
+            "WHERE p.is_latest = 1 AND r.name IN (?, ?)",
+            (package_name, _unknown_name))
+        return set(x[0] for x in rows)
+
+    def get_plugin_families(self, package_name):
+        rows = self._execute(
+            "SELECT DISTINCT p.family FROM packages p "
+            "JOIN plugins pl ON pl.package_id = p.id "
+            "WHERE p.is_latest = 1 AND pl.name IN (?, ?)",
+            (package_name, _unknown_name))
+        return set(x[0] for x in rows)
+
+    def get_released_families(self, before_time=0, after_time=0):
+        conditions = []
+        parameters = []
+        if before_time:
+            conditions.append("timestamp < ?")
+            parameters.append(before_time)
+        if after_time:
+            conditions.append("timestamp > ?")
+            parameters.append(after_time)
+
+        sql = "SELECT DISTINCT family FROM packages"
+        if conditions:
+            sql += (" WHERE timestamp IS NULL OR timestamp = 0 OR (%s)"
+                    % " AND ".join(conditions))
+
+        rows = self._execute(sql, parameters)
+        return set(x[0] for x in rows)
+
+    def install_variant(self, variant_resource, dry_run=False, overrides=None):
+        if variant_resource._repository is self:
+            return variant_resource
+
+        # a dry run only reads the database, so does not create it (a missing
+        # database has no packages, so the result is None)
+        if dry_run:
+            return self._create_variant(variant_resource, dry_run=True,
+                                        overrides=overrides)
+
+        # lock the database for writing, so that concurrent installs into the
+        # same package do not lose variants. Cached data may have been read
+        # before another process's install, so it is discarded
+        conn = self._get_connection(create=True)
+        conn.execute("BEGIN IMMEDIATE")
+        self.clear_caches()
+
+        try:
+            variant = self._create_variant(variant_resource,
+                                           overrides=overrides)
+            conn.execute("COMMIT")
+        except:
+            conn.execute("ROLLBACK")
+            self.clear_caches()
+            raise
+
+        return variant
+
+    def clear_caches(self):
+        super(SqlitePackageRepository, self).clear_caches()
+        self.get_families.cache_clear()
+        self.get_family_entries.cache_clear()
+
+    # -- internal
+
+    def _get_connection(self, create=False):
+        # Returns None if the database does not exist, unless `create` is True,
+        # in which case the database (and its tables) are created
+        pid = os.getpid()
+
+        # connections cannot be shared with forked processes
+        if self._connection_pid != pid:
+            self._connection = None
+            self._has_schema = False
+
+        if self._connection is None:
+            if not create and not os.path.isfile(self.location):
+                return None
+
+            try:
+                if create:
+                    path = os.path.dirname(self.location)
+                    if not os.path.isdir(path):
+                        os.makedirs(path)
+
+                conn = sqlite3.connect(self.location,
+                                       timeout=_settings.busy_timeout,
+                                       isolation_level=None)
+                conn.text_factory = str
+            except (sqlite3.Error, OSError) as e:
+                raise PackageRepositoryError(
+                    "Cannot open package database %s: %s"
+                    % (self.location, str(e)))
+
+            self._connection = conn
+            self._connection_pid = pid
+
+        if create and not self._has_schema:
+            try:
+                self._connection.executescript(_schema)
+            except sqlite3.Error as e:
+                raise PackageRepositoryError(
+                    "Cannot create package database %s: %s"
+                    % (self.location, str(e)))
+            self._has_schema = True
+
+        return self._connection
+
+    def _execute(self, sql, parameters=()):
+        # a missing database is treated as empty
+        conn = self._get_connection()
+        if conn is None:
+            return []
+
+        try:
+            return conn.execute(sql, parameters).fetchall()
+        except sqlite3.Error as e:
+            raise PackageRepositoryError(
+                "Cannot read package database %s: %s"
+                % (self.location, str(e)))
+
+    def _get_families(self):
+        rows = self._execute("SELECT name, last_release_time FROM families")
+        return dict(rows)
+
+    def _get_family_entries(self, name):
+        rows = self._execute(
+            "SELECT id, version, modified, summary FROM packages "
+            "WHERE family = ?", (name,))
+
+        entries = {}
+        for id_, version_str, modified, summary in rows:
+            entries[version_str] = dict(id=id_,
+                                        modified=modified,
+                                        summary=pickle.loads(str(summary)))
+        return entries
+
+    def _get_package_data(self, package_id):
+        rows = self._execute("SELECT data FROM packages WHERE id = ?",
+                             (package_id,))
+        if not rows:
+            raise ResourceError("Package %d is missing from package database %s"
+                                % (package_id, self.location))
+        return pickle.loads(str(rows[0][0]))
+
+    def _create_variant(self, variant, dry_run=False, overrides=None):
+        # find the package if it already exists
+        existing_package = None
+        family = self.get_package_family(variant.name)
+
+        if family:
+            for package in self.iter_packages(family):
+                if package.version == variant.version:
+                    uuids = set([variant.uuid, package.uuid])
+                    if len(uuids) > 1 and None not in uuids:
+                        raise ResourceError(
+                            "Cannot install variant %r into package %r - the "
+                            "packages are not the same (UUID mismatch)"
+                            % (variant, package))
+
+                    existing_package = package
+
+                    if variant.index is None:
+                        if package.variants:
+                            raise ResourceError(
+                                "Attempting to install a package without "
+                                "variants (%r) into an existing package with "
+                                "variants (%r)" % (variant, package))
+                    elif not package.variants:
+                        raise ResourceError(
+                            "Attempting to install a variant (%r) into an "
+                            "existing package without variants (%r)"
+                            % (variant, package))
+
+        installed_variant_index = None
+        release_data = {}
+
+        new_package_data = variant.parent.validated_data()
+        new_package_data.pop("variants", None)
+        package_changed = False
+
+        def remove_build_keys(obj):
+            for key in package_build_only_keys:
+                obj.pop(key, None)
+
+        remove_build_keys(new_package_data)
+
+        if existing_package:
+            existing_package_data = existing_package.validated_data()
+            remove_build_keys(existing_package_data)
+
+            # detect case where new variant introduces package changes outside
+            # of variant
+            data_1 = existing_package_data.copy()
+            data_2 = new_package_data.copy()
+
+            for key in package_release_keys:
+                data_2.pop(key, None)
+                value = data_1.pop(key, None)
+                if value is not None:
+                    release_data[key] = value
+
+            for key in ("format_version", "base", "variants"):
+                data_1.pop(key, None)
+                data_2.pop(key, None)
+
+            package_changed = (data_1 != data_2)
+
+        # special case - installing a no-variant pkg into a no-variant pkg
+        if existing_package and variant.index is None:
+            if dry_run and not package_changed:
+                return self.iter_variants(existing_package).next()
+            else:
+                # just replace the package
+                existing_package = None
+
+        if existing_package:
+            # see if variant already exists in package
+            variant_requires = variant.variant_requires
+
+            for variant_ in self.iter_variants(existing_package):
+                variant_requires_ = existing_package.variants[variant_.index]
+                if variant_requires_ == variant_requires:
+                    installed_variant_index = variant_.index
+                    if dry_run and not package_changed:
+                        return variant_
+                    break
+
+            parent_package = existing_package
+
+            if package_changed:
+                # graft together new package data, with existing package
+                # variants, and other data that needs to stay unchanged (eg
+                # timestamp)
+                package_data = new_package_data
+                package_data["variants"] = existing_package_data.get("variants", [])
+            else:
+                package_data = existing_package_data
+        else:
+            parent_package = variant.parent
+            package_data = new_package_data
+
+        if dry_run:
+            return None
+
+        # merge existing release data (if any) into the package
+        package_data.update(release_data)
+
+        # merge the new variant into the package
+        if installed_variant_index is None and variant.index is not None:
+            variant_requires = variant.variant_requires
+            if not package_data.get("variants"):
+                package_data["variants"] = []
+            package_data["variants"].append(variant_requires)
+            installed_variant_index = len(package_data["variants"]) - 1
+
+        # a little data massaging is needed
+        package_data["config"] = parent_package._data.get("config")
+        package_data.pop("base", None)
+
+        # add the timestamp
+        overrides = overrides or {}
+        overrides["timestamp"] = int(time.time())
+
+        # apply attribute overrides
+        for key, value in overrides.iteritems():
+            if package_data.get(key) is None:
+                package_data[key] = value
+
+        package_data = dict((k, v) for k, v in package_data.iteritems()
+                            if v is not None)
+        package_data = package_serialise_schema.validate(package_data)
+        self._write_package(package_data)
+
+        # load new variant
+        new_variant = None
+        self.clear_caches()
+        family = self.get_package_family(variant.name)
+        if family:
+            for package in self.iter_packages(family):
+                if package.version == variant.version:
+                    for variant_ in self.iter_variants(package):
+                        if variant_.index == installed_variant_index:
+                            new_variant = variant_
+                            break
+                    break
+
+        if not new_variant:
+            raise RezSystemError("Internal failure - expected installed variant")
+        return new_variant
+
+    def _write_package(self, data):
+        name = data["name"]
+        version_str = str(data.get("version") or _no_version)
+        now = time.time()
+
+        summary = {}
+        for key in _summary_keys:
+            value = data.get(key)
+            if not _is_late_bound(value):
+                summary[key] = value
+
+        conn = self._get_connection(create=True)
+        rows = conn.execute(
+            "SELECT id FROM packages WHERE family = ? AND version = ?",
+            (name, version_str)).fetchall()
+
+        fields = (data.get("timestamp"), now,
+                  sqlite3.Binary(pickle.dumps(summary, pickle.HIGHEST_PROTOCOL)),
+                  sqlite3.Binary(pickle.dumps(data, pickle.HIGHEST_PROTOCOL)))
+
+        if rows:
+            package_id = rows[0][0]
+            conn.execute(
+                "UPDATE packages SET timestamp = ?, modified = ?, summary = ?, "
+                "data = ? WHERE id = ?", fields + (package_id,))
+            conn.execute("DELETE FROM requirements WHERE package_id = ?",
+                         (package_id,))
+            conn.execute("DELETE FROM plugins WHERE package_id = ?",
+                         (package_id,))
+        else:
+            cursor = conn.execute(
+                "INSERT INTO packages (family, version, timestamp, modified, "
+                "summary, data) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, version_str) + fields)
+            package_id = cursor.lastrowid
+
+        conn.executemany(
+            "INSERT INTO requirements (package_id, name) VALUES (?, ?)",
+            [(package_id, x) for x in _get_requirement_names(data)])
+
+        plugin_for = data.get("plugin_for") or []
+        if _is_late_bound(plugin_for):
+            plugin_for = [_unknown_name]
+        conn.executemany(
+            "INSERT INTO plugins (package_id, name) VALUES (?, ?)",
+            [(package_id, x) for x in set(plugin_for)])
+
+        # update the family's latest package, and release time
+        rows = conn.execute("SELECT id, version FROM packages WHERE family = ?",
+                            (name,)).fetchall()
+        latest_id = max(rows, key=lambda x: Version(x[1]))[0]
+        conn.execute("UPDATE packages SET is_latest = (id = ?) WHERE family = ?",
+                     (latest_id, name))
+        conn.execute("INSERT OR REPLACE INTO families (name, last_release_time) "
+                     "VALUES (?, ?)", (name, int(now)))
+
+
+def _is_late_bound(value):
+    from rez.utils.sourcecode import SourceCode
+    return isinstance(value, SourceCode)
+
+
+def _get_requirement_names(data):
+    # names of non-conflict requirements of the package and its variants
+    requires = data.get("requires") or []
+    variants = data.get("variants") or []
+    if _is_late_bound(requires):
+        return set([_unknown_name])
+
+    names = set()
+    for req_str in requires + sum(variants, []):
+        req = PackageRequest(str(req_str))
+        if not req.conflict:
+            names.add(req.name)
+    return names
+
+
+def register_plugin():
+    return SqlitePackageRepository
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.